@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ..services.agents.langgraph_agent import LangGraphAgent
+
+_chat_agent: Optional["LangGraphAgent"] = None
+
+
+async def get_chat_agent() -> "LangGraphAgent":
+    """Return the API's shared chat agent, initialising it on first use"""
+    global _chat_agent
+    if _chat_agent is None:
+        # LangGraph, LangChain and the tools load with the first chat
+        from ..services.agents.langgraph_agent import LangGraphAgent
+
+        _chat_agent = LangGraphAgent()
+        await _chat_agent.initialize()
+    return _chat_agent
+
+
+def chat_agent_stats() -> Optional[dict]:
+    """Stats of the chat agent, or None if it was never used"""
+    return _chat_agent.stats() if _chat_agent is not None else None
+
+
+async def close_chat_agent():
+    """Release the chat agent's browser resources"""
+    global _chat_agent
+    if _chat_agent is not None:
+        await _chat_agent.close()
+        _chat_agent = None
@@ -1,6 +1,32 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import sys
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
 
-from ..services.agents.visa_checker_agent import VisaCheckerAgent
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+
+from ..models.chat import ChatRequest
+from ..services.core import metrics
+from ..services.core import scheduler as core_scheduler
+from ..services.jobs.queue import Job, QueueFullError, get_job_queue
+from ..services.monitoring.targets import VISA_TARGET
+from .dependencies import chat_agent_stats, get_chat_agent
+
+if TYPE_CHECKING:
+    from ..services.agents.langgraph_agent import LangGraphAgent
+
+# Routes import the browser, LLM and agent stacks when first called, so
+# the API starts without loading Playwright, LangChain or LangGraph
 
 router = APIRouter()
 
@@ -11,7 +37,285 @@ def read_root():
 
 
 @router.post("/check-visa")
-async def check_visa_manual():
-    agent = VisaCheckerAgent()
-    result = await agent.run_manual()
-    return {"result": result}
+async def check_visa_manual(wait: float = 0):
+    """Queue a visa check; identical checks in flight or just finished are reused
+
+    With wait > 0 the response holds for up to that many seconds and
+    carries the result if the check finished in time.
+    """
+    queue = get_job_queue()
+    try:
+        job = await queue.submit("check_visa")
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    if wait > 0:
+        await queue.wait(job, wait)
+    return _job_response(job)
+
+
+@router.get("/jobs")
+async def job_stats():
+    """Job queue counters"""
+    return get_job_queue().report()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Poll a job; with wait > 0, hold until it finishes or the time runs out"""
+    queue = get_job_queue()
+    job = await queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait > 0 and not job.finished:
+        await queue.wait(job, wait)
+    return _job_response(job)
+
+
+def _job_response(job: Job) -> JSONResponse:
+    """200 with the outcome once a job has finished, 202 while it is pending"""
+    body = {**job.to_dict(), "poll": f"/jobs/{job.id}"}
+    return JSONResponse(body, status_code=200 if job.finished else 202)
+
+
+@router.get("/check-visa/history")
+async def check_visa_history():
+    """Changes detected on the visa page, oldest first"""
+    from ..services.monitoring.change_detector import get_change_detector
+
+    return {"history": get_change_detector().get_history(VISA_TARGET.name)}
+
+
+@router.get("/monitors")
+async def list_monitors():
+    """Monitor targets with their current adaptive schedule and last outcome"""
+    monitors = core_scheduler.monitor_scheduler
+    if monitors is None:
+        return {"enabled": False, "monitors": []}
+    return {
+        "enabled": True,
+        "monitors": [
+            {"name": name, "url": target.url, **asdict(monitors.status[name])}
+            for name, target in monitors.targets.items()
+        ],
+    }
+
+
+def _epoch(moment: datetime) -> float:
+    # Naive times are UTC, like every time the API returns
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _time_range(since: Optional[datetime], until: Optional[datetime]):
+    """Epoch bounds of a query, defaulting to the last 24 hours"""
+    end = _epoch(until) if until else time.time()
+    start = _epoch(since) if since else end - 86400
+    if start >= end:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    return start, end
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+@router.get("/monitors/checks")
+async def monitor_checks(
+    target: str = VISA_TARGET.name,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 1000,
+):
+    """Recorded checks of a target in a time range, newest first"""
+    from ..services.monitoring.results_store import get_results_store
+
+    start, end = _time_range(since, until)
+    records = await asyncio.to_thread(
+        get_results_store().checks, target, start, end, limit
+    )
+    return {
+        "target": target,
+        "checks": [
+            {**asdict(record), "checked_at": _iso(record.checked_at)}
+            for record in records
+        ],
+    }
+
+
+@router.get("/monitors/stats")
+async def monitor_stats(
+    target: str = VISA_TARGET.name,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket_seconds: Optional[int] = None,
+):
+    """Availability ratio and latency percentiles, overall or per time bucket"""
+    from ..services.monitoring.results_store import get_results_store
+
+    start, end = _time_range(since, until)
+    if bucket_seconds is not None and bucket_seconds <= 0:
+        raise HTTPException(status_code=400, detail="bucket_seconds must be positive")
+    buckets = await asyncio.to_thread(
+        get_results_store().aggregate, target, start, end, bucket_seconds
+    )
+    return {
+        "target": target,
+        "buckets": [
+            {**bucket, "start": _iso(bucket["start"]), "end": _iso(bucket["end"])}
+            for bucket in buckets
+        ],
+    }
+
+
+@router.get("/monitors/availability")
+async def monitor_availability(
+    target: str = VISA_TARGET.name,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Periods in which the target was found available"""
+    from ..services.monitoring.results_store import get_results_store
+
+    start, end = _time_range(since, until)
+    windows = await asyncio.to_thread(
+        get_results_store().availability_windows, target, start, end
+    )
+    return {
+        "target": target,
+        "windows": [
+            {**window, "start": _iso(window["start"]), "end": _iso(window["end"])}
+            for window in windows
+        ],
+    }
+
+
+@router.get("/browser/stats")
+async def browser_stats():
+    """Browser pool usage, open sessions and bytes loaded per load profile"""
+    from ..services.core.browser import get_browser_pool
+    from ..services.core.browser_sessions import get_session_registry
+    from ..services.core.load_profiles import load_stats
+
+    return {
+        "pool": get_browser_pool().stats(),
+        "sessions": get_session_registry().stats(),
+        "navigation": load_stats.report(),
+    }
+
+
+@router.get("/cache/pages")
+async def page_cache_stats():
+    """Hit counters of the page-content cache"""
+    from ..services.core.page_cache import get_page_cache
+
+    return get_page_cache().report()
+
+
+@router.get("/cache/llm")
+async def llm_cache_stats():
+    """Hit, miss and coalescing counters of the LLM response cache per model"""
+    from ..services.llm_cache import llm_cache_report
+
+    return llm_cache_report()
+
+
+@router.get("/llm/models")
+async def llm_model_stats():
+    """Rolling latency, error rate, fallbacks and hedges per model"""
+    from ..services.llm_router import get_model_router
+
+    return get_model_router().report()
+
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Latency histograms, error counters and pool sizes for Prometheus"""
+    _read_gauges()
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _read_gauges():
+    """Copy current pool, queue, session and checkpointer sizes into the gauges"""
+    # A scrape never loads a subsystem; ones not imported yet have nothing to report
+    browser = sys.modules.get("app.services.core.browser")
+    if browser is not None:
+        pool = browser.get_browser_pool().stats()
+        metrics.browser_pool_contexts.set(pool["active_contexts"], state="active")
+        metrics.browser_pool_contexts.set(pool["warm_contexts"], state="warm")
+        metrics.browser_pool_contexts.set(pool["capacity"], state="capacity")
+    sessions = sys.modules.get("app.services.core.browser_sessions")
+    if sessions is not None:
+        metrics.browser_sessions.set(
+            sessions.get_session_registry().stats()["sessions"]
+        )
+
+    jobs = get_job_queue().report()
+    metrics.job_queue_jobs.set(jobs["queued"], state="queued")
+    metrics.job_queue_jobs.set(jobs["running"], state="running")
+
+    agent = chat_agent_stats()
+    checkpointer = agent["checkpointer"] if agent else None
+    if checkpointer:
+        metrics.checkpointer_threads.set(checkpointer["threads"])
+        metrics.checkpointer_bytes.set(checkpointer["bytes"])
+
+    llm_router = sys.modules.get("app.services.llm_router")
+    if llm_router is None:
+        return
+    for name, stats in llm_router.get_model_router().report().items():
+        metrics.llm_in_flight.set(stats["in_flight"], model=name, state="running")
+        metrics.llm_in_flight.set(stats["waiting"], model=name, state="waiting")
+
+
+@router.get("/screenshots")
+async def list_screenshots(session: str, limit: int = 50):
+    """Most recent screenshots of one chat thread"""
+    from ..services.core.screenshots import get_screenshot_store
+
+    # Listing across threads would hand out every thread id
+    store = get_screenshot_store()
+    return {
+        "stats": store.stats(),
+        "screenshots": [asdict(record) for record in store.recent(session, limit)],
+    }
+
+
+@router.get("/screenshots/{screenshot_id}")
+async def get_screenshot(screenshot_id: str):
+    """Serve a stored screenshot"""
+    from ..services.core.screenshots import get_screenshot_store
+
+    store = get_screenshot_store()
+    record = store.get(screenshot_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+    return FileResponse(store.path(record), media_type=record.media_type)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest, agent: "LangGraphAgent" = Depends(get_chat_agent)
+):
+    """Stream an agent reply as server-sent events"""
+    if request.model and request.model not in await agent.get_available_models():
+        raise HTTPException(status_code=400, detail=f"Unknown model: {request.model}")
+    thread_id = request.thread_id or uuid.uuid4().hex
+
+    async def events():
+        yield f"event: session\ndata: {json.dumps({'thread_id': thread_id})}\n\n"
+        async for event in agent.stream_chat(request.message, thread_id, request.model):
+            payload = json.dumps(event, default=str)
+            yield f"event: {event['type']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Thread-Id": thread_id,
+        },
+    )
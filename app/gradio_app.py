@@ -4,8 +4,6 @@ import os
 import nest_asyncio
 from dotenv import load_dotenv
 
-from .ui.gradio_interface import GradioInterface
-
 # Allow nested event loops for Jupyter compatibility
 nest_asyncio.apply()
 
@@ -26,6 +24,9 @@ async def main():
         print(f"⚠️  Warning: Missing environment variables: {missing_vars}")
         print("Some features may not work properly.")
 
+    # Gradio loads here rather than at import; the agent loads with the page
+    from .ui.gradio_interface import GradioInterface
+
     # Initialize and launch the interface
     interface = GradioInterface()
 
@@ -1,19 +1,107 @@
+import asyncio
+import importlib
+import inspect
+import os
+import sys
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from .api.routes import router
+from .services.core.leader import get_leader_lock, run_as_leader
+from .services.core.scheduler import MONITORING_ENABLED, start_scheduler
 
-# from .services.core.scheduler import start_scheduler
+# Comma-separated subsystems to load once the port is open: "agent" builds
+# the chat agent (LangGraph, LLM clients, tools), "browser" launches the
+# browser pool. Anything not warmed up loads on first use.
+API_WARM_UP = os.getenv("API_WARM_UP", "")
+
+# Shutdown hooks in order. Subsystems load lazily, so only the modules
+# that were imported have anything to close.
+SHUTDOWN_HOOKS = [
+    ("app.services.core.scheduler", "stop_scheduler"),
+    ("app.services.core.leader", "release_leader_lock"),
+    ("app.api.dependencies", "close_chat_agent"),
+    ("app.services.jobs.queue", "close_job_queue"),
+    ("app.services.jobs.store", "close_job_store"),
+    ("app.services.core.browser_sessions", "close_session_registry"),
+    ("app.services.core.browser", "close_browser_pool"),
+    ("app.services.notifications.dispatcher", "close_dispatcher"),
+    ("app.services.core.http_client", "close_http_client"),
+    ("app.services.core.screenshots", "close_screenshot_store"),
+    ("app.services.monitoring.results_store", "close_results_store"),
+    ("app.services.llm_cache", "close_llm_cache"),
+    ("app.services.core.tracing", "close_span_exporter"),
+]
+
+
+async def _import(module: str):
+    """Import a module on a worker thread so the loop keeps serving"""
+    return await asyncio.to_thread(importlib.import_module, module)
+
+
+async def _warm_up_agent():
+    dependencies = await _import("app.api.dependencies")
+    await _import("app.services.agents.langgraph_agent")
+    await dependencies.get_chat_agent()
+
+
+async def _warm_up_browser():
+    browser = await _import("app.services.core.browser")
+    await browser.get_browser_pool().start()
+
+
+WARM_UPS = {"agent": _warm_up_agent, "browser": _warm_up_browser}
+
+
+async def start_monitoring():
+    """Run scheduled monitors in whichever API worker wins the leader lock"""
+    try:
+        await _import("app.services.monitoring.scheduler")
+        await run_as_leader(get_leader_lock(), start_scheduler)
+    except Exception as e:
+        print(f"Failed to start scheduler: {e}")
+
+
+async def run_warm_ups():
+    """Load the subsystems named in API_WARM_UP"""
+    for name in [name.strip() for name in API_WARM_UP.split(",") if name.strip()]:
+        if name not in WARM_UPS:
+            print(f"Unknown warm-up: {name}")
+            continue
+        try:
+            await WARM_UPS[name]()
+        except Exception as e:
+            print(f"Warm-up of {name} failed: {e}")
+
+
+async def start_background_services():
+    """Start monitoring and run the configured warm-ups after startup"""
+    # Followers wait on the leader lock for good; warm-ups must not queue behind
+    tasks = [run_warm_ups()]
+    if MONITORING_ENABLED:
+        tasks.append(start_monitoring())
+    await asyncio.gather(*tasks)
+
+
+async def shutdown_services():
+    """Close every subsystem that was loaded"""
+    for module_name, hook in SHUTDOWN_HOOKS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            result = getattr(module, hook)()
+            if inspect.isawaitable(result):
+                await result
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # try:
-    #     start_scheduler()
-    # except Exception as e:
-    #     print(f"Failed to start scheduler: {e}")
+    # Heavy subsystems load in the background so the port opens right away
+    background = asyncio.create_task(start_background_services())
     yield
+    background.cancel()
+    await asyncio.gather(background, return_exceptions=True)
+    await shutdown_services()
 
 
 app = FastAPI(title="Alpha Agents API", lifespan=lifespan)
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ChatRequest(BaseModel):
+    message: str
+    # Omit to start a new conversation; reuse the returned id to continue it
+    thread_id: Optional[str] = None
+    # Any name from LLMService.available_models; defaults to the agent's model
+    model: Optional[str] = None
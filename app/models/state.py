@@ -6,3 +6,5 @@ from typing_extensions import TypedDict
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    # Rolling summary of turns that were dropped from `messages`
+    summary: str
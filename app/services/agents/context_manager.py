@@ -0,0 +1,157 @@
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+CONTEXT_MAX_PROMPT_TOKENS = int(os.getenv("CONTEXT_MAX_PROMPT_TOKENS", "12000"))
+CONTEXT_MAX_TOOL_RESULT_CHARS = int(os.getenv("CONTEXT_MAX_TOOL_RESULT_CHARS", "8000"))
+CONTEXT_STALE_TOOL_RESULT_CHARS = int(
+    os.getenv("CONTEXT_STALE_TOOL_RESULT_CHARS", "1000")
+)
+CONTEXT_SUMMARIZE = os.getenv("CONTEXT_SUMMARIZE", "true").lower() == "true"
+
+CLIPPED_SUFFIX = " chars omitted]"
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for your own future reference. Keep "
+    "facts, URLs, results of tool calls and any open requests from the user. "
+    "Be concise; at most a few short paragraphs."
+)
+
+
+@dataclass
+class PreparedContext:
+    """Prompt for one LLM call plus the state updates that produced it"""
+
+    messages: list[BaseMessage]
+    updates: list[BaseMessage] = field(default_factory=list)
+    summary: Optional[str] = None
+    prompt_tokens: int = 0
+    history_tokens: int = 0
+
+    def report(self) -> dict:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "history_tokens": self.history_tokens,
+            "summarized": self.summary is not None,
+        }
+
+
+class ContextManager:
+    """Keeps the prompt within a token budget before each LLM call
+
+    Tool results are clipped (harder once their turn is over), whole turns
+    that no longer fit the budget are removed from the graph state, and if
+    summarization is on they are folded into a rolling summary first.
+    """
+
+    def __init__(
+        self,
+        max_prompt_tokens: int = CONTEXT_MAX_PROMPT_TOKENS,
+        max_tool_result_chars: int = CONTEXT_MAX_TOOL_RESULT_CHARS,
+        stale_tool_result_chars: int = CONTEXT_STALE_TOOL_RESULT_CHARS,
+        summarize: bool = CONTEXT_SUMMARIZE,
+    ):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_tool_result_chars = max_tool_result_chars
+        self.stale_tool_result_chars = stale_tool_result_chars
+        self.summarize = summarize
+
+    async def prepare(
+        self, messages: list[BaseMessage], summary: str, llm
+    ) -> PreparedContext:
+        """Window, clip and summarize the history for the next LLM call"""
+        history_tokens = count_tokens_approximately(messages)
+        current_turn = _last_turn_start(messages)
+
+        # Clip tool output: stale turns are rewritten in state, the current
+        # turn is only clipped in the prompt
+        updates: list[BaseMessage] = []
+        compacted: list[BaseMessage] = []
+        for index, message in enumerate(messages):
+            limit = (
+                self.stale_tool_result_chars
+                if index < current_turn
+                else self.max_tool_result_chars
+            )
+            clipped = _clip_tool_result(message, limit)
+            if clipped is not message and index < current_turn:
+                updates.append(clipped)
+            compacted.append(clipped)
+
+        # Keep the most recent whole turns that fit the budget
+        budget = self.max_prompt_tokens - count_tokens_approximately(
+            _summary_messages(summary)
+        )
+        cut = current_turn
+        for start in reversed(_turn_starts(compacted)):
+            if count_tokens_approximately(compacted[start:]) > budget:
+                break
+            cut = start
+
+        new_summary = None
+        if cut > 0:
+            dropped = compacted[:cut]
+            if self.summarize:
+                new_summary = await self._summarize(summary, dropped, llm)
+                summary = new_summary
+            dropped_ids = {m.id for m in dropped}
+            updates = [m for m in updates if m.id not in dropped_ids]
+            updates.extend(RemoveMessage(id=m.id) for m in messages[:cut] if m.id)
+
+        prompt = _summary_messages(summary) + compacted[cut:]
+        return PreparedContext(
+            messages=prompt,
+            updates=updates,
+            summary=new_summary,
+            prompt_tokens=count_tokens_approximately(prompt),
+            history_tokens=history_tokens,
+        )
+
+    async def _summarize(self, summary: str, dropped: list[BaseMessage], llm) -> str:
+        transcript = "\n".join(
+            f"{message.type}: {message.content}" for message in dropped
+        )
+        if summary:
+            transcript = f"Earlier summary:\n{summary}\n\n{transcript}"
+        # No callbacks: the graph run's would stream the summary to the user
+        # as if it were part of the answer
+        response = await llm.ainvoke(
+            [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)],
+            config={"callbacks": []},
+        )
+        return response.content
+
+
+def _turn_starts(messages: list[BaseMessage]) -> list[int]:
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+
+def _last_turn_start(messages: list[BaseMessage]) -> int:
+    starts = _turn_starts(messages)
+    return starts[-1] if starts else 0
+
+
+def _clip_tool_result(message: BaseMessage, limit: int) -> BaseMessage:
+    if not isinstance(message, ToolMessage) or not isinstance(message.content, str):
+        return message
+    if len(message.content) <= limit or message.content.endswith(CLIPPED_SUFFIX):
+        return message
+    omitted = len(message.content) - limit
+    return message.model_copy(
+        update={"content": f"{message.content[:limit]}\n[... {omitted}{CLIPPED_SUFFIX}"}
+    )
+
+
+def _summary_messages(summary: str) -> list[BaseMessage]:
+    if not summary:
+        return []
+    return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")]
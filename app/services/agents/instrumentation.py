@@ -0,0 +1,204 @@
+import asyncio
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.services.core.metrics import (
+    agent_node_seconds,
+    agent_run_seconds,
+    tool_errors,
+    tool_seconds,
+)
+from app.services.core.tracing import Span, get_span_exporter, new_trace
+
+
+class AgentRunTracer(BaseCallbackHandler):
+    """Times one graph run, its nodes and its tool calls
+
+    Node and tool durations and tool failures go to the metrics registry.
+    With tracing enabled, the run also becomes a trace whose spans (run,
+    nodes, tools, chat model calls) are exported once the run finishes.
+    Create one per run.
+    """
+
+    # Recording is cheap; no need to hop to an executor for it
+    run_inline = True
+
+    def __init__(self, thread_id: str, model_name: str):
+        self.thread_id = thread_id
+        self.model_name = model_name
+        self.exporter = get_span_exporter()
+        self.spans: dict[UUID, Span] = {}
+        self.finished: list[Span] = []
+        # Runs that get no span of their own, mapped to their nearest traced ancestor
+        self._parents: dict[UUID, Optional[UUID]] = {}
+        self._root: Optional[UUID] = None
+
+    def _ancestor(self, parent_run_id: Optional[UUID]) -> Optional[Span]:
+        while parent_run_id is not None and parent_run_id not in self.spans:
+            parent_run_id = self._parents.get(parent_run_id)
+        return self.spans.get(parent_run_id) if parent_run_id else None
+
+    def _start(
+        self,
+        run_id: UUID,
+        parent_run_id: Optional[UUID],
+        name: str,
+        kind: str,
+        **attributes,
+    ):
+        parent = self._ancestor(parent_run_id)
+        if parent is None:
+            # Only reached for the graph run itself
+            self.spans[run_id] = new_trace(name, **attributes)
+        else:
+            self.spans[run_id] = parent.child(name, kind, **attributes)
+
+    def _end(
+        self, run_id: UUID, error: Optional[BaseException] = None
+    ) -> Optional[Span]:
+        self._parents.pop(run_id, None)
+        span = self.spans.pop(run_id, None)
+        if span is not None:
+            span.end(error)
+            if self.exporter is not None:
+                self.finished.append(span)
+        return span
+
+    def on_chain_start(
+        self,
+        serialized,
+        inputs,
+        *,
+        run_id,
+        parent_run_id=None,
+        metadata=None,
+        **kwargs: Any,
+    ):
+        name = kwargs.get("name") or ""
+        if self._root is None and parent_run_id is None:
+            self._root = run_id
+            self._start(
+                run_id,
+                None,
+                f"agent.run {name}".strip(),
+                "server",
+                thread_id=self.thread_id,
+                model=self.model_name,
+            )
+        elif metadata and name and metadata.get("langgraph_node") == name:
+            self._start(
+                run_id,
+                parent_run_id,
+                f"agent.node {name}",
+                "internal",
+                node=name,
+                step=metadata.get("langgraph_step"),
+            )
+        else:
+            self._parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any):
+        self._finish_chain(run_id, None)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any):
+        self._finish_chain(run_id, error)
+
+    def _finish_chain(self, run_id: UUID, error: Optional[BaseException]):
+        span = self._end(run_id, error)
+        if span is None:
+            return
+        if run_id == self._root:
+            if error is None:
+                outcome = "ok"
+            elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+                outcome = "cancelled"
+            elif isinstance(error, TimeoutError):
+                outcome = "timeout"
+            else:
+                outcome = "error"
+            span.attributes["outcome"] = outcome
+            agent_run_seconds.observe(span.duration_s, outcome=outcome)
+            self._export()
+        else:
+            agent_node_seconds.observe(span.duration_s, node=span.attributes["node"])
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs: Any
+    ):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._start(run_id, parent_run_id, f"tool {name}", "internal", tool=name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any):
+        # Tools report most failures as a "❌ ..." answer rather than raising
+        content = getattr(output, "content", output)
+        failed = getattr(output, "status", None) == "error" or (
+            isinstance(content, str) and content.startswith("❌")
+        )
+        span = self._end(run_id)
+        if span is not None:
+            name = span.attributes["tool"]
+            tool_seconds.observe(span.duration_s, tool=name)
+            if failed:
+                span.status = {"code": "ERROR", "message": str(content)[:200]}
+                tool_errors.inc(tool=name)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any):
+        span = self._end(run_id, error)
+        if span is not None:
+            name = span.attributes["tool"]
+            tool_seconds.observe(span.duration_s, tool=name)
+            tool_errors.inc(tool=name)
+
+    def on_chat_model_start(
+        self,
+        serialized,
+        messages,
+        *,
+        run_id,
+        parent_run_id=None,
+        metadata=None,
+        **kwargs: Any,
+    ):
+        if self.exporter is None:
+            return
+        model = (
+            (metadata or {}).get("ls_model_name")
+            or (serialized or {}).get("name")
+            or "chat_model"
+        )
+        self._start(
+            run_id,
+            parent_run_id,
+            f"llm {model}",
+            "client",
+            model=model,
+            messages=len(messages[0]) if messages else 0,
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any):
+        span = self.spans.get(run_id)
+        if span is not None:
+            message = (
+                getattr(response.generations[0][0], "message", None)
+                if response.generations and response.generations[0]
+                else None
+            )
+            usage = getattr(message, "usage_metadata", None) or {}
+            span.attributes["input_tokens"] = usage.get("input_tokens")
+            span.attributes["output_tokens"] = usage.get("output_tokens")
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any):
+        self._end(run_id, error)
+
+    def _export(self):
+        if self.exporter is None:
+            return
+        # Spans left open by a cancelled run end with it
+        for run_id in list(self.spans):
+            self._end(run_id, asyncio.CancelledError())
+        # Only queued here: the writer thread does the disk append
+        self.exporter.export(self.finished)
+        self.finished = []
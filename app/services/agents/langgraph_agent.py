@@ -1,49 +1,133 @@
-from langgraph.checkpoint.memory import MemorySaver
+import asyncio
+import os
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+
 from langgraph.graph import START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
 
 from app.models.state import State
+from app.services.agents.context_manager import ContextManager
+from app.services.agents.instrumentation import AgentRunTracer
+from app.services.core.checkpointer import close_checkpointer, create_checkpointer
 from app.services.llm_service import LLMService
-from app.services.tools.browser_tools import BrowserToolsService
+from app.services.tools.browser_tools import get_browser_tools_service
+from app.services.tools.fetch_tool import fetch_page_tool
 from app.services.tools.notification_tool import notification_tool
 from app.services.tools.screenshot_tool import screenshot_tool
 from app.services.tools.visa_tool import visa_check_tool
 
 
+DEFAULT_MODEL = "OpenRouter - Claude 3.5 Sonnet"
+
+# Comma-separated model names (or "all") whose graphs are built at startup
+AGENT_PREWARM_MODELS = os.getenv("AGENT_PREWARM_MODELS", "")
+# Upper bound on one chatbot step, summarization and model fallbacks included
+AGENT_STEP_TIMEOUT_SECONDS = float(os.getenv("AGENT_STEP_TIMEOUT_SECONDS", "180"))
+
+TIMEOUT_REPLY = "❌ The model did not answer in time. Please try again."
+
+
 class LangGraphAgent:
     """Main LangGraph agent service"""
 
     def __init__(self):
         self.llm_service = LLMService()
-        self.browser_service = BrowserToolsService()
-        self.graph = None
+        self.browser_service = get_browser_tools_service()
+        self.checkpointer = None
+        self.context_manager = ContextManager()
         self.current_model = None
         self.tools = []
+        # Compiled graphs and (llm, llm_with_tools) pairs, keyed by model name
+        self.graphs: dict[str, CompiledStateGraph] = {}
+        self.llms: dict[str, tuple] = {}
+        self._lock = asyncio.Lock()
 
-    async def initialize(self, model_name: str = "OpenRouter - Claude 3.5 Sonnet"):
+    @property
+    def graph(self) -> Optional[CompiledStateGraph]:
+        """Compiled graph for the current model"""
+        return self.graphs.get(self.current_model)
+
+    async def initialize(self, model_name: str = DEFAULT_MODEL):
         """Initialize the agent with a specific model"""
+        await self.get_graph(model_name)
         self.current_model = model_name
-        llm = self.llm_service.get_model(model_name)
-
-        # Initialize browser tools
-        browser_tools = await self.browser_service.get_tools()
 
-        # Combine all tools
-        self.tools = [
-            visa_check_tool,
-            notification_tool,
-            screenshot_tool,
-        ] + browser_tools
+        if AGENT_PREWARM_MODELS:
+            await self.warm_up(
+                None if AGENT_PREWARM_MODELS == "all" else AGENT_PREWARM_MODELS
+            )
 
-        # Bind tools to LLM
-        llm_with_tools = llm.bind_tools(self.tools)
+    async def _setup(self):
+        """Create the tools and the checkpointer shared by every model's graph"""
+        async with self._lock:
+            if not self.tools:
+                # Initialize browser tools
+                browser_tools = await self.browser_service.get_tools()
+
+                # Combine all tools; fetch_page is the default way to read a page
+                self.tools = [
+                    fetch_page_tool,
+                    visa_check_tool,
+                    notification_tool,
+                    screenshot_tool,
+                ] + browser_tools
+
+            # One checkpointer for every model so switching keeps history
+            if self.checkpointer is None:
+                self.checkpointer = await create_checkpointer()
+
+    async def warm_up(self, model_names: Optional[str] = None):
+        """Build graphs ahead of time for a comma-separated list of models"""
+        if model_names is None:
+            names = self.llm_service.get_available_models()
+        else:
+            names = [name.strip() for name in model_names.split(",") if name.strip()]
+        for name in names:
+            await self.get_graph(name)
+
+    async def get_graph(self, model_name: str) -> CompiledStateGraph:
+        """Return the compiled graph for a model, building it on first use"""
+        if model_name not in self.graphs:
+            if not self.tools or self.checkpointer is None:
+                await self._setup()
+            async with self._lock:
+                if model_name not in self.graphs:
+                    self.graphs[model_name] = self._build_graph(model_name)
+        return self.graphs[model_name]
+
+    def _get_llm(self, model_name: str) -> tuple:
+        """Return the cached (llm, llm_with_tools) pair for a model"""
+        if model_name not in self.llms:
+            llm = self.llm_service.get_routed_model(model_name)
+            self.llms[model_name] = (llm, llm.bind_tools(self.tools))
+        return self.llms[model_name]
+
+    def _build_graph(self, model_name: str) -> CompiledStateGraph:
+        llm, llm_with_tools = self._get_llm(model_name)
 
         # Build the graph
         graph_builder = StateGraph(State)
 
-        # Add chatbot node
-        def chatbot(state: State):
-            return {"messages": [llm_with_tools.invoke(state["messages"])]}
+        # Add chatbot node; async so a slow completion never blocks the loop,
+        # and cancelling the run cancels the upstream request
+        async def step(state: State):
+            prepared = await self.context_manager.prepare(
+                state["messages"], state.get("summary", ""), llm
+            )
+            return prepared, await llm_with_tools.ainvoke(prepared.messages)
+
+        async def chatbot(state: State):
+            prepared, response = await asyncio.wait_for(
+                step(state), AGENT_STEP_TIMEOUT_SECONDS
+            )
+            response.response_metadata["context"] = prepared.report()
+
+            update = {"messages": prepared.updates + [response]}
+            if prepared.summary is not None:
+                update["summary"] = prepared.summary
+            return update
 
         graph_builder.add_node("chatbot", chatbot)
         graph_builder.add_node("tools", ToolNode(tools=self.tools))
@@ -53,34 +137,116 @@ class LangGraphAgent:
         graph_builder.add_edge("tools", "chatbot")
         graph_builder.add_edge(START, "chatbot")
 
-        # Compile with memory
-        memory = MemorySaver()
-        self.graph = graph_builder.compile(checkpointer=memory)
+        return graph_builder.compile(checkpointer=self.checkpointer)
 
     async def switch_model(self, model_name: str):
-        """Switch to a different model"""
+        """Switch the default model; cached graphs make this instant"""
         if model_name != self.current_model:
-            await self.initialize(model_name)
+            await self.get_graph(model_name)
+            self.current_model = model_name
 
-    async def chat(self, message: str, thread_id: str = "default") -> str:
+    async def chat(
+        self, message: str, thread_id: str, model_name: Optional[str] = None
+    ) -> str:
         """Process a chat message"""
-        if not self.graph:
-            await self.initialize()
-
-        config = {"configurable": {"thread_id": thread_id}}
+        model_name = model_name or self.current_model or DEFAULT_MODEL
+        config = {
+            "configurable": {"thread_id": thread_id},
+            "callbacks": [AgentRunTracer(thread_id, model_name)],
+        }
 
         try:
-            result = await self.graph.ainvoke(
+            graph = await self.get_graph(model_name)
+            result = await graph.ainvoke(
                 {"messages": [{"role": "user", "content": message}]}, config=config
             )
             return result["messages"][-1].content
+        except TimeoutError:
+            return TIMEOUT_REPLY
         except (ValueError, RuntimeError, ImportError, KeyError) as e:
             return f"❌ Error processing message: {str(e)}"
 
+    async def stream_chat(
+        self, message: str, thread_id: str, model_name: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """Stream LLM tokens, tool events and the final answer for a message"""
+        model_name = model_name or self.current_model or DEFAULT_MODEL
+        config = {
+            "configurable": {"thread_id": thread_id},
+            "callbacks": [AgentRunTracer(thread_id, model_name)],
+        }
+
+        try:
+            # Inside the try: an unknown model is an error event, not a cut stream
+            graph = await self.get_graph(model_name)
+            # Closing this generator (a client went away) cancels the graph run
+            async with aclosing(
+                graph.astream_events(
+                    {"messages": [{"role": "user", "content": message}]},
+                    config=config,
+                    version="v2",
+                )
+            ) as events:
+                async for event in events:
+                    kind = event["event"]
+                    if kind == "on_chat_model_stream":
+                        token = _content_text(event["data"]["chunk"].content)
+                        if token:
+                            yield {"type": "token", "content": token}
+                    elif kind == "on_tool_start":
+                        yield {
+                            "type": "tool_start",
+                            "name": event["name"],
+                            "input": event["data"].get("input"),
+                        }
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield {
+                            "type": "tool_end",
+                            "name": event["name"],
+                            "output": _content_text(getattr(output, "content", output)),
+                        }
+
+            state = await graph.aget_state(config)
+            last_message = state.values["messages"][-1]
+            yield {
+                "type": "final",
+                "content": _content_text(last_message.content),
+                "context": last_message.response_metadata.get("context"),
+            }
+        except TimeoutError:
+            yield {"type": "error", "content": TIMEOUT_REPLY}
+        except (ValueError, RuntimeError, ImportError, KeyError) as e:
+            yield {"type": "error", "content": f"❌ Error processing message: {str(e)}"}
+
     async def get_available_models(self) -> list:
         """Get list of available models"""
         return self.llm_service.get_available_models()
 
+    def stats(self) -> dict:
+        """Cached graphs and checkpointer usage"""
+        stats = getattr(self.checkpointer, "stats", None)
+        return {
+            "graphs": len(self.graphs),
+            "checkpointer": stats() if stats is not None else None,
+        }
+
     async def close(self):
         """Clean up resources"""
         await self.browser_service.close()
+        self.graphs.clear()
+        self.llms.clear()
+        if self.checkpointer is not None:
+            await close_checkpointer(self.checkpointer)
+            self.checkpointer = None
+        self.context_manager = ContextManager()
+
+
+def _content_text(content) -> str:
+    """Flatten message content (plain or a list of content blocks) to text"""
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return "" if content is None else str(content)
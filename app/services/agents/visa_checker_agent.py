@@ -1,51 +1,50 @@
+import httpx
+from playwright.async_api import Error as PlaywrightError
+
 from app.services.agents.base_agent import BaseAgent
-from app.services.core.browser import get_browser
 from app.services.core.email_service import send_email
+from app.services.monitoring.change_detector import get_change_detector
+from app.services.monitoring.targets import VISA_TARGET, MonitorTarget
 
 
 class VisaCheckerAgent(BaseAgent):
     name = "visa_checker"
 
+    def __init__(self, target: MonitorTarget = VISA_TARGET):
+        self.target = target
+
     async def run(self):
         """Run the visa checking process"""
         try:
-            browser, page = await get_browser()
-            await page.goto("https://www.eoiparis.gov.in/page/e-visa/")
-            content = await page.content()
+            result = await get_change_detector().check(self.target)
 
-            available = "Available" in content  # crude check, can be improved
-            await browser.close()
-
-            if available:
+            # Only alert when the page changed, not on every poll of the same page
+            if result.changed and result.available:
                 await self.notify("Visa booking slots are available!")
-            else:
+            elif not result.available:
                 print("No availability detected.")
-        except (RuntimeError, ConnectionError) as e:
+        except (RuntimeError, ConnectionError, httpx.HTTPError, PlaywrightError) as e:
             print(f"Error checking visa availability: {str(e)}")
 
     async def run_manual(self):
         """Run manual visa check and return detailed results"""
         try:
-            browser, page = await get_browser()
-            await page.goto("https://www.eoiparis.gov.in/page/e-visa/")
-            content = await page.content()
-
-            # Extract text content for inspection
-            text_content = await page.inner_text("body")
-            await browser.close()
-
-            available = "Available" in content
+            result = await get_change_detector().check(self.target)
+            snapshot = result.snapshot
 
             return {
-                "available": available,
-                "page_content": text_content[:2000],
-                "url": "https://www.eoiparis.gov.in/page/e-visa/",
+                "available": snapshot.available,
+                "page_content": snapshot.text_excerpt,
+                "url": self.target.url,
+                "changed": result.changed,
+                "slots": snapshot.slots,
+                "checked_at": snapshot.fetched_at.isoformat(),
             }
-        except (RuntimeError, ConnectionError) as e:
+        except (RuntimeError, ConnectionError, httpx.HTTPError, PlaywrightError) as e:
             return {
                 "available": False,
                 "page_content": f"Error: {str(e)}",
-                "url": "https://www.eoiparis.gov.in/page/e-visa/",
+                "url": self.target.url,
             }
 
     async def analyze(self, data):
@@ -1,8 +1,281 @@
+import asyncio
+import math
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import async_playwright
 
+from app.services.core.leader import API_WORKERS, FileLock, SlotLocks
+from app.services.core.metrics import browser_launch_seconds
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "4"))
+BROWSER_WARM_CONTEXTS = int(os.getenv("BROWSER_WARM_CONTEXTS", "1"))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "200"))
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "30"))
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+# Browsers across every API worker on the host (0 = no cap); each pool
+# launches as many of its BROWSER_POOL_SIZE as there are free slots, but
+# no more than its share of the cap so the first worker up can't take all
+BROWSER_MAX_TOTAL = int(os.getenv("BROWSER_MAX_TOTAL", "0"))
+
+
+class BrowserPoolExhausted(RuntimeError):
+    """Raised when no browser context becomes free within the acquire timeout"""
+
+
+class PooledBrowser:
+    """A long-lived Chromium instance and the warm contexts parked on it"""
+
+    def __init__(self, browser: Browser, host_slot: Optional[FileLock] = None):
+        self.browser = browser
+        # Held for the browser's lifetime and passed on when it is recycled
+        self.host_slot = host_slot
+        self.uses = 0
+        self.active = 0
+        self.crashed = False
+        self.warm_contexts: list[BrowserContext] = []
+        browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, _browser: Browser):
+        self.crashed = True
+
+    @property
+    def healthy(self) -> bool:
+        return not self.crashed and self.browser.is_connected()
+
+
+class BrowserLease:
+    """An isolated browser context checked out of the pool"""
+
+    def __init__(self, slot: PooledBrowser, context: BrowserContext):
+        self.slot = slot
+        self.context = context
+        self.failed = False
+
+    async def new_page(self) -> Page:
+        """Open a page inside the leased context"""
+        return await self.context.new_page()
+
+
+class BrowserPool:
+    """Process-wide pool of Chromium instances leasing out isolated contexts"""
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        contexts_per_browser: int = BROWSER_CONTEXTS_PER_BROWSER,
+        warm_contexts: int = BROWSER_WARM_CONTEXTS,
+        max_uses: int = BROWSER_MAX_USES,
+        acquire_timeout: float = BROWSER_ACQUIRE_TIMEOUT,
+        headless: bool = BROWSER_HEADLESS,
+        max_total: int = BROWSER_MAX_TOTAL,
+        workers: int = API_WORKERS,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.warm_contexts = warm_contexts
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.headless = headless
+        self.host_slots = SlotLocks("browser", max_total) if max_total else None
+        self.host_share = math.ceil(max_total / max(workers, 1)) if max_total else 0
+        self.playwright: Optional[Playwright] = None
+        self.slots: list[PooledBrowser] = []
+        self._capacity = asyncio.Semaphore(size * contexts_per_browser)
+        self._lock = asyncio.Lock()
+        # Serializes start() so waiting on host slots doesn't hold self._lock
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self):
+        """Start the Playwright driver and launch the pooled browsers"""
+        async with self._start_lock:
+            if self._started:
+                return
+            host_slots = await self._take_host_slots()
+            async with self._lock:
+                try:
+                    self.playwright = await async_playwright().start()
+                    for host_slot in host_slots:
+                        self.slots.append(await self._launch(host_slot))
+                except BaseException:
+                    for host_slot in host_slots[len(self.slots) :]:
+                        if host_slot is not None:
+                            host_slot.release()
+                    raise
+                self._capacity = asyncio.Semaphore(
+                    len(self.slots) * self.contexts_per_browser
+                )
+                self._started = True
+
+    async def _take_host_slots(self) -> list[Optional[FileLock]]:
+        """Claim host-wide slots: wait for one, then take free ones up to our share"""
+        if self.host_slots is None:
+            return [None] * self.size
+        first = await self.host_slots.acquire(self.acquire_timeout)
+        if first is None:
+            raise BrowserPoolExhausted(
+                f"All {self.host_slots.count} host browser slots are taken"
+            )
+        taken = [first]
+        while len(taken) < min(self.size, self.host_share):
+            host_slot = self.host_slots.try_acquire()
+            if host_slot is None:
+                break
+            taken.append(host_slot)
+        return taken
+
+    async def _launch(self, host_slot: Optional[FileLock] = None) -> PooledBrowser:
+        with browser_launch_seconds.time():
+            browser = await self.playwright.chromium.launch(headless=self.headless)
+            slot = PooledBrowser(browser, host_slot)
+            for _ in range(self.warm_contexts):
+                slot.warm_contexts.append(await browser.new_context())
+        return slot
+
+    async def _recycle(self, slot: PooledBrowser):
+        """Replace a crashed or worn-out browser with a fresh one"""
+        try:
+            await slot.browser.close()
+        except PlaywrightError:
+            pass
+        # Already replaced by acquire() while its last leases were out
+        if slot not in self.slots:
+            return
+        self.slots[self.slots.index(slot)] = await self._launch(slot.host_slot)
+
+    def _pick_slot(self) -> PooledBrowser:
+        candidates = [s for s in self.slots if s.active < self.contexts_per_browser]
+        # Worn-out browsers get no new leases while a fresh one has room, so
+        # they drain and get recycled even when the pool never goes idle
+        fresh = [s for s in candidates if s.uses < self.max_uses]
+        return min(fresh or candidates, key=lambda s: (not s.healthy, s.active))
+
+    async def acquire(self) -> BrowserLease:
+        """Check out an isolated context, waiting while the pool is saturated"""
+        if not self._started:
+            await self.start()
+
+        try:
+            await asyncio.wait_for(self._capacity.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError as e:
+            raise BrowserPoolExhausted(
+                f"No browser context free after {self.acquire_timeout}s"
+            ) from e
+
+        try:
+            async with self._lock:
+                slot = self._pick_slot()
+                if not slot.healthy or (
+                    slot.uses >= self.max_uses and slot.active == 0
+                ):
+                    await self._recycle(slot)
+                    slot = self._pick_slot()
+                slot.active += 1
+                slot.uses += 1
+            if slot.warm_contexts:
+                context = slot.warm_contexts.pop()
+            else:
+                context = await slot.browser.new_context()
+            return BrowserLease(slot, context)
+        except BaseException:
+            self._capacity.release()
+            raise
+
+    async def release(self, lease: BrowserLease):
+        """Return a lease, discarding its context and recycling if needed"""
+        slot = lease.slot
+        try:
+            try:
+                await lease.context.close()
+            except PlaywrightError:
+                lease.failed = True
+
+            async with self._lock:
+                slot.active -= 1
+                if lease.failed or not slot.healthy:
+                    slot.crashed = True
+                if slot.active == 0 and (slot.crashed or slot.uses >= self.max_uses):
+                    await self._recycle(slot)
+                elif slot.healthy and len(slot.warm_contexts) < self.warm_contexts:
+                    slot.warm_contexts.append(await slot.browser.new_context())
+        except PlaywrightError:
+            slot.crashed = True
+        finally:
+            self._capacity.release()
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserContext]:
+        """Lease an isolated browser context for the duration of the block"""
+        lease = await self.acquire()
+        try:
+            yield lease.context
+        except PlaywrightError:
+            lease.failed = True
+            raise
+        finally:
+            await self.release(lease)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Lease a fresh page inside an isolated browser context"""
+        async with self.lease() as context:
+            yield await context.new_page()
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage"""
+        return {
+            "browsers": len(self.slots),
+            "healthy": sum(1 for s in self.slots if s.healthy),
+            "active_contexts": sum(s.active for s in self.slots),
+            "warm_contexts": sum(len(s.warm_contexts) for s in self.slots),
+            "capacity": (len(self.slots) if self._started else self.size)
+            * self.contexts_per_browser,
+            "host_cap": self.host_slots.count if self.host_slots else None,
+        }
+
+    async def close(self):
+        """Close every browser and stop the Playwright driver"""
+        async with self._lock:
+            for slot in self.slots:
+                try:
+                    await slot.browser.close()
+                except PlaywrightError:
+                    pass
+                if slot.host_slot is not None:
+                    slot.host_slot.release()
+            self.slots = []
+            if self.playwright:
+                await self.playwright.stop()
+                self.playwright = None
+            self._started = False
+
+
+_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+@asynccontextmanager
+async def lease_page() -> AsyncIterator[Page]:
+    """Lease a page from the shared browser pool"""
+    async with get_browser_pool().page() as page:
+        yield page
+
 
-async def get_browser():
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(headless=True)
-    page = await browser.new_page()
-    return browser, page
+async def close_browser_pool():
+    """Shut down the shared browser pool if it was started"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
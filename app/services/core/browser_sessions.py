@@ -0,0 +1,256 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+from app.services.core.browser import BrowserLease, BrowserPool, get_browser_pool
+from app.services.core.load_profiles import navigate
+
+BROWSER_SESSION_TTL_SECONDS = int(os.getenv("BROWSER_SESSION_TTL_SECONDS", "900"))
+# Sessions hold a pool context each; keep some free for monitor renders
+BROWSER_MAX_SESSIONS = int(os.getenv("BROWSER_MAX_SESSIONS", "6"))
+BROWSER_SESSION_SWEEP_SECONDS = int(os.getenv("BROWSER_SESSION_SWEEP_SECONDS", "60"))
+
+DEFAULT_SESSION = "default"
+
+
+def session_id(config: Optional[RunnableConfig]) -> str:
+    """Browser session for a tool call: the conversation's thread id"""
+    configurable = (config or {}).get("configurable", {})
+    return str(configurable.get("thread_id") or DEFAULT_SESSION)
+
+
+@dataclass
+class BrowserSession:
+    """A conversation's page, open in a context leased from the pool"""
+
+    session_id: str
+    lease: BrowserLease
+    page: Page
+    last_used: float = field(default_factory=time.monotonic)
+    # Tool calls from one LLM turn run concurrently but share the page
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class BrowserSessionRegistry:
+    """Maps conversation threads to their own page in the shared browser pool
+
+    The Playwright tools, screenshots and visa-check renders of a thread all
+    act on the same page. Sessions idle for longer than the TTL are closed by
+    a background sweep, and the least recently used one is closed when a new
+    thread would go over the session limit.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        ttl_seconds: int = BROWSER_SESSION_TTL_SECONDS,
+        max_sessions: int = BROWSER_MAX_SESSIONS,
+        sweep_seconds: int = BROWSER_SESSION_SWEEP_SECONDS,
+    ):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.sweep_seconds = sweep_seconds
+        self.sessions: dict[str, BrowserSession] = {}
+        # Navigations answered from the page cache, loaded on the next use
+        self.deferred: dict[str, str] = {}
+        # One lock per thread, so opening a page for one thread never waits
+        # on another thread's lease or close
+        self._thread_locks: dict[str, asyncio.Lock] = {}
+        self._opening = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the idle-session sweep on the running loop"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def get(self, session_id: str) -> BrowserSession:
+        """Return a thread's session, opening a page for it if needed"""
+        self.start()
+        async with self._thread_lock(session_id):
+            session = self.sessions.get(session_id)
+            if session is not None and (
+                session.lease.failed or session.page.is_closed()
+            ):
+                await self._close(self.sessions.pop(session_id))
+                session = None
+
+            if session is None:
+                session = await self._open(session_id)
+            session.last_used = time.monotonic()
+            return session
+
+    def _thread_lock(self, session_id: str) -> asyncio.Lock:
+        return self._thread_locks.setdefault(session_id, asyncio.Lock())
+
+    async def _open(self, session_id: str) -> BrowserSession:
+        self._opening += 1
+        try:
+            await self._evict()
+            pool = self.pool or get_browser_pool()
+            lease = await pool.acquire()
+            try:
+                page = await lease.new_page()
+            except PlaywrightError:
+                lease.failed = True
+                await pool.release(lease)
+                raise
+        finally:
+            self._opening -= 1
+        session = self.sessions[session_id] = BrowserSession(session_id, lease, page)
+        return session
+
+    async def _evict(self):
+        """Close least recently used sessions to make room for one more"""
+        # Pages being opened count, so concurrent opens don't overshoot
+        while len(self.sessions) + self._opening > self.max_sessions:
+            idle = [s for s in self.sessions.values() if not s.lock.locked()]
+            if not idle:
+                # Every page is mid-use; the pool's own limit bounds us
+                return
+            oldest = min(idle, key=lambda s: s.last_used)
+            self.deferred.pop(oldest.session_id, None)
+            await self._close(self.sessions.pop(oldest.session_id))
+
+    def defer(self, session_id: str, url: str):
+        """Record a navigation without loading it until the page is used"""
+        self.deferred[session_id] = url
+
+    def current_url(self, session_id: str) -> Optional[str]:
+        """URL the thread is on, counting a deferred navigation"""
+        if session_id in self.deferred:
+            return self.deferred[session_id]
+        session = self.sessions.get(session_id)
+        return session.page.url if session else None
+
+    @asynccontextmanager
+    async def page(
+        self, session_id: str, load_deferred: bool = True
+    ) -> AsyncIterator[Page]:
+        """Use a thread's page exclusively for the duration of the block
+
+        A deferred navigation is loaded first, unless the caller is about to
+        navigate anyway (load_deferred=False).
+        """
+        session = await self.get(session_id)
+        async with session.lock:
+            try:
+                url = self.deferred.pop(session_id, None)
+                if url is not None and load_deferred:
+                    await navigate(session.page, url)
+                yield session.page
+            except PlaywrightError:
+                # A dead page is replaced on the thread's next call
+                if session.page.is_closed():
+                    session.lease.failed = True
+                raise
+            finally:
+                session.last_used = time.monotonic()
+
+    async def close_session(self, session_id: str):
+        """Close a thread's page and return its context to the pool"""
+        async with self._thread_lock(session_id):
+            self.deferred.pop(session_id, None)
+            session = self.sessions.pop(session_id, None)
+            if session is not None:
+                await self._close(session)
+
+    async def _close(self, session: BrowserSession):
+        """Release a session already removed from the registry"""
+        try:
+            async with session.lock:
+                await (self.pool or get_browser_pool()).release(session.lease)
+        finally:
+            lock = self._thread_locks.get(session.session_id)
+            if (
+                lock is not None
+                and not lock.locked()
+                and session.session_id not in self.sessions
+            ):
+                del self._thread_locks[session.session_id]
+
+    async def sweep(self) -> int:
+        """Close sessions idle for longer than the TTL"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        idle = [
+            s
+            for s in self.sessions.values()
+            if s.last_used < cutoff and not s.lock.locked()
+        ]
+        closed = 0
+        for session in idle:
+            # An earlier close may have let the thread replace its session
+            if self.sessions.get(session.session_id) is session:
+                self.deferred.pop(session.session_id, None)
+                await self._close(self.sessions.pop(session.session_id))
+                closed += 1
+        return closed
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await self.sweep()
+            except PlaywrightError as e:
+                print(f"Browser session sweep failed: {e}")
+
+    def stats(self) -> dict:
+        """Open sessions and how long each has been idle"""
+        now = time.monotonic()
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "idle_seconds": {
+                s.session_id: round(now - s.last_used) for s in self.sessions.values()
+            },
+        }
+
+    async def close(self):
+        """Close every session and stop the sweep"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        self.deferred.clear()
+        for session in sessions:
+            try:
+                await self._close(session)
+            except PlaywrightError:
+                pass
+
+
+_registry: Optional[BrowserSessionRegistry] = None
+
+
+def get_session_registry() -> BrowserSessionRegistry:
+    """Return the process-wide browser session registry"""
+    global _registry
+    if _registry is None:
+        _registry = BrowserSessionRegistry()
+    return _registry
+
+
+@asynccontextmanager
+async def session_page(
+    session_id: str, load_deferred: bool = True
+) -> AsyncIterator[Page]:
+    """Use a conversation's page from the shared session registry"""
+    async with get_session_registry().page(session_id, load_deferred) as page:
+        yield page
+
+
+async def close_session_registry():
+    """Close all browser sessions if the registry was used"""
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
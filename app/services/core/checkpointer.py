@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.services.core.leader import API_WORKERS
+
+# Several workers share conversations through SQLite; one keeps them in memory
+CHECKPOINTER_BACKEND = os.getenv(
+    "CHECKPOINTER_BACKEND", "sqlite" if API_WORKERS > 1 else "memory"
+)
+CHECKPOINTER_SQLITE_PATH = os.getenv("CHECKPOINTER_SQLITE_PATH", "data/checkpoints.db")
+CHECKPOINTER_MAX_THREADS = int(os.getenv("CHECKPOINTER_MAX_THREADS", "500"))
+CHECKPOINTER_TTL_SECONDS = float(os.getenv("CHECKPOINTER_TTL_SECONDS", "3600"))
+CHECKPOINTER_MAX_BYTES = int(os.getenv("CHECKPOINTER_MAX_BYTES", str(256 * 1024**2)))
+CHECKPOINTER_CHECKPOINTS_PER_THREAD = int(
+    os.getenv("CHECKPOINTER_CHECKPOINTS_PER_THREAD", "4")
+)
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer with LRU/TTL eviction and a memory cap
+
+    Only the latest few checkpoints of each thread are kept, and whole
+    threads are dropped once they are idle for longer than the TTL or when
+    the thread count or serialized size exceeds its limit (least recently
+    used first).
+    """
+
+    def __init__(
+        self,
+        max_threads: int = CHECKPOINTER_MAX_THREADS,
+        ttl_seconds: float = CHECKPOINTER_TTL_SECONDS,
+        max_bytes: int = CHECKPOINTER_MAX_BYTES,
+        checkpoints_per_thread: int = CHECKPOINTER_CHECKPOINTS_PER_THREAD,
+    ):
+        super().__init__()
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.checkpoints_per_thread = checkpoints_per_thread
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        self._thread_bytes: dict[str, int] = {}
+        self._evict_lock = threading.RLock()
+
+    def _touch(self, thread_id: str):
+        with self._evict_lock:
+            self._last_access[thread_id] = time.monotonic()
+            self._last_access.move_to_end(thread_id)
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._last_access:
+            self._touch(thread_id)
+        return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        with self._evict_lock:
+            self._touch(thread_id)
+            self._prune_thread(thread_id)
+            self._evict()
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._evict_lock:
+            super().delete_thread(thread_id)
+            self._last_access.pop(thread_id, None)
+            self._thread_bytes.pop(thread_id, None)
+
+    def _prune_thread(self, thread_id: str):
+        """Drop superseded checkpoints and channel blobs they alone referenced"""
+        live_blobs = set()
+        size = 0
+        for checkpoint_ns, checkpoints in self.storage[thread_id].items():
+            for checkpoint_id in sorted(checkpoints)[: -self.checkpoints_per_thread]:
+                del checkpoints[checkpoint_id]
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for checkpoint, metadata, _parent in checkpoints.values():
+                size += len(checkpoint[1]) + len(metadata[1])
+                versions = self.serde.loads_typed(checkpoint)["channel_versions"]
+                live_blobs.update(
+                    (thread_id, checkpoint_ns, channel, version)
+                    for channel, version in versions.items()
+                )
+
+        for key in [k for k in self.blobs if k[0] == thread_id]:
+            if key in live_blobs:
+                size += len(self.blobs[key][1])
+            else:
+                del self.blobs[key]
+        self._thread_bytes[thread_id] = size
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._last_access:
+            thread_id, last_access = next(iter(self._last_access.items()))
+            if (
+                now - last_access > self.ttl_seconds
+                or len(self._last_access) > self.max_threads
+                or (
+                    len(self._last_access) > 1
+                    and sum(self._thread_bytes.values()) > self.max_bytes
+                )
+            ):
+                self.delete_thread(thread_id)
+            else:
+                break
+
+    def stats(self) -> dict:
+        """Snapshot of checkpointer usage"""
+        return {
+            "threads": len(self._last_access),
+            "bytes": sum(self._thread_bytes.values()),
+            "max_threads": self.max_threads,
+            "max_bytes": self.max_bytes,
+        }
+
+
+async def create_checkpointer(
+    backend: str = CHECKPOINTER_BACKEND,
+) -> BaseCheckpointSaver:
+    """Build the checkpointer selected by CHECKPOINTER_BACKEND"""
+    if backend == "memory":
+        return BoundedMemorySaver()
+    if backend == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(
+                "The sqlite checkpointer needs the 'sqlite' extra: "
+                "pip install 'alpha-agents[sqlite]'"
+            ) from e
+
+        os.makedirs(os.path.dirname(CHECKPOINTER_SQLITE_PATH) or ".", exist_ok=True)
+        conn = await aiosqlite.connect(CHECKPOINTER_SQLITE_PATH)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        return saver
+    raise ValueError(f"Unsupported checkpointer backend: {backend}")
+
+
+async def close_checkpointer(checkpointer: BaseCheckpointSaver):
+    """Close any connection held by the checkpointer"""
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None:
+        await conn.close()
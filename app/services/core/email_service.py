@@ -1,19 +1,6 @@
-import os
+from app.services.notifications.dispatcher import get_dispatcher
 
-import httpx
 
-RESEND_API_KEY = os.getenv("RESEND_API_KEY")
-
-
-async def send_email(to: str, subject: str, body: str):
-    async with httpx.AsyncClient() as client:
-        await client.post(
-            "https://api.resend.com/emails",
-            headers={"Authorization": f"Bearer {RESEND_API_KEY}"},
-            json={
-                "from": "Notifier <onboarding@resend.dev>",
-                "to": [to],
-                "subject": subject,
-                "html": f"<p>{body}</p>",
-            },
-        )
+async def send_email(to: str, subject: str, body: str, wait: bool = True):
+    """Send an email through the shared dispatcher (Resend backend)"""
+    await get_dispatcher().notify("email", to, subject, body, wait=wait)
@@ -0,0 +1,44 @@
+import asyncio
+import os
+from weakref import WeakKeyDictionary
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_USER_AGENT = os.getenv(
+    "HTTP_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0 Safari/537.36",
+)
+
+# Pooled connections belong to one event loop, so a sync tool running its
+# own loop on a worker thread gets a client of its own
+_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client for the running loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            headers={"User-Agent": HTTP_USER_AGENT},
+            follow_redirects=True,
+        )
+    return client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
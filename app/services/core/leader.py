@@ -0,0 +1,115 @@
+import asyncio
+import fcntl
+import os
+from typing import Callable, Optional
+
+# Worker processes serving the API. uvicorn only reads this as the default
+# for --workers and never sets it, so launch through run_api.py (or export
+# it yourself) or every worker will assume it is alone
+API_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH", "data/locks/leader.lock")
+# How often a follower checks whether the leader has gone away
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "5"))
+LOCK_DIR = os.path.dirname(LEADER_LOCK_PATH) or "."
+
+
+class FileLock:
+    """Exclusive, non-blocking lock on a file
+
+    The lock belongs to an open file description, so the operating system
+    drops it when the holding process exits or crashes; nothing has to
+    clean up after a killed worker.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if it is free; True if this process holds it"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # The holder's pid, for whoever is debugging a stuck lock
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class SlotLocks:
+    """A fixed number of slots shared by every process on the host
+
+    Each slot is a FileLock; taking one means holding any free slot file,
+    so at most `count` holders exist across all workers at a time.
+    """
+
+    def __init__(self, name: str, count: int, directory: str = LOCK_DIR):
+        self.count = count
+        self.paths = [os.path.join(directory, f"{name}-{i}.lock") for i in range(count)]
+
+    def try_acquire(self) -> Optional[FileLock]:
+        for path in self.paths:
+            lock = FileLock(path)
+            if lock.acquire():
+                return lock
+        return None
+
+    async def acquire(self, timeout: float, poll: float = 0.1) -> Optional[FileLock]:
+        """Wait up to timeout seconds for a free slot; None if none freed up"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            lock = self.try_acquire()
+            if lock is not None or loop.time() >= deadline:
+                return lock
+            await asyncio.sleep(poll)
+
+
+async def run_as_leader(
+    lock: FileLock,
+    start: Callable[[], None],
+    retry_seconds: float = LEADER_RETRY_SECONDS,
+):
+    """Call start once this process holds the lock
+
+    Followers keep retrying, so when the leader exits another worker takes
+    over its duties.
+    """
+    while not lock.acquire():
+        await asyncio.sleep(retry_seconds)
+    print(f"Worker {os.getpid()} is the leader")
+    start()
+
+
+_leader_lock: Optional[FileLock] = None
+
+
+def get_leader_lock() -> FileLock:
+    """Return the lock that elects the worker running scheduled monitors"""
+    global _leader_lock
+    if _leader_lock is None:
+        _leader_lock = FileLock(LEADER_LOCK_PATH)
+    return _leader_lock
+
+
+def release_leader_lock():
+    """Step down, letting another worker take over"""
+    if _leader_lock is not None:
+        _leader_lock.release()
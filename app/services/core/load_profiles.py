@@ -0,0 +1,236 @@
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from typing import Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page, Request, Response, Route
+
+from app.services.core.metrics import browser_navigation_seconds
+
+# Profile used by the agent's browser tools and by visa/monitor renders
+BROWSER_LOAD_PROFILE = os.getenv("BROWSER_LOAD_PROFILE", "no-media")
+# Monitors judge availability on innerText, which only leaves out hidden
+# elements when the site's CSS loaded; text-only blocks stylesheets
+MONITOR_LOAD_PROFILE = os.getenv("MONITOR_LOAD_PROFILE", "no-media")
+# Comma-separated extra hosts (and their subdomains) to block in lean profiles
+BROWSER_BLOCKED_DOMAINS = os.getenv("BROWSER_BLOCKED_DOMAINS", "")
+# JSON object of per-profile overrides: {"text-only": {"wait_until": "networkidle"}}
+BROWSER_LOAD_PROFILES = os.getenv("BROWSER_LOAD_PROFILES", "{}")
+
+# The only URLs a browser may be sent to: file:, data: or chrome: pages
+# would hand local files and browser internals to whoever asked
+WEB_URL_SCHEMES = {"http", "https"}
+
+# Ad and analytics hosts that never contribute readable content
+TRACKER_DOMAINS = {
+    "doubleclick.net",
+    "googlesyndication.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "cdn.segment.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "taboola.com",
+    "outbrain.com",
+    "criteo.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "chartbeat.com",
+    "newrelic.com",
+    "nr-data.net",
+}
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """What a navigation downloads and what it waits for"""
+
+    name: str
+    blocked_resource_types: frozenset[str] = frozenset()
+    block_trackers: bool = False
+    # "commit", "domcontentloaded", "load" or "networkidle"
+    wait_until: str = "load"
+    timeout_ms: int = 30000
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        LoadProfile(
+            "text-only",
+            frozenset(
+                {"image", "media", "font", "stylesheet", "texttrack", "manifest"}
+            ),
+            block_trackers=True,
+            wait_until="domcontentloaded",
+            timeout_ms=15000,
+        ),
+        LoadProfile(
+            "no-media",
+            frozenset({"image", "media", "font"}),
+            block_trackers=True,
+            wait_until="domcontentloaded",
+            timeout_ms=20000,
+        ),
+        LoadProfile("full", wait_until="load", timeout_ms=30000),
+    )
+}
+for _name, _overrides in json.loads(BROWSER_LOAD_PROFILES).items():
+    if "blocked_resource_types" in _overrides:
+        _overrides["blocked_resource_types"] = frozenset(
+            _overrides["blocked_resource_types"]
+        )
+    PROFILES[_name] = replace(PROFILES.get(_name, LoadProfile(_name)), **_overrides)
+
+
+def get_profile(name: Optional[str]) -> LoadProfile:
+    """Look up a profile by name, defaulting to BROWSER_LOAD_PROFILE"""
+    name = name or BROWSER_LOAD_PROFILE
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown load profile {name!r}; expected one of {list(PROFILES)}"
+        )
+    return PROFILES[name]
+
+
+def _host_matches(host: str, domains: set[str]) -> bool:
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in domains for i in range(len(labels)))
+
+
+@dataclass
+class NavigationStats:
+    """Network cost of one navigation"""
+
+    url: str
+    profile: str
+    status: int = 0
+    requests: int = 0
+    blocked: int = 0
+    bytes_transferred: int = 0
+    elapsed_ms: float = 0.0
+
+
+class LoadStats:
+    """Running totals of navigations per profile"""
+
+    def __init__(self):
+        self.totals: dict[str, dict[str, float]] = defaultdict(
+            lambda: {
+                "navigations": 0,
+                "requests": 0,
+                "blocked": 0,
+                "bytes_transferred": 0,
+                "elapsed_ms": 0.0,
+            }
+        )
+
+    def record(self, stats: NavigationStats):
+        totals = self.totals[stats.profile]
+        totals["navigations"] += 1
+        totals["requests"] += stats.requests
+        totals["blocked"] += stats.blocked
+        totals["bytes_transferred"] += stats.bytes_transferred
+        totals["elapsed_ms"] += stats.elapsed_ms
+
+    def report(self) -> dict:
+        """Per-profile totals with average bytes and milliseconds per navigation"""
+        return {
+            name: {
+                **totals,
+                "elapsed_ms": round(totals["elapsed_ms"], 1),
+                "avg_bytes": round(totals["bytes_transferred"] / totals["navigations"]),
+                "avg_ms": round(totals["elapsed_ms"] / totals["navigations"], 1),
+            }
+            for name, totals in self.totals.items()
+        }
+
+
+load_stats = LoadStats()
+
+
+def require_web_url(url: str):
+    """Raise ValueError unless the URL is http or https"""
+    if urlsplit(url).scheme.lower() not in WEB_URL_SCHEMES:
+        raise ValueError(f"Only http and https URLs are supported: {url}")
+
+
+async def navigate(
+    page: Page,
+    url: str,
+    profile: Optional[str] = None,
+    wait_for_selector: Optional[str] = None,
+) -> tuple[Optional[Response], NavigationStats]:
+    """Load a URL under a load profile and account for what it transferred
+
+    Blocked resource types and tracker hosts are aborted through request
+    interception. After the profile's wait condition the navigation can also
+    wait for a selector, within the same per-profile timeout.
+    """
+    require_web_url(url)
+    chosen = get_profile(profile)
+    blocked_domains = TRACKER_DOMAINS if chosen.block_trackers else set()
+    blocked_domains = blocked_domains | {
+        d.strip().lower() for d in BROWSER_BLOCKED_DOMAINS.split(",") if d.strip()
+    }
+    stats = NavigationStats(url=url, profile=chosen.name)
+    sizes: list[asyncio.Task] = []
+
+    async def intercept(route: Route):
+        request = route.request
+        host = (urlsplit(request.url).hostname or "").lower()
+        if request.resource_type in chosen.blocked_resource_types or (
+            blocked_domains and _host_matches(host, blocked_domains)
+        ):
+            stats.blocked += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def finished(request: Request):
+        stats.requests += 1
+        sizes.append(asyncio.ensure_future(request.sizes()))
+
+    intercepting = bool(chosen.blocked_resource_types or blocked_domains)
+    if intercepting:
+        await page.route("**/*", intercept)
+    page.on("requestfinished", finished)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await page.goto(
+            url, wait_until=chosen.wait_until, timeout=chosen.timeout_ms
+        )
+        if wait_for_selector:
+            await page.wait_for_selector(wait_for_selector, timeout=chosen.timeout_ms)
+        stats.status = response.status if response else 0
+        outcome = "ok"
+    finally:
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        browser_navigation_seconds.observe(
+            stats.elapsed_ms / 1000, profile=stats.profile, outcome=outcome
+        )
+        page.remove_listener("requestfinished", finished)
+        if intercepting:
+            try:
+                await page.unroute("**/*", intercept)
+            except PlaywrightError:
+                pass
+        for result in await asyncio.gather(*sizes, return_exceptions=True):
+            if isinstance(result, dict):
+                stats.bytes_transferred += max(
+                    result.get("responseBodySize", 0), 0
+                ) + max(result.get("responseHeadersSize", 0), 0)
+        load_stats.record(stats)
+    return response, stats
@@ -0,0 +1,239 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a cached HTTP fetch up to a slow model answer
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A named metric family with one series per combination of label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._series: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f"{self.name} takes labels {self.labels}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            series = list(self._series.items())
+        for values, state in sorted(series):
+            lines.extend(self._render_series(values, state))
+        return lines
+
+    def _render_series(self, values: tuple, state) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(state)}"
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that is set to the latest reading"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their count and sum"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                state = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block, whether or not it raised"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_series(self, values: tuple, state) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+            cumulative += count
+            labels = _format_labels(self.labels, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics exported by this process"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# LLM calls, per upstream model (fallbacks and hedges included)
+llm_request_seconds = registry.histogram(
+    "alpha_llm_request_seconds",
+    "Latency of upstream LLM calls",
+    ("model", "outcome"),
+)
+llm_tokens = registry.histogram(
+    "alpha_llm_tokens",
+    "Tokens per LLM call",
+    ("model", "direction"),
+    TOKEN_BUCKETS,
+)
+
+# Agent graph runs, the nodes inside them and the tools they call
+agent_run_seconds = registry.histogram(
+    "alpha_agent_run_seconds", "Duration of agent graph runs", ("outcome",)
+)
+agent_node_seconds = registry.histogram(
+    "alpha_agent_node_seconds", "Duration of agent graph node runs", ("node",)
+)
+tool_seconds = registry.histogram(
+    "alpha_tool_seconds", "Duration of tool calls", ("tool",)
+)
+tool_errors = registry.counter(
+    "alpha_tool_errors_total", "Tool calls that raised or reported a failure", ("tool",)
+)
+
+# Browsers
+browser_launch_seconds = registry.histogram(
+    "alpha_browser_launch_seconds",
+    "Time to launch a pooled Chromium and its warm contexts",
+)
+browser_navigation_seconds = registry.histogram(
+    "alpha_browser_navigation_seconds",
+    "Time for a page navigation under a load profile",
+    ("profile", "outcome"),
+)
+
+# Sizes, read from their owners on every scrape
+browser_pool_contexts = registry.gauge(
+    "alpha_browser_pool_contexts", "Browser contexts in the pool", ("state",)
+)
+browser_sessions = registry.gauge(
+    "alpha_browser_sessions", "Open per-thread browser sessions"
+)
+job_queue_jobs = registry.gauge(
+    "alpha_job_queue_jobs", "Jobs in the job queue", ("state",)
+)
+checkpointer_threads = registry.gauge(
+    "alpha_checkpointer_threads", "Conversation threads held by the checkpointer"
+)
+checkpointer_bytes = registry.gauge(
+    "alpha_checkpointer_bytes", "Serialized size of the checkpointer's threads"
+)
+llm_in_flight = registry.gauge(
+    "alpha_llm_in_flight", "LLM calls running or waiting for a slot", ("model", "state")
+)
@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.services.core.page_fetcher import FetchedPage
+
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+PAGE_CACHE_TTL_SECONDS = int(os.getenv("PAGE_CACHE_TTL_SECONDS", "300"))
+# JSON object of per-domain TTLs in seconds: {"cnn.com": 60, "wikipedia.org": 86400}
+PAGE_CACHE_DOMAIN_TTLS = os.getenv("PAGE_CACHE_DOMAIN_TTLS", "{}")
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "256"))
+# Empty disables the on-disk tier
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "data/page_cache")
+# Expired entries and unreferenced blobs are pruned after this many stores
+PAGE_CACHE_PRUNE_EVERY = 200
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Cache key for a URL: no fragment, tracking params or default port"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(_TRACKING_PARAMS)
+        )
+    )
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+@dataclass
+class CacheEntry:
+    """A cached page; the text itself lives in the content store"""
+
+    page: FetchedPage
+    content_hash: str
+    stored_at: float
+    expires_at: float
+
+
+class ContentStore:
+    """Content-addressed blobs on disk: sha256 of the text -> zlib'd text"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(
+            self.directory, "blobs", content_hash[:2], f"{content_hash}.z"
+        )
+
+    def put(self, text: str) -> str:
+        content_hash = hashlib.sha256(text.encode()).hexdigest()
+        path = self._path(content_hash)
+        # Identical content from any URL is stored once
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, zlib.compress(text.encode()))
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[str]:
+        try:
+            with open(self._path(content_hash), "rb") as f:
+                return zlib.decompress(f.read()).decode()
+        except (OSError, zlib.error):
+            return None
+
+    def hashes(self) -> dict[str, str]:
+        """Every stored hash and its path"""
+        blobs = os.path.join(self.directory, "blobs")
+        found = {}
+        for root, _, files in os.walk(blobs):
+            for name in files:
+                if name.endswith(".z"):
+                    found[name.removesuffix(".z")] = os.path.join(root, name)
+        return found
+
+
+class PageCache:
+    """Extracted page content keyed by normalized URL
+
+    A bounded in-memory LRU sits in front of an on-disk tier: per-URL JSON
+    metadata that points into a ContentStore. Entries expire after a TTL
+    that can be set per domain. Only 2xx pages are cached, so a transient
+    error page is never served in place of the real one.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = PAGE_CACHE_DIR,
+        ttl_seconds: int = PAGE_CACHE_TTL_SECONDS,
+        domain_ttls: Optional[dict[str, int]] = None,
+        max_entries: int = PAGE_CACHE_MAX_ENTRIES,
+        enabled: bool = PAGE_CACHE_ENABLED,
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.domain_ttls = (
+            domain_ttls
+            if domain_ttls is not None
+            else json.loads(PAGE_CACHE_DOMAIN_TTLS)
+        )
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.store = ContentStore(directory) if directory else None
+        self.memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "uncacheable": 0,
+        }
+
+    def ttl_for(self, url: str) -> int:
+        """TTL of the most specific matching domain, or the default"""
+        host = (urlsplit(url).hostname or "").lower()
+        labels = host.split(".")
+        for i in range(len(labels)):
+            domain = ".".join(labels[i:])
+            if domain in self.domain_ttls:
+                return int(self.domain_ttls[domain])
+        return self.ttl_seconds
+
+    def _meta_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, "urls", f"{name}.json")
+
+    async def get(self, url: str) -> Optional[FetchedPage]:
+        """Return the cached page for a URL if there is a fresh entry"""
+        if not self.enabled:
+            return None
+        key = normalize_url(url)
+        now = time.time()
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry.page
+            del self.memory[key]
+            self.stats["expired"] += 1
+
+        if self.store is not None:
+            entry = await asyncio.to_thread(self._load, key, now)
+            if entry is not None:
+                self._remember(key, entry)
+                self.stats["disk_hits"] += 1
+                return entry.page
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, url: str, page: FetchedPage):
+        """Cache a page under its normalized URL if it loaded successfully"""
+        if not self.enabled:
+            return
+        if not 200 <= page.status_code < 300:
+            # Nor may an older copy outlive what the site now answers
+            self.stats["uncacheable"] += 1
+            await self.invalidate(url)
+            return
+        key = normalize_url(url)
+        now = time.time()
+        entry = CacheEntry(
+            page=page,
+            content_hash=hashlib.sha256(page.text.encode()).hexdigest(),
+            stored_at=now,
+            expires_at=now + self.ttl_for(url),
+        )
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+        if self.store is not None:
+            await asyncio.to_thread(self._save, key, entry)
+            if self.stats["stores"] % PAGE_CACHE_PRUNE_EVERY == 0:
+                await asyncio.to_thread(self.prune)
+
+    async def invalidate(self, url: str):
+        """Drop a URL from both tiers"""
+        key = normalize_url(url)
+        self.memory.pop(key, None)
+        if self.store is not None:
+            try:
+                os.remove(self._meta_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _save(self, key: str, entry: CacheEntry):
+        self.store.put(entry.page.text)
+        meta = asdict(entry)
+        meta["page"]["text"] = None
+        meta["key"] = key
+        path = self._meta_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write(path, json.dumps(meta).encode())
+
+    def _load(self, key: str, now: float) -> Optional[CacheEntry]:
+        path = self._meta_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta["expires_at"] <= now:
+            self.stats["expired"] += 1
+            return None
+        text = self.store.get(meta["content_hash"])
+        if text is None:
+            return None
+        page = FetchedPage(**{**meta["page"], "text": text})
+        page.links = [tuple(link) for link in page.links]
+        return CacheEntry(
+            page=page,
+            content_hash=meta["content_hash"],
+            stored_at=meta["stored_at"],
+            expires_at=meta["expires_at"],
+        )
+
+    def prune(self) -> int:
+        """Delete expired metadata and blobs nothing points to any more"""
+        urls = os.path.join(self.directory, "urls")
+        now = time.time()
+        referenced, removed = set(), 0
+        for name in os.listdir(urls) if os.path.isdir(urls) else []:
+            path = os.path.join(urls, name)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = None
+            if meta is None or meta["expires_at"] <= now:
+                os.remove(path)
+                removed += 1
+            else:
+                referenced.add(meta["content_hash"])
+
+        for content_hash, path in self.store.hashes().items():
+            # A blob this young may belong to an entry being saved right now
+            if content_hash not in referenced and os.path.getmtime(path) < now - 60:
+                os.remove(path)
+        return removed
+
+    def report(self) -> dict:
+        """Hit counters plus the hit rate and current memory tier size"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_cache: Optional[PageCache] = None
+
+
+def get_page_cache() -> PageCache:
+    """Return the process-wide page cache"""
+    global _cache
+    if _cache is None:
+        _cache = PageCache()
+    return _cache
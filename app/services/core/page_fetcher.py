@@ -0,0 +1,196 @@
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from app.services.core.browser_sessions import DEFAULT_SESSION, session_page
+from app.services.core.http_client import get_http_client
+from app.services.core.load_profiles import navigate, require_web_url
+
+FETCH_MAX_TEXT_CHARS = int(os.getenv("FETCH_MAX_TEXT_CHARS", "20000"))
+FETCH_MAX_LINKS = int(os.getenv("FETCH_MAX_LINKS", "100"))
+# Pages with less readable text than this that carry scripts are rendered
+FETCH_MIN_TEXT_CHARS = int(os.getenv("FETCH_MIN_TEXT_CHARS", "200"))
+# Comma-separated domains (and their subdomains) that always need a browser
+FETCH_JS_DOMAINS = os.getenv("FETCH_JS_DOMAINS", "")
+
+_SKIPPED_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "head"]
+_JS_REQUIRED = re.compile(
+    r"(enable|turn on|requires?) javascript|javascript (is )?(required|disabled)",
+    re.IGNORECASE,
+)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+# Status codes sites commonly send to clients that do not run JavaScript
+_BOT_BLOCK_STATUSES = {401, 403, 429, 503}
+
+
+@dataclass
+class FetchedPage:
+    """Readable content of a page and how it was obtained"""
+
+    url: str
+    status_code: int
+    title: str
+    text: str
+    links: list[tuple[str, str]] = field(default_factory=list)
+    rendered: bool = False
+    reason: str = ""
+    latency_ms: float = 0.0
+
+
+def parse_html(html: str, base_url: str) -> tuple[str, str, list[tuple[str, str]]]:
+    """Title, readable text and (text, absolute url) links of an HTML page"""
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first("title")
+    title = title_node.text(strip=True) if title_node else ""
+
+    links: dict[str, str] = {}
+    for anchor in tree.css("a[href]"):
+        href = anchor.attributes.get("href") or ""
+        if href.startswith(("#", "javascript:", "mailto:")):
+            continue
+        url = urljoin(base_url, href)
+        if url not in links:
+            links[url] = anchor.text(strip=True, separator=" ")
+
+    tree.strip_tags(_SKIPPED_TAGS)
+    root = tree.body or tree.root
+    text = root.text(separator="\n", strip=True) if root else ""
+    text = _BLANK_LINES.sub("\n", text).strip()
+    return title, text, [(label, url) for url, label in links.items()]
+
+
+def needs_javascript(html: str, text: str) -> Optional[str]:
+    """Why a page fetched without a browser looks incomplete, if it does"""
+    if _JS_REQUIRED.search(text[:2000]):
+        return "page asks for JavaScript"
+    if len(text) < FETCH_MIN_TEXT_CHARS and "<script" in html.lower():
+        return "little text besides scripts"
+    return None
+
+
+class PageFetcher:
+    """Reads pages over pooled HTTP, rendering in Chromium only when needed
+
+    Pages are fetched with the shared httpx client and parsed with
+    selectolax. They are escalated to the conversation's browser page when
+    the domain is on the FETCH_JS_DOMAINS allowlist, the request fails or
+    is refused, or the HTML looks like it needs JavaScript to show content.
+    """
+
+    def __init__(
+        self,
+        js_domains: str = FETCH_JS_DOMAINS,
+        max_text_chars: int = FETCH_MAX_TEXT_CHARS,
+        max_links: int = FETCH_MAX_LINKS,
+    ):
+        self.js_domains = {
+            domain.strip().lower() for domain in js_domains.split(",") if domain.strip()
+        }
+        self.max_text_chars = max_text_chars
+        self.max_links = max_links
+        self.stats = {"fetched": 0, "rendered": 0}
+
+    def requires_browser(self, url: str) -> bool:
+        """Whether the domain is on the JavaScript allowlist"""
+        host = (urlparse(url).hostname or "").lower()
+        return any(
+            host == domain or host.endswith(f".{domain}") for domain in self.js_domains
+        )
+
+    async def fetch(
+        self, url: str, session: str = DEFAULT_SESSION, render: bool = False
+    ) -> FetchedPage:
+        """Fetch a page's text and links, rendering it if the fast path can't"""
+        # Before either path: Chromium would happily read file:// URLs
+        require_web_url(url)
+        started = time.perf_counter()
+        if render:
+            reason = "render requested"
+        elif self.requires_browser(url):
+            reason = "domain needs JavaScript"
+        else:
+            page, reason = await self._fetch_http(url)
+            if page is not None:
+                self.stats["fetched"] += 1
+                page.latency_ms = (time.perf_counter() - started) * 1000
+                return page
+
+        page = await self._render(url, session)
+        page.reason = reason
+        self.stats["rendered"] += 1
+        page.latency_ms = (time.perf_counter() - started) * 1000
+        return page
+
+    async def _fetch_http(self, url: str) -> tuple[Optional[FetchedPage], str]:
+        try:
+            response = await get_http_client().get(url)
+        except httpx.HTTPError as e:
+            return None, f"HTTP fetch failed: {e}"
+
+        if response.status_code in _BOT_BLOCK_STATUSES:
+            return None, f"HTTP status {response.status_code}"
+
+        content_type = response.headers.get("content-type", "")
+        final_url = str(response.url)
+        if "html" not in content_type:
+            return (
+                FetchedPage(
+                    url=final_url,
+                    status_code=response.status_code,
+                    title="",
+                    text=response.text[: self.max_text_chars],
+                ),
+                "",
+            )
+
+        html = response.text
+        title, text, links = parse_html(html, final_url)
+        reason = needs_javascript(html, text)
+        if reason:
+            return None, reason
+        return self._page(final_url, response.status_code, title, text, links), ""
+
+    async def _render(self, url: str, session: str) -> FetchedPage:
+        async with session_page(session, load_deferred=False) as page:
+            response, _ = await navigate(page, url)
+            html = await page.content()
+            final_url = page.url
+        title, text, links = parse_html(html, final_url)
+        return self._page(
+            final_url, response.status if response else 0, title, text, links, True
+        )
+
+    def _page(
+        self,
+        url: str,
+        status_code: int,
+        title: str,
+        text: str,
+        links: list[tuple[str, str]],
+        rendered: bool = False,
+    ) -> FetchedPage:
+        return FetchedPage(
+            url=url,
+            status_code=status_code,
+            title=title,
+            text=text[: self.max_text_chars],
+            links=links[: self.max_links],
+            rendered=rendered,
+        )
+
+
+_fetcher: Optional[PageFetcher] = None
+
+
+def get_page_fetcher() -> PageFetcher:
+    """Return the process-wide page fetcher"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = PageFetcher()
+    return _fetcher
@@ -1,11 +1,30 @@
+import os
+from typing import TYPE_CHECKING, Optional
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from app.services.agents.visa_checker_agent import VisaCheckerAgent
+if TYPE_CHECKING:
+    from app.services.monitoring.scheduler import MonitorScheduler
+
+MONITORING_ENABLED = os.getenv("MONITORING_ENABLED", "true").lower() == "true"
 
 scheduler = AsyncIOScheduler()
+monitor_scheduler: Optional["MonitorScheduler"] = None
 
 
 def start_scheduler():
-    agent = VisaCheckerAgent()
-    scheduler.add_job(agent.run, "interval", minutes=30)
-    scheduler.start()
+    # Monitoring brings in the browser stack, so it loads only when started
+    from app.services.monitoring.change_detector import get_change_detector
+    from app.services.monitoring.scheduler import MonitorScheduler
+    from app.services.monitoring.targets import load_targets
+
+    global monitor_scheduler
+    monitor_scheduler = MonitorScheduler(
+        load_targets(), scheduler, get_change_detector()
+    )
+    monitor_scheduler.start()
+
+
+def stop_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
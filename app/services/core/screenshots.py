@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from PIL import Image
+
+SCREENSHOT_DIR = os.getenv("SCREENSHOT_DIR", "data/screenshots")
+# "webp", "jpeg" or "png"
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "webp").lower()
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "70"))
+# Wider captures are scaled down to this width before encoding (0 keeps size)
+SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", "1280"))
+SCREENSHOT_MAX_COUNT = int(os.getenv("SCREENSHOT_MAX_COUNT", "500"))
+SCREENSHOT_MAX_AGE_SECONDS = int(os.getenv("SCREENSHOT_MAX_AGE_SECONDS", "604800"))
+SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", "209715200"))
+SCREENSHOT_ENCODE_WORKERS = int(os.getenv("SCREENSHOT_ENCODE_WORKERS", "2"))
+
+FORMATS = {
+    "webp": ("WEBP", ".webp", "image/webp"),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+    "png": ("PNG", ".png", "image/png"),
+}
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass
+class ScreenshotRecord:
+    """A stored screenshot and where it came from"""
+
+    id: str
+    filename: str
+    media_type: str
+    size_bytes: int
+    width: int
+    height: int
+    dhash: str
+    created_at: float
+    session: str = ""
+    url: str = ""
+    # What was captured (viewport, element or region) and a digest of the
+    # decoded pixels; both must match for a frame to count as a repeat
+    capture: str = ""
+    pixels: str = ""
+
+
+@dataclass
+class SaveResult:
+    """Outcome of saving a frame: the record it maps to and whether it is new"""
+
+    record: ScreenshotRecord
+    duplicate: bool = False
+
+
+def dhash(image: Image.Image) -> int:
+    """64-bit difference hash: row-wise brightness gradients of a 9x8 thumbnail"""
+    small = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class ScreenshotStore:
+    """Encodes, deduplicates and retains screenshots on disk
+
+    Raw PNG captures are decoded, hashed, scaled and re-encoded (WebP by
+    default) on a thread pool so the event loop never waits on image work.
+    A frame identical to the previous one from the same session, URL and
+    capture region is not stored again. Retention drops the oldest files beyond a count,
+    an age and a total size.
+    """
+
+    def __init__(
+        self,
+        directory: str = SCREENSHOT_DIR,
+        image_format: str = SCREENSHOT_FORMAT,
+        quality: int = SCREENSHOT_QUALITY,
+        max_width: int = SCREENSHOT_MAX_WIDTH,
+        max_count: int = SCREENSHOT_MAX_COUNT,
+        max_age_seconds: int = SCREENSHOT_MAX_AGE_SECONDS,
+        max_bytes: int = SCREENSHOT_MAX_BYTES,
+        workers: int = SCREENSHOT_ENCODE_WORKERS,
+    ):
+        if image_format not in FORMATS:
+            raise ValueError(
+                f"Unknown screenshot format {image_format!r}; "
+                f"expected one of {list(FORMATS)}"
+            )
+        self.directory = directory
+        self.image_format = image_format
+        self.quality = quality
+        self.max_width = max_width
+        self.max_count = max_count
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.records: dict[str, ScreenshotRecord] = {}
+        self._last_by_session: dict[str, ScreenshotRecord] = {}
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="screenshot")
+        self._lock = asyncio.Lock()
+        self._load_index()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            record = ScreenshotRecord(**entry)
+            if os.path.exists(self.path(record)):
+                self.records[record.id] = record
+
+    def _write_index(self, records: list[ScreenshotRecord]):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(record) for record in records], f)
+        os.replace(tmp_path, self._index_path)
+
+    def path(self, record: ScreenshotRecord) -> str:
+        return os.path.join(self.directory, record.filename)
+
+    async def save(
+        self,
+        png: bytes,
+        session: str = "",
+        url: str = "",
+        name: Optional[str] = None,
+        capture: str = "",
+    ) -> SaveResult:
+        """Encode and store a PNG capture unless it repeats the last frame
+
+        capture names the region (viewport, element or clip); frames of
+        different regions or URLs are never treated as repeats.
+        """
+        loop = asyncio.get_running_loop()
+        image, frame_hash, pixels = await loop.run_in_executor(
+            self._executor, _decode, png
+        )
+
+        async with self._lock:
+            previous = self._last_by_session.get(session)
+            if (
+                previous is not None
+                and previous.id in self.records
+                and previous.url == url
+                and previous.capture == capture
+                # Exact pixels: a perceptual hash would miss "Not Available"
+                # turning into "Available"
+                and previous.pixels == pixels
+            ):
+                return SaveResult(previous, duplicate=True)
+
+            record_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            _, extension, media_type = FORMATS[self.image_format]
+            stem = _UNSAFE_NAME.sub("_", os.path.splitext(name)[0]) if name else ""
+            filename = f"{stem}-{record_id}" if stem else record_id
+            record = ScreenshotRecord(
+                id=record_id,
+                filename=f"{filename}{extension}",
+                media_type=media_type,
+                size_bytes=0,
+                width=0,
+                height=0,
+                dhash=f"{frame_hash:016x}",
+                created_at=time.time(),
+                session=session,
+                url=url,
+                capture=capture,
+                pixels=pixels,
+            )
+            self._last_by_session[session] = record
+
+        try:
+            record.size_bytes, record.width, record.height = await loop.run_in_executor(
+                self._executor, self._encode, image, record
+            )
+        except OSError:
+            self._last_by_session.pop(session, None)
+            raise
+
+        async with self._lock:
+            self.records[record.id] = record
+            expired = self._expired()
+            for old in expired:
+                del self.records[old.id]
+            records = list(self.records.values())
+        await loop.run_in_executor(self._executor, self._remove, expired, records)
+        return SaveResult(record)
+
+    def _encode(self, image: Image.Image, record: ScreenshotRecord) -> tuple:
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.Resampling.LANCZOS)
+        pil_format = FORMATS[self.image_format][0]
+        if pil_format == "JPEG":
+            image = image.convert("RGB")
+
+        buffer = io.BytesIO()
+        options = {"optimize": True}
+        if pil_format != "PNG":
+            options["quality"] = self.quality
+        image.save(buffer, pil_format, **options)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(record)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(f"{path}.tmp", path)
+        return buffer.tell(), image.width, image.height
+
+    def _expired(self) -> list[ScreenshotRecord]:
+        """Records to drop, oldest first, to satisfy the retention policy"""
+        cutoff = time.time() - self.max_age_seconds
+        ordered = sorted(self.records.values(), key=lambda r: r.created_at)
+        total = sum(r.size_bytes for r in ordered)
+        expired = []
+        for record in ordered:
+            if (
+                record.created_at >= cutoff
+                and len(ordered) - len(expired) <= self.max_count
+                and total <= self.max_bytes
+            ):
+                break
+            expired.append(record)
+            total -= record.size_bytes
+        return expired
+
+    def _remove(self, expired: list[ScreenshotRecord], records: list[ScreenshotRecord]):
+        for record in expired:
+            try:
+                os.remove(self.path(record))
+            except FileNotFoundError:
+                pass
+        self._write_index(records)
+
+    def recent(
+        self, session: Optional[str] = None, limit: int = 50
+    ) -> list[ScreenshotRecord]:
+        """Most recent screenshots first, optionally for one session"""
+        records = [
+            r for r in self.records.values() if session is None or r.session == session
+        ]
+        return sorted(records, key=lambda r: r.created_at, reverse=True)[:limit]
+
+    def get(self, record_id: str) -> Optional[ScreenshotRecord]:
+        return self.records.get(record_id)
+
+    def stats(self) -> dict:
+        return {
+            "count": len(self.records),
+            "total_bytes": sum(r.size_bytes for r in self.records.values()),
+            "format": self.image_format,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+def _decode(png: bytes) -> tuple[Image.Image, int, str]:
+    image = Image.open(io.BytesIO(png))
+    image.load()
+    pixels = hashlib.sha256(
+        f"{image.mode}:{image.width}x{image.height}:".encode() + image.tobytes()
+    ).hexdigest()
+    return image, dhash(image), pixels
+
+
+_store: Optional[ScreenshotStore] = None
+
+
+def get_screenshot_store() -> ScreenshotStore:
+    """Return the process-wide screenshot store"""
+    global _store
+    if _store is None:
+        _store = ScreenshotStore()
+    return _store
+
+
+async def close_screenshot_store():
+    """Wait for pending encodes and release the worker threads"""
+    global _store
+    if _store is not None:
+        store, _store = _store, None
+        # Pending encodes may take a while; the loop keeps serving meanwhile
+        await asyncio.to_thread(store.close)
@@ -0,0 +1,125 @@
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Finished traces are appended here, one span per JSON line
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "data/traces.jsonl")
+
+
+@dataclass
+class Span:
+    """One timed operation, shaped like an OpenTelemetry span"""
+
+    name: str
+    trace_id: str
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    parent_span_id: Optional[str] = None
+    kind: str = "internal"
+    start_time_unix_nano: int = field(default_factory=time.time_ns)
+    end_time_unix_nano: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: dict[str, str] = field(default_factory=lambda: {"code": "UNSET"})
+
+    def child(self, name: str, kind: str = "internal", **attributes) -> "Span":
+        return Span(
+            name=name,
+            trace_id=self.trace_id,
+            parent_span_id=self.span_id,
+            kind=kind,
+            attributes=attributes,
+        )
+
+    def end(self, error: Optional[BaseException] = None):
+        self.end_time_unix_nano = time.time_ns()
+        if error is None:
+            self.status = {"code": "OK"}
+        else:
+            self.status = {
+                "code": "ERROR",
+                "message": f"{type(error).__name__}: {error}",
+            }
+
+    @property
+    def duration_s(self) -> float:
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1e9
+
+
+def new_trace(name: str, **attributes) -> Span:
+    """Root span of a new trace"""
+    return Span(name=name, trace_id=secrets.token_hex(16), attributes=attributes)
+
+
+class FileSpanExporter:
+    """Appends finished traces to a JSON-lines file from a writer thread"""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH):
+        self.path = path
+        self._pending: list[Span] = []
+        self._pending_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._wake = threading.Event()
+        self._stopping = False
+        self._writer = threading.Thread(
+            target=self._write_loop, name="trace-export", daemon=True
+        )
+        self._writer.start()
+
+    def export(self, spans: list[Span]):
+        """Queue a finished trace for the writer thread"""
+        with self._pending_lock:
+            self._pending.extend(spans)
+        self._wake.set()
+
+    def _write_loop(self):
+        while not self._stopping:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Append queued spans to the export file"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        lines = "".join(json.dumps(asdict(span), default=str) + "\n" for span in batch)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"Failed to export trace: {e}")
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        self._stopping = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+
+
+_exporter: Optional[FileSpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_span_exporter() -> Optional[FileSpanExporter]:
+    """Return the trace exporter, or None when tracing is disabled"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None and TRACING_ENABLED:
+            _exporter = FileSpanExporter()
+        return _exporter
+
+
+def close_span_exporter():
+    """Write queued traces and stop the exporter"""
+    global _exporter
+    with _exporter_lock:
+        exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
@@ -0,0 +1,17 @@
+from app.services.monitoring.targets import VISA_CHECK_URL, target_for_url
+
+
+async def check_visa(params: dict) -> dict:
+    """Check a visa page for availability"""
+    # Imported on first use: it brings in Playwright
+    from app.services.agents.visa_checker_agent import VisaCheckerAgent
+
+    target = target_for_url(params.get("url") or VISA_CHECK_URL)
+    result = await VisaCheckerAgent(target).run_manual()
+    if "checked_at" not in result:
+        # A failed check must not be served to later submissions
+        raise RuntimeError(result["page_content"])
+    return result
+
+
+HANDLERS = {"check_visa": check_visa}
@@ -0,0 +1,308 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from weakref import WeakKeyDictionary
+
+from app.services.core.leader import API_WORKERS
+from app.services.jobs.handlers import HANDLERS
+
+if TYPE_CHECKING:
+    from app.services.jobs.store import JobStore
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Submissions beyond this many queued jobs are refused
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+# A finished job younger than this answers identical submissions
+JOB_RESULT_MAX_AGE_SECONDS = float(os.getenv("JOB_RESULT_MAX_AGE_SECONDS", "60"))
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "120"))
+# Finished jobs kept for polling
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "1000"))
+# How often a request waiting on another worker's job polls the job store
+JOB_STORE_POLL_SECONDS = 0.25
+
+Handler = Callable[[dict], Awaitable[dict]]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+@dataclass
+class Job:
+    """A unit of background work and its outcome"""
+
+    id: str
+    kind: str
+    params: dict
+    key: str
+    status: str = "queued"  # queued, running, succeeded or failed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded queue of background jobs run by a fixed pool of workers
+
+    A submission identical to a queued or running job joins that job, and
+    one identical to a job that succeeded within the result max age gets
+    that job back, so bursts of the same request cost one execution. The
+    worker count caps how many jobs (and browsers) run at once.
+
+    With a job store, every job is mirrored to it so jobs submitted to
+    other API workers can be polled, joined and reused as well.
+    """
+
+    def __init__(
+        self,
+        handlers: dict[str, Handler],
+        workers: int = JOB_WORKERS,
+        max_queued: int = JOB_QUEUE_MAX_SIZE,
+        result_max_age: float = JOB_RESULT_MAX_AGE_SECONDS,
+        timeout: float = JOB_TIMEOUT_SECONDS,
+        history_limit: int = JOB_HISTORY_LIMIT,
+        store: Optional["JobStore"] = None,
+    ):
+        self.handlers = handlers
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_max_age = result_max_age
+        self.timeout = timeout
+        self.history_limit = history_limit
+        self.store = store
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.stats = {
+            "submitted": 0,
+            "coalesced": 0,
+            "cached": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+        }
+        self._active: dict[str, Job] = {}
+        self._latest: dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        """Start the background workers on the running loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, kind: str, params: Optional[dict] = None) -> Job:
+        """Queue a job, or return an identical active or fresh one"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+        params = params or {}
+        key = f"{kind}:{json.dumps(params, sort_keys=True)}"
+
+        reused = self._reuse(key)
+        if reused is not None:
+            return reused
+
+        if self.store is not None:
+            shared = await self._shared(key)
+            # An identical submission may have been queued while we waited
+            reused = self._reuse(key)
+            if reused is not None:
+                return reused
+            if shared is not None:
+                self.stats["cached" if shared.finished else "coalesced"] += 1
+                return shared
+
+        if self._queue.qsize() >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queued} queued)")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, key=key)
+        self.jobs[job.id] = job
+        self._active[key] = job
+        self.stats["submitted"] += 1
+        # Saved before a worker can pick it up, so "queued" never lands last
+        await self._save(job)
+        self._queue.put_nowait(job)
+        return job
+
+    def _reuse(self, key: str) -> Optional[Job]:
+        """This worker's active job for key, or its fresh successful one"""
+        active = self._active.get(key)
+        if active is not None:
+            self.stats["coalesced"] += 1
+            return active
+
+        latest = self._latest.get(key)
+        if (
+            latest is not None
+            and latest.status == "succeeded"
+            and time.time() - latest.finished_at < self.result_max_age
+        ):
+            self.stats["cached"] += 1
+            return latest
+        return None
+
+    async def _shared(self, key: str) -> Optional[Job]:
+        """Another worker's job for key that is still active or fresh"""
+        job = await asyncio.to_thread(self.store.latest, key)
+        if job is None:
+            return None
+        now = time.time()
+        if job.finished:
+            fresh = now - job.finished_at < self.result_max_age
+            return job if job.status == "succeeded" and fresh else None
+        # Unfinished past the timeout means its worker went away
+        return (
+            job if now - (job.started_at or job.submitted_at) < self.timeout else None
+        )
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = await asyncio.to_thread(self.store.load, job_id)
+        return job
+
+    async def wait(self, job: Job, timeout: float) -> bool:
+        """Wait up to timeout seconds for a job; True once it has finished"""
+        if self.jobs.get(job.id) is not job and self.store is not None:
+            return await self._poll(job, timeout)
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job.finished
+
+    async def _poll(self, job: Job, timeout: float) -> bool:
+        """Follow a job run by another worker through the store"""
+        deadline = time.monotonic() + timeout
+        while not job.finished and time.monotonic() < deadline:
+            await asyncio.sleep(JOB_STORE_POLL_SECONDS)
+            stored = await asyncio.to_thread(self.store.load, job.id)
+            if stored is None:
+                break
+            job.status, job.started_at = stored.status, stored.started_at
+            job.finished_at, job.result = stored.finished_at, stored.result
+            job.error = stored.error
+        return job.finished
+
+    async def _save(self, job: Job):
+        if self.store is None:
+            return
+        try:
+            # SQLite writes wait on the disk and on other workers' locks
+            await asyncio.to_thread(self.store.save, job)
+        except Exception as e:
+            # The local queue keeps working; only other workers lose sight
+            print(f"Failed to save job {job.id}: {e}")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+        await self._save(job)
+        try:
+            job.result = await asyncio.wait_for(
+                self.handlers[job.kind](job.params), self.timeout
+            )
+            job.status = "succeeded"
+        except asyncio.TimeoutError:
+            job.status, job.error = "failed", f"Timed out after {self.timeout}s"
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+        job.finished_at = time.time()
+        self.stats[job.status] += 1
+        await self._save(job)
+
+        self._active.pop(job.key, None)
+        self._latest[job.key] = job
+        job.done.set()
+        self._trim()
+
+    def _trim(self):
+        while len(self.jobs) > self.history_limit:
+            job_id, job = next(iter(self.jobs.items()))
+            if not job.finished:
+                break
+            del self.jobs[job_id]
+            if self._latest.get(job.key) is job:
+                del self._latest[job.key]
+
+    def report(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": sum(job.status == "running" for job in self._active.values()),
+            "workers": self.workers,
+            "shared": self.store is not None,
+        }
+
+    async def close(self):
+        """Stop the workers; queued jobs are abandoned"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in list(self._active.values()):
+            if not job.finished:
+                job.status, job.error = "failed", "Shut down before completion"
+                job.finished_at = time.time()
+                await self._save(job)
+                job.done.set()
+        self._active.clear()
+
+
+# Workers and their queue belong to one event loop (see http_client)
+_queues: WeakKeyDictionary[asyncio.AbstractEventLoop, JobQueue] = WeakKeyDictionary()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the job queue for the running loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _queues:
+        store = None
+        if API_WORKERS > 1:
+            from app.services.jobs.store import get_job_store
+
+            store = get_job_store()
+        _queues[loop] = JobQueue(HANDLERS, store=store)
+    return _queues[loop]
+
+
+async def close_job_queue():
+    """Stop the job workers if the queue was used"""
+    queue = _queues.pop(asyncio.get_running_loop(), None)
+    if queue is not None:
+        await queue.close()
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from app.services.jobs.queue import JOB_HISTORY_LIMIT, Job
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "data/jobs.db")
+# Finished jobs beyond the history limit are pruned after this many saves
+JOB_STORE_PRUNE_EVERY = 100
+
+_COLUMNS = (
+    "id",
+    "kind",
+    "params",
+    "key",
+    "status",
+    "submitted_at",
+    "started_at",
+    "finished_at",
+    "result",
+    "error",
+)
+
+
+class JobStore:
+    """Jobs in SQLite, so any API worker can poll or reuse another's job
+
+    Each worker still runs its own jobs; the store only mirrors their state.
+    """
+
+    def __init__(
+        self, path: str = JOB_STORE_PATH, history_limit: int = JOB_HISTORY_LIMIT
+    ):
+        self.path = path
+        self.history_limit = history_limit
+        self._lock = threading.Lock()
+        self._saves = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, params TEXT, key TEXT, status TEXT, "
+            "submitted_at REAL, started_at REAL, finished_at REAL, "
+            "result TEXT, error TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, submitted_at)"
+        )
+        self._db.commit()
+
+    def save(self, job: Job):
+        row = (
+            job.id,
+            job.kind,
+            json.dumps(job.params),
+            job.key,
+            job.status,
+            job.submitted_at,
+            job.started_at,
+            job.finished_at,
+            json.dumps(job.result) if job.result is not None else None,
+            job.error,
+        )
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs VALUES ({', '.join('?' * len(row))})",
+                row,
+            )
+            self._db.commit()
+            self._saves += 1
+            if self._saves % JOB_STORE_PRUNE_EVERY == 0:
+                self._prune()
+
+    def load(self, job_id: str) -> Optional[Job]:
+        return self._one("WHERE id = ?", (job_id,))
+
+    def latest(self, key: str) -> Optional[Job]:
+        """Most recently submitted job with this key, from any worker"""
+        return self._one("WHERE key = ? ORDER BY submitted_at DESC LIMIT 1", (key,))
+
+    def _one(self, where: str, params: tuple) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs {where}", params
+            ).fetchone()
+        if row is None:
+            return None
+        fields = dict(zip(_COLUMNS, row))
+        fields["params"] = json.loads(fields["params"])
+        if fields["result"] is not None:
+            fields["result"] = json.loads(fields["result"])
+        return Job(**fields)
+
+    def _prune(self):
+        self._db.execute(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND id NOT IN "
+            "(SELECT id FROM jobs ORDER BY submitted_at DESC LIMIT ?)",
+            (self.history_limit,),
+        )
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Return the process-wide job store"""
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
+
+
+def close_job_store():
+    """Close the job store's database connection"""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+from weakref import WeakKeyDictionary
+
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.utils import LC_ID_PREFIX
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+# Expired and surplus rows are pruned after this many stores
+LLM_CACHE_PRUNE_EVERY = 100
+
+_MODEL_PARAM = re.compile(r"\('model(?:_name)?', '([^']+)'\)")
+_TYPE_PARAM = re.compile(r"\('_type', '([^']+)'\)")
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Hash of the serialized messages and the model's parameters and tools"""
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+
+def model_label(llm_string: str) -> str:
+    """Model name embedded in an llm_string, for per-model counters"""
+    try:
+        serialized = json.loads(llm_string.split("---", 1)[0])
+        return serialized["kwargs"]["model_name"]
+    except (ValueError, KeyError, TypeError):
+        pass
+    # Models that can't be serialized use their sorted invocation params
+    match = _MODEL_PARAM.search(llm_string) or _TYPE_PARAM.search(llm_string)
+    return match.group(1) if match else "unknown"
+
+
+class LLMResponseCache(BaseCache):
+    """Exact-match cache of chat completions in SQLite
+
+    LangChain looks a completion up by the serialized messages and an
+    llm_string that holds the model, its parameters and any bound tool
+    schemas, so a hit needs the same conversation, model and tools. Rows
+    expire after a TTL and the table is kept to a maximum number of rows.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "expired": 0, "stores": 0}
+        )
+        self._lock = threading.Lock()
+        self._stores = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            "key TEXT PRIMARY KEY, model TEXT, value TEXT, "
+            "created_at REAL, expires_at REAL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS completions_created ON completions (created_at)"
+        )
+        self._db.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        counters = self.stats[model_label(llm_string)]
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM completions WHERE key = ?",
+                (cache_key(prompt, llm_string),),
+            ).fetchone()
+        if row is None:
+            counters["misses"] += 1
+            return None
+        if row[1] <= time.time():
+            counters["expired"] += 1
+            counters["misses"] += 1
+            return None
+        counters["hits"] += 1
+        with suppress_langchain_beta_warning():
+            generations = loads(row[0], allowed_objects="core")
+        # LangChain only ids messages it generated, not ones it got from here
+        hit_id = f"{LC_ID_PREFIX}-{uuid.uuid4()}"
+        for index, generation in enumerate(generations):
+            generation.message.id = f"{hit_id}-{index}"
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        if not all(isinstance(generation, ChatGeneration) for generation in return_val):
+            return
+        # Stored without ids and given fresh ones on every hit, or a replayed
+        # answer would replace the original message in a thread's history
+        generations = [
+            generation.model_copy(
+                update={"message": generation.message.model_copy(update={"id": None})}
+            )
+            for generation in return_val
+        ]
+        model = model_label(llm_string)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (
+                    cache_key(prompt, llm_string),
+                    model,
+                    dumps(generations),
+                    now,
+                    now + self.ttl_seconds,
+                ),
+            )
+            self._db.commit()
+            self._stores += 1
+            if self._stores % LLM_CACHE_PRUNE_EVERY == 0:
+                self._prune(now)
+        self.stats[model]["stores"] += 1
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    def _prune(self, now: float):
+        self._db.execute("DELETE FROM completions WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM completions WHERE key NOT IN "
+            "(SELECT key FROM completions ORDER BY created_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+    def clear(self, **kwargs: Any):
+        with self._lock:
+            self._db.execute("DELETE FROM completions")
+            self._db.commit()
+
+    def entries(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class _Call:
+    """A synchronous upstream call that other threads wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[ChatResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """Shares one upstream call between concurrent requests with the same key
+
+    Async callers await a shared task; it is cancelled only once every
+    caller waiting on it has gone away. Sync callers in other threads wait
+    for the first thread's call. Followers get a copy of the result, or the
+    leader's exception.
+    """
+
+    def __init__(self):
+        self.coalesced: dict[str, int] = defaultdict(int)
+        self._calls: dict[str, _Call] = {}
+        self._calls_lock = threading.Lock()
+        # Tasks belong to one event loop
+        self._tasks: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, tuple[asyncio.Task, list[int]]]
+        ] = WeakKeyDictionary()
+
+    async def arun(
+        self, key: str, label: str, call: Callable[[], Awaitable[ChatResult]]
+    ) -> ChatResult:
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        if key in tasks:
+            task, waiters = tasks[key]
+            leader = False
+            self.coalesced[label] += 1
+        else:
+            task, waiters = asyncio.ensure_future(call()), [0]
+            tasks[key] = (task, waiters)
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+            leader = True
+
+        waiters[0] += 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+        return result if leader else result.model_copy(deep=True)
+
+    def run(self, key: str, label: str, call: Callable[[], ChatResult]) -> ChatResult:
+        with self._calls_lock:
+            pending = self._calls.get(key)
+            if pending is None:
+                pending = self._calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+                self.coalesced[label] += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result.model_copy(deep=True)
+
+        try:
+            pending.result = call()
+            return pending.result
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._calls_lock:
+                del self._calls[key]
+            pending.done.set()
+
+
+class CoalescingChatModel:
+    """Chat model mixin that coalesces identical in-flight completions
+
+    Mix in ahead of a BaseChatModel subclass. Requests are keyed like the
+    model's response cache, so the first request of a burst goes upstream
+    and stores its answer while the rest share it.
+    """
+
+    def _coalesce_key(self, messages: list[BaseMessage], stop, kwargs) -> tuple:
+        """Cache key and model label of a request"""
+        prompt = dumps(
+            [
+                message.model_copy(update={"id": None}) if message.id else message
+                for message in messages
+            ]
+        )
+        llm_string = self._get_llm_string(stop=stop, **kwargs)
+        return cache_key(prompt, llm_string), model_label(llm_string)
+
+    def _generate_with_cache(self, messages, stop=None, run_manager=None, **kwargs):
+        def call():
+            return super(CoalescingChatModel, self)._generate_with_cache(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+
+        return get_coalescer().run(*self._coalesce_key(messages, stop, kwargs), call)
+
+    async def _agenerate_with_cache(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ):
+        def call():
+            return super(CoalescingChatModel, self)._agenerate_with_cache(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+
+        return await get_coalescer().arun(
+            *self._coalesce_key(messages, stop, kwargs), call
+        )
+
+
+_cache: Optional[LLMResponseCache] = None
+_coalescer: Optional[RequestCoalescer] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None when it is disabled"""
+    global _cache
+    if _cache is None and LLM_CACHE_ENABLED:
+        _cache = LLMResponseCache()
+    return _cache
+
+
+def get_coalescer() -> RequestCoalescer:
+    """Return the process-wide request coalescer"""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = RequestCoalescer()
+    return _coalescer
+
+
+def llm_cache_report() -> dict:
+    """Hits, misses, stores and coalesced requests per model"""
+    models: dict[str, dict[str, int]] = defaultdict(
+        lambda: {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "coalesced": 0}
+    )
+    if _cache is not None:
+        for label, counters in _cache.stats.items():
+            models[label].update(counters)
+    if _coalescer is not None:
+        for label, count in _coalescer.coalesced.items():
+            models[label]["coalesced"] = count
+
+    hits = sum(counters["hits"] for counters in models.values())
+    lookups = hits + sum(counters["misses"] for counters in models.values())
+    return {
+        "enabled": LLM_CACHE_ENABLED,
+        "entries": _cache.entries() if _cache is not None else 0,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "models": dict(models),
+    }
+
+
+def close_llm_cache():
+    """Close the response cache's database connection"""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
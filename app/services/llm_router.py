@@ -0,0 +1,495 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+import openai
+from langchain_core.callbacks import (
+    AsyncCallbackHandler,
+    AsyncCallbackManager,
+    AsyncCallbackManagerForLLMRun,
+    CallbackManager,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from pydantic import ConfigDict
+
+from app.services.core.metrics import llm_request_seconds, llm_tokens
+
+LLM_ROUTING_ENABLED = os.getenv("LLM_ROUTING_ENABLED", "true").lower() == "true"
+# Seconds before one model attempt is abandoned for the next model
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+# Milliseconds after which a second model is raced against a slow one (0 = off)
+LLM_HEDGE_AFTER_MS = int(os.getenv("LLM_HEDGE_AFTER_MS", "0"))
+# Model that picks the next tools after a tool result, or when tools are
+# required: a model name, "auto" for the healthiest small model, or "off"
+LLM_TOOL_TURN_MODEL = os.getenv("LLM_TOOL_TURN_MODEL", "auto")
+# Models failing more often than this over the window are tried last
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "100"))
+# Concurrent upstream calls per model; further calls queue (0 = unlimited)
+LLM_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", "8"))
+# Fewer samples than this say nothing about a model's health
+LLM_ROUTER_MIN_SAMPLES = 5
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether another model might succeed where this one failed"""
+    if isinstance(error, (TimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status >= 500 or status == 429)
+
+
+def _child_callbacks(run_manager):
+    """Callbacks for a nested model call, so its tokens reach the caller's stream"""
+    if run_manager is None:
+        return None
+    manager_class = (
+        AsyncCallbackManager
+        if isinstance(run_manager, AsyncCallbackManagerForLLMRun)
+        else CallbackManager
+    )
+    manager = manager_class(handlers=[], parent_run_id=run_manager.run_id)
+    manager.set_handlers(run_manager.inheritable_handlers)
+    manager.add_tags(run_manager.inheritable_tags)
+    manager.add_metadata(run_manager.inheritable_metadata)
+    return manager
+
+
+def _is_streamed(run_manager) -> bool:
+    """Whether someone is streaming the routed call's tokens"""
+    return run_manager is not None and any(
+        hasattr(handler, "tap_output_aiter") for handler in run_manager.handlers
+    )
+
+
+class _TokenRelay(AsyncCallbackHandler):
+    """Passes one attempt's tokens on to the routed call's run
+
+    Tokens flow live while the attempt runs alone. Once another model is
+    raced against it they are held back, and only the winner's are sent.
+    """
+
+    def __init__(self, run_manager: AsyncCallbackManagerForLLMRun):
+        self.run_manager = run_manager
+        self.live = True
+        self.started = False
+        self.held: list[tuple[str, Any]] = []
+
+    # Having tap_output_* marks a streaming handler, so the model streams
+    def tap_output_aiter(self, run_id, output):
+        return output
+
+    def tap_output_iter(self, run_id, output):
+        return output
+
+    async def on_llm_new_token(self, token: str, *, chunk=None, **kwargs: Any):
+        self.started = True
+        if self.live:
+            await self.run_manager.on_llm_new_token(token, chunk=chunk)
+        else:
+            self.held.append((token, chunk))
+
+    async def release(self):
+        """Send the tokens held back while racing"""
+        self.live = True
+        for token, chunk in self.held:
+            await self.run_manager.on_llm_new_token(token, chunk=chunk)
+        self.held.clear()
+
+
+class ModelStats:
+    """Rolling latencies and outcomes of one model's recent calls"""
+
+    def __init__(self, name: str, window: int = LLM_ROUTER_WINDOW):
+        self.name = name
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.counters = {
+            "requests": 0,
+            "errors": 0,
+            "fallbacks": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "tool_turns": 0,
+        }
+        self.in_flight = 0
+        self.waiting = 0
+
+    def record(self, latency_s: float, ok: bool, message: Optional[AIMessage] = None):
+        llm_request_seconds.observe(
+            latency_s, model=self.name, outcome="ok" if ok else "error"
+        )
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            llm_tokens.observe(
+                usage["input_tokens"], model=self.name, direction="input"
+            )
+            llm_tokens.observe(
+                usage["output_tokens"], model=self.name, direction="output"
+            )
+        self.counters["requests"] += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency_s)
+        else:
+            self.counters["errors"] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def unhealthy(self) -> bool:
+        return (
+            len(self.outcomes) >= LLM_ROUTER_MIN_SAMPLES
+            and self.error_rate > LLM_ROUTER_MAX_ERROR_RATE
+        )
+
+    def report(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            **self.counters,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "unhealthy": self.unhealthy,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+
+class ModelRouter:
+    """Per-model statistics that order attempts, and per-model concurrency slots"""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY_PER_MODEL):
+        self.stats: dict[str, ModelStats] = {}
+        self.max_concurrency = max_concurrency
+        # asyncio semaphores belong to one event loop
+        self._semaphores: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+        ] = WeakKeyDictionary()
+        self._thread_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._thread_lock = threading.Lock()
+
+    def get(self, name: str) -> ModelStats:
+        if name not in self.stats:
+            self.stats[name] = ModelStats(name)
+        return self.stats[name]
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """Hold one of the model's concurrent call slots"""
+        if not self.max_concurrency:
+            yield
+            return
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if name not in semaphores:
+            semaphores[name] = asyncio.Semaphore(self.max_concurrency)
+        stats = self.get(name)
+        stats.waiting += 1
+        try:
+            await semaphores[name].acquire()
+        finally:
+            stats.waiting -= 1
+        stats.in_flight += 1
+        try:
+            yield
+        finally:
+            stats.in_flight -= 1
+            semaphores[name].release()
+
+    @contextmanager
+    def thread_slot(self, name: str):
+        """Blocking counterpart of slot() for sync callers"""
+        if not self.max_concurrency:
+            yield
+            return
+        with self._thread_lock:
+            if name not in self._thread_semaphores:
+                self._thread_semaphores[name] = threading.BoundedSemaphore(
+                    self.max_concurrency
+                )
+            semaphore = self._thread_semaphores[name]
+        with semaphore:
+            yield
+
+    def order(
+        self, primary: str, names: list[str], tiers: Optional[dict[str, str]] = None
+    ) -> list[str]:
+        """Healthy models first: the primary, then its tier, then by p95 latency"""
+        tiers = tiers or {}
+
+        def rank(name: str) -> tuple:
+            stats = self.get(name)
+            p95 = stats.percentile(0.95)
+            return (
+                stats.unhealthy,
+                name != primary,
+                tiers.get(name) != tiers.get(primary),
+                p95 if p95 is not None else 0.0,
+            )
+
+        return sorted(names, key=rank)
+
+    def report(self) -> dict:
+        return {name: stats.report() for name, stats in self.stats.items()}
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model that spreads one conversation's calls over several models
+
+    Each model has a bounded number of concurrent calls; the rest queue.
+    The chosen model answers unless it times out or fails with a 5xx or 429,
+    in which case the next model by health and p95 latency takes over. With
+    LLM_HEDGE_AFTER_MS set, a second model is raced against a slow call and
+    the first answer wins; only the winner's tokens are streamed. Turns
+    after a tool result, and turns that must call a tool, go to a small
+    tool model first; if it answers instead of calling tools, the chosen
+    model writes the answer. Tool model attempts are never streamed.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    primary: str
+    # Model name -> chat model or tool-bound runnable, all in the same order
+    models: dict[str, Runnable]
+    # Small models for tool-selection turns; the healthiest one is used
+    tool_models: list[str] = []
+    # Model name -> "small" or "large"; fallbacks stay in the primary's tier first
+    tiers: dict[str, str] = {}
+    tools_bound: bool = False
+    # tool_choice forces a tool call on every turn
+    tools_required: bool = False
+    timeout_s: float = LLM_TIMEOUT_SECONDS
+    hedge_after_s: float = LLM_HEDGE_AFTER_MS / 1000
+    router: ModelRouter
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"primary": self.primary, "models": list(self.models)}
+
+    def bind_tools(self, tools, **kwargs) -> "RoutedChatModel":
+        return self.model_copy(
+            update={
+                "models": {
+                    name: model.bind_tools(tools, **kwargs)
+                    for name, model in self.models.items()
+                },
+                "tools_bound": True,
+                "tools_required": kwargs.get("tool_choice")
+                not in (None, "auto", "none"),
+            }
+        )
+
+    def _plan(self, messages: list[BaseMessage]) -> tuple[Optional[list[str]], list]:
+        """Models for the tool-selection attempt, if any, and for the answer"""
+        names = self.router.order(self.primary, list(self.models), self.tiers)
+        tool_models = [name for name in self.tool_models if name != self.primary]
+        # A plain chat turn would pay for two calls; only pick tools where
+        # another tool call is likely
+        picks_tools = self.tools_required or isinstance(messages[-1], ToolMessage)
+        if tool_models and self.tools_bound and picks_tools:
+            tool_model = self.router.order(tool_models[0], tool_models)[0]
+            if not self.router.get(tool_model).unhealthy:
+                return [tool_model], names
+        return None, names
+
+    def _result(self, name: str, message: AIMessage) -> ChatResult:
+        message.response_metadata["routed_model"] = name
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Timeouts come from the model clients; hedging needs the async path
+        callbacks = _child_callbacks(run_manager)
+        tool_names, names = self._plan(messages)
+        if tool_names:
+            try:
+                name, message = self._call_in_order(tool_names, messages, stop, [])
+            except Exception as e:
+                # The chosen model handles the turn on its own
+                print(f"Tool model {tool_names[0]} failed: {e}")
+            else:
+                if message.tool_calls:
+                    self.router.get(name).counters["tool_turns"] += 1
+                    return self._result(name, message)
+        return self._result(
+            *self._call_in_order(names, messages, stop, callbacks, **kwargs)
+        )
+
+    def _call_in_order(self, names, messages, stop, callbacks, **kwargs):
+        last_error = None
+        for name in names:
+            with self.router.thread_slot(name):
+                started = time.perf_counter()
+                try:
+                    message = self.models[name].invoke(
+                        messages, stop=stop, config={"callbacks": callbacks}, **kwargs
+                    )
+                except Exception as e:
+                    self.router.get(name).record(time.perf_counter() - started, False)
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    self.router.get(name).counters["fallbacks"] += 1
+                    continue
+            self.router.get(name).record(time.perf_counter() - started, True, message)
+            return name, message
+        raise last_error
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tool_names, names = self._plan(messages)
+        if tool_names:
+            # Not streamed: an answer from the tool model is thrown away
+            try:
+                name, message = await self._race(tool_names, messages, stop, None)
+            except Exception as e:
+                print(f"Tool model {tool_names[0]} failed: {e}")
+            else:
+                if message.tool_calls:
+                    self.router.get(name).counters["tool_turns"] += 1
+                    return self._result(name, message)
+        streamed = run_manager if _is_streamed(run_manager) else None
+        return self._result(
+            *await self._race(names, messages, stop, streamed, **kwargs)
+        )
+
+    async def _call(self, name, messages, stop, relay, **kwargs) -> AIMessage:
+        stats = self.router.get(name)
+
+        async def attempt() -> AIMessage:
+            async with self.router.slot(name):
+                started = time.perf_counter()
+                try:
+                    # Never the run's own callbacks: they would stream every attempt
+                    message = await self.models[name].ainvoke(
+                        messages,
+                        stop=stop,
+                        config={"callbacks": [relay] if relay else []},
+                        **kwargs,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    stats.record(time.perf_counter() - started, False)
+                    raise
+                stats.record(time.perf_counter() - started, True, message)
+                return message
+
+        # Waiting for a slot counts too: a saturated model falls back
+        try:
+            return await asyncio.wait_for(attempt(), self.timeout_s)
+        except TimeoutError:
+            stats.record(self.timeout_s, False)
+            raise
+
+    async def _race(self, names, messages, stop, run_manager, **kwargs):
+        """First successful answer among the models, with fallback and hedging
+
+        With a run manager, the winning call's tokens are streamed to it.
+        """
+        remaining = list(names)
+        pending: dict[asyncio.Future, str] = {}
+        relays: dict[asyncio.Future, _TokenRelay] = {}
+        # Hedging is decided once, when the first call turns out slow
+        hedge_due, hedged = bool(self.hedge_after_s), False
+        last_error = None
+
+        def launch():
+            name = remaining.pop(0)
+            relay = _TokenRelay(run_manager) if run_manager else None
+            if pending:
+                # Racing: hold every call's tokens until one has won
+                for racing in [relay, *relays.values()]:
+                    if racing is not None:
+                        racing.live = False
+            task = asyncio.ensure_future(
+                self._call(name, messages, stop, relay, **kwargs)
+            )
+            pending[task] = name
+            if relay is not None:
+                relays[task] = relay
+
+        launch()
+        try:
+            while pending:
+                hedge_after = self.hedge_after_s if hedge_due and remaining else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge_due = False
+                    # A call that is already streaming its answer is not stuck,
+                    # and the tokens it sent could not be taken back
+                    if any(relays[task].started for task in pending if task in relays):
+                        continue
+                    hedged = True
+                    self.router.get(remaining[0]).counters["hedges"] += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        message = task.result()
+                    except Exception as e:
+                        if not is_retryable(e):
+                            raise
+                        last_error = e
+                        self.router.get(name).counters["fallbacks"] += 1
+                        continue
+                    if hedged and name != names[0]:
+                        self.router.get(name).counters["hedge_wins"] += 1
+                    if task in relays:
+                        await relays[task].release()
+                    return name, message
+
+                if not pending and remaining:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model statistics"""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
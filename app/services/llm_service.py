@@ -1,7 +1,18 @@
 import os
 from typing import Dict, Any
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
-from langchain.chat_models import init_chat_model
+from app.services.llm_cache import CoalescingChatModel, get_llm_cache
+from app.services.llm_router import (
+    LLM_ROUTING_ENABLED,
+    LLM_TIMEOUT_SECONDS,
+    LLM_TOOL_TURN_MODEL,
+    RoutedChatModel,
+    get_model_router,
+)
+
+class CachedChatOpenAI(CoalescingChatModel, ChatOpenAI):
+    """ChatOpenAI that shares identical in-flight requests"""
 
 class LLMService:
     """Service for managing different LLM providers and models"""
@@ -11,53 +22,107 @@ class LLMService:
             "OpenRouter - Claude 3.5 Sonnet": {
                 "provider": "openrouter",
                 "model": "anthropic/claude-3-5-sonnet",
+                "tier": "large",
                 "api_key": os.getenv("OPENROUTER_API_KEY"),
                 "base_url": "https://openrouter.ai/api/v1"
             },
             "OpenRouter - GPT-4o": {
                 "provider": "openrouter", 
                 "model": "openai/gpt-4o",
+                "tier": "large",
                 "api_key": os.getenv("OPENROUTER_API_KEY"),
                 "base_url": "https://openrouter.ai/api/v1"
             },
             "OpenRouter - Mistral 7B": {
                 "provider": "openrouter",
                 "model": "mistralai/mistral-7b-instruct", 
+                "tier": "small",
                 "api_key": os.getenv("OPENROUTER_API_KEY"),
                 "base_url": "https://openrouter.ai/api/v1"
             },
             "OpenAI - GPT-4o Mini": {
                 "provider": "openai",
                 "model": "gpt-4o-mini",
+                "tier": "small",
                 "api_key": os.getenv("OPENAI_API_KEY")
             }
         }
+        # Model clients are reused; identical requests hit the response cache
+        self.models: Dict[str, ChatOpenAI] = {}
     
     def get_model(self, model_name: str) -> ChatOpenAI:
         """Get a configured model instance"""
         if model_name not in self.available_models:
             raise ValueError(f"Model {model_name} not found")
         
-        config = self.available_models[model_name]
-        
+        if model_name not in self.models:
+            self.models[model_name] = self._create_model(
+                self.available_models[model_name]
+            )
+        return self.models[model_name]
+    
+    def _create_model(self, config: Dict[str, Any]) -> ChatOpenAI:
         if config["provider"] == "openrouter":
-            return ChatOpenAI(
+            return CachedChatOpenAI(
                 model=config["model"],
                 api_key=config["api_key"],
                 base_url=config["base_url"],
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                timeout=LLM_TIMEOUT_SECONDS,
+                cache=get_llm_cache()
             )
         elif config["provider"] == "openai":
-            return ChatOpenAI(
+            return CachedChatOpenAI(
                 model=config["model"],
                 api_key=config["api_key"],
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                timeout=LLM_TIMEOUT_SECONDS,
+                cache=get_llm_cache()
             )
         else:
             raise ValueError(f"Unsupported provider: {config['provider']}")
     
+    def get_routed_model(self, model_name: str) -> BaseChatModel:
+        """Get a model that falls back to, hedges with and hands tool turns to others"""
+        if model_name not in self.available_models:
+            raise ValueError(f"Model {model_name} not found")
+        
+        # Without routing the model still gets timeouts and concurrency limits
+        names = [model_name]
+        if LLM_ROUTING_ENABLED:
+            names += [
+                name for name in self.get_configured_models() if name != model_name
+            ]
+        return RoutedChatModel(
+            primary=model_name,
+            models={name: self.get_model(name) for name in names},
+            tool_models=self._tool_models(model_name, names),
+            tiers={name: self.available_models[name]["tier"] for name in names},
+            router=get_model_router()
+        )
+    
+    def _tool_models(self, model_name: str, names: list) -> list:
+        """Small models that may pick tools for a stronger one"""
+        if (
+            len(names) == 1
+            or LLM_TOOL_TURN_MODEL == "off"
+            or self.available_models[model_name]["tier"] == "small"
+        ):
+            return []
+        if LLM_TOOL_TURN_MODEL != "auto":
+            return [LLM_TOOL_TURN_MODEL] if LLM_TOOL_TURN_MODEL in names else []
+        return [
+            name for name in names if self.available_models[name]["tier"] == "small"
+        ]
+    
     def get_available_models(self) -> list:
         """Get list of available model names"""
         return list(self.available_models.keys())
+    
+    def get_configured_models(self) -> list:
+        """Names of the models whose provider has an API key set"""
+        return [
+            name for name, config in self.available_models.items() if config["api_key"]
+        ]
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.services.monitoring.targets import MonitorTarget
+
+MONITOR_ADAPTIVE = os.getenv("MONITOR_ADAPTIVE", "true").lower() == "true"
+MONITOR_MIN_INTERVAL_SECONDS = int(os.getenv("MONITOR_MIN_INTERVAL_SECONDS", "120"))
+MONITOR_MAX_INTERVAL_SECONDS = int(os.getenv("MONITOR_MAX_INTERVAL_SECONDS", "7200"))
+# Unchanged checks in a row before the interval doubles
+MONITOR_BACKOFF_AFTER = int(os.getenv("MONITOR_BACKOFF_AFTER", "3"))
+# Past changes in the same hour of the week (or either neighbour) that mark
+# it as an active window
+MONITOR_HOT_WINDOW_CHANGES = int(os.getenv("MONITOR_HOT_WINDOW_CHANGES", "2"))
+MONITOR_CHANGE_HISTORY_PATH = os.getenv(
+    "MONITOR_CHANGE_HISTORY_PATH", "data/monitor_changes.json"
+)
+MONITOR_CHANGE_HISTORY_SIZE = int(os.getenv("MONITOR_CHANGE_HISTORY_SIZE", "500"))
+
+HOURS_PER_WEEK = 7 * 24
+
+
+def hour_of_week(moment: datetime) -> int:
+    return moment.weekday() * 24 + moment.hour
+
+
+class ChangeHistoryStore:
+    """Timestamps of detected changes per target, persisted as JSON"""
+
+    def __init__(
+        self,
+        path: str = MONITOR_CHANGE_HISTORY_PATH,
+        max_per_target: int = MONITOR_CHANGE_HISTORY_SIZE,
+    ):
+        self.path = path
+        self.max_per_target = max_per_target
+        self.changes: dict[str, list[datetime]] = {}
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            raw = json.load(f)
+        self.changes = {
+            name: [datetime.fromisoformat(value) for value in values]
+            for name, values in raw.items()
+        }
+
+    def _write(self, raw: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+        os.replace(tmp_path, self.path)
+
+    async def record(self, target_name: str, moment: datetime):
+        """Remember a change and persist the history"""
+        history = self.changes.setdefault(target_name, [])
+        history.append(moment)
+        del history[: -self.max_per_target]
+        if self.path:
+            raw = {
+                name: [value.isoformat() for value in values]
+                for name, values in self.changes.items()
+            }
+            await asyncio.to_thread(self._write, raw)
+
+    def activity(self, target_name: str) -> Counter:
+        """Number of past changes per hour of the week"""
+        return Counter(
+            hour_of_week(moment) for moment in self.changes.get(target_name, [])
+        )
+
+
+class AdaptivePolicy:
+    """Picks each target's next poll interval from its change history
+
+    Polls drop to the minimum interval during hours of the week in which
+    changes were seen before, double after every few unchanged checks, and
+    back off exponentially while the page errors, always within the bounds.
+    """
+
+    def __init__(
+        self,
+        history: ChangeHistoryStore,
+        enabled: bool = MONITOR_ADAPTIVE,
+        min_interval: int = MONITOR_MIN_INTERVAL_SECONDS,
+        max_interval: int = MONITOR_MAX_INTERVAL_SECONDS,
+        backoff_after: int = MONITOR_BACKOFF_AFTER,
+        hot_window_changes: int = MONITOR_HOT_WINDOW_CHANGES,
+    ):
+        self.history = history
+        self.enabled = enabled
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_after = backoff_after
+        self.hot_window_changes = hot_window_changes
+
+    def _is_hot(self, activity: Counter, moment: datetime) -> bool:
+        hour = hour_of_week(moment)
+        nearby = sum(
+            activity[(hour + offset) % HOURS_PER_WEEK] for offset in (-1, 0, 1)
+        )
+        return nearby >= self.hot_window_changes
+
+    def is_hot(self, target_name: str, moment: datetime) -> bool:
+        """Whether changes cluster around this hour of the week"""
+        return self._is_hot(self.history.activity(target_name), moment)
+
+    def seconds_until_hot(
+        self, target_name: str, now: datetime, horizon: float
+    ) -> Optional[float]:
+        """Seconds until the next active window starts, if within the horizon"""
+        activity = self.history.activity(target_name)
+        moment = now.replace(minute=0, second=0, microsecond=0)
+        while True:
+            moment += timedelta(hours=1)
+            wait = (moment - now).total_seconds()
+            if wait > horizon:
+                return None
+            if self._is_hot(activity, moment):
+                return wait
+
+    def next_interval(
+        self,
+        target: MonitorTarget,
+        unchanged_streak: int,
+        consecutive_errors: int,
+        now: datetime,
+    ) -> int:
+        """Seconds until the target should be polled again"""
+        if not self.enabled:
+            return target.interval_seconds
+
+        if consecutive_errors:
+            interval = target.interval_seconds * 2 ** min(consecutive_errors, 16)
+        elif self.is_hot(target.name, now):
+            interval = self.min_interval
+        else:
+            doublings = min(unchanged_streak // self.backoff_after, 16)
+            interval = min(self.max_interval, target.interval_seconds * 2**doublings)
+            # Never sleep through the start of an active window
+            until_hot = self.seconds_until_hot(target.name, now, interval)
+            if until_hot is not None:
+                interval = until_hot
+        return int(max(self.min_interval, min(self.max_interval, interval)))
@@ -0,0 +1,7 @@
+from app.services.notifications.dispatcher import get_dispatcher
+
+
+async def send_alert(route: str, subject: str, message: str):
+    """Queue an alert on a target's notification route ("email:<to>" or "push")"""
+    kind, _, destination = route.partition(":")
+    await get_dispatcher().notify(kind, destination, subject, message)
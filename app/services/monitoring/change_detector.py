@@ -0,0 +1,334 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from app.services.core.browser import lease_page
+from app.services.core.browser_sessions import session_page
+from app.services.core.http_client import get_http_client
+from app.services.core.load_profiles import MONITOR_LOAD_PROFILE, navigate
+from app.services.monitoring.results_store import (
+    MONITOR_RESULTS_ENABLED,
+    CheckRecord,
+    ResultsStore,
+    get_results_store,
+)
+from app.services.monitoring.targets import MonitorTarget
+
+MONITOR_HISTORY_SIZE = int(os.getenv("MONITOR_HISTORY_SIZE", "100"))
+MONITOR_TEXT_EXCERPT_CHARS = 2000
+
+# Markup that changes on every request without the page really changing
+_VOLATILE_MARKUP = re.compile(
+    r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->"
+    r"|<input[^>]+type=[\"']?hidden[^>]*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class Snapshot:
+    """What a target looked like at one point in time"""
+
+    url: str
+    # Fingerprint of the rendered page; changes are detected on this alone
+    content_hash: str
+    fetched_at: datetime
+    status_code: int
+    available: bool
+    slots: dict[str, list[str]] = field(default_factory=dict)
+    text_excerpt: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Fingerprint of the plain HTTP response, compared on the next poll to
+    # skip the render (None when the render did not follow a successful GET)
+    markup_hash: Optional[str] = None
+    # Bytes the browser downloaded for the render (0 when not rendered)
+    bytes_transferred: int = 0
+
+
+@dataclass
+class SnapshotDiff:
+    """Change between two consecutive snapshots of a target"""
+
+    target: str
+    detected_at: datetime
+    previous_hash: Optional[str]
+    content_hash: str
+    was_available: Optional[bool]
+    available: bool
+    added_slots: dict[str, list[str]] = field(default_factory=dict)
+    removed_slots: dict[str, list[str]] = field(default_factory=dict)
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one poll of a target"""
+
+    target: MonitorTarget
+    snapshot: Snapshot
+    changed: bool
+    rendered: bool
+    status_code: int
+    latency_ms: float
+    diff: Optional[SnapshotDiff] = None
+
+    @property
+    def available(self) -> bool:
+        return self.snapshot.available
+
+
+def content_fingerprint(html: str) -> str:
+    """Hash page markup with scripts, comments and hidden tokens stripped"""
+    normalized = _WHITESPACE.sub(" ", _VOLATILE_MARKUP.sub("", html)).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class ChangeDetector:
+    """Polls targets cheaply over HTTP and renders them only when they change
+
+    Each poll is a conditional GET. A 304, or a 200 whose normalized markup
+    hashes the same as last time, reuses the previous snapshot; otherwise the
+    page is rendered in a pooled browser, slot data is extracted with the
+    target's selectors and the difference is appended to its history. Error
+    responses fall back to the render too, since some sites refuse plain
+    HTTP clients. Changes are always judged on the rendered page's markup.
+    Every check, failed ones included, goes to the results store if given.
+    """
+
+    def __init__(
+        self,
+        history_size: int = MONITOR_HISTORY_SIZE,
+        results: Optional[ResultsStore] = None,
+    ):
+        self.history_size = history_size
+        self.results = results
+        self.snapshots: dict[str, Snapshot] = {}
+        self.history: dict[str, deque[SnapshotDiff]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def check(
+        self,
+        target: MonitorTarget,
+        force_render: bool = False,
+        session: Optional[str] = None,
+    ) -> CheckResult:
+        """Poll a target and return a CheckResult
+
+        With a browser session id, a render happens on that conversation's
+        page instead of a throwaway one.
+        """
+        lock = self._locks.setdefault(target.name, asyncio.Lock())
+        async with lock:
+            checked_at, started = time.time(), time.perf_counter()
+            try:
+                result = await self._check(target, force_render, session)
+            except Exception as e:
+                self._record_failure(target, checked_at, started, e)
+                raise
+            self._record(target, checked_at, result)
+            return result
+
+    def _record(self, target: MonitorTarget, checked_at: float, result: CheckResult):
+        if self.results is None:
+            return
+        self.results.record(
+            CheckRecord(
+                target=target.name,
+                checked_at=checked_at,
+                latency_ms=result.latency_ms,
+                status_code=result.status_code,
+                content_hash=result.snapshot.content_hash,
+                available=result.available,
+                changed=result.changed,
+                rendered=result.rendered,
+                slots=result.snapshot.slots,
+            )
+        )
+
+    def _record_failure(
+        self, target: MonitorTarget, checked_at: float, started: float, error: Exception
+    ):
+        if self.results is None:
+            return
+        # HTTP errors carry the response that failed
+        response = getattr(error, "response", None)
+        self.results.record(
+            CheckRecord(
+                target=target.name,
+                checked_at=checked_at,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                status_code=getattr(response, "status_code", None),
+                error=str(error) or type(error).__name__,
+            )
+        )
+
+    async def _check(
+        self, target: MonitorTarget, force_render: bool, session: Optional[str]
+    ) -> CheckResult:
+        started = time.perf_counter()
+        previous = self.snapshots.get(target.name)
+
+        headers = {}
+        if previous and not force_render:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        try:
+            response = await get_http_client().get(target.url, headers=headers)
+        except httpx.HTTPError:
+            # Some sites refuse plain HTTP clients; fall back to the browser
+            response = None
+
+        failed = None
+        if response is not None:
+            if response.status_code == 304 and previous:
+                return self._unchanged(target, previous, response, started)
+            if not response.is_success:
+                # The browser may still get the page; only fail if it can't
+                failed, response = response, None
+
+        markup_hash = None
+        if response is not None:
+            markup_hash = content_fingerprint(response.text)
+            if previous and previous.markup_hash == markup_hash and not force_render:
+                return self._unchanged(target, previous, response, started)
+
+        snapshot = await self._render(target, session)
+        if snapshot.status_code >= 400:
+            if failed is not None:
+                failed.raise_for_status()
+            raise RuntimeError(f"{target.url} returned {snapshot.status_code}")
+        if response is not None:
+            snapshot.markup_hash = markup_hash
+            snapshot.etag = response.headers.get("ETag")
+            snapshot.last_modified = response.headers.get("Last-Modified")
+
+        diff = None
+        if previous is None or previous.content_hash != snapshot.content_hash:
+            diff = self._diff(target, previous, snapshot)
+            self.history.setdefault(
+                target.name, deque(maxlen=self.history_size)
+            ).append(diff)
+        self.snapshots[target.name] = snapshot
+
+        return CheckResult(
+            target=target,
+            snapshot=snapshot,
+            changed=diff is not None,
+            rendered=True,
+            status_code=snapshot.status_code,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            diff=diff,
+        )
+
+    def _unchanged(
+        self,
+        target: MonitorTarget,
+        previous: Snapshot,
+        response: httpx.Response,
+        started: float,
+    ) -> CheckResult:
+        previous.etag = response.headers.get("ETag", previous.etag)
+        previous.last_modified = response.headers.get(
+            "Last-Modified", previous.last_modified
+        )
+        return CheckResult(
+            target=target,
+            snapshot=previous,
+            changed=False,
+            rendered=False,
+            status_code=response.status_code,
+            latency_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    async def _render(self, target: MonitorTarget, session: Optional[str]) -> Snapshot:
+        """Load the page in a pooled browser and extract slot data"""
+        render_page = (
+            session_page(session, load_deferred=False) if session else lease_page()
+        )
+        async with render_page as page:
+            response, load = await navigate(
+                page,
+                target.url,
+                target.load_profile or MONITOR_LOAD_PROFILE,
+                target.wait_for_selector,
+            )
+            html = await page.content()
+            text = await page.inner_text("body")
+            slots = {
+                name: await page.eval_on_selector_all(
+                    selector,
+                    "els => els.map(e => e.innerText.trim()).filter(Boolean)",
+                )
+                for name, selector in target.slot_selectors.items()
+            }
+
+        pattern = re.compile(target.availability_pattern)
+        if target.slot_selectors:
+            available = any(
+                pattern.search(value) for values in slots.values() for value in values
+            )
+        else:
+            available = bool(pattern.search(text))
+
+        return Snapshot(
+            url=target.url,
+            content_hash=content_fingerprint(html),
+            fetched_at=datetime.now(timezone.utc),
+            status_code=response.status if response else 0,
+            available=available,
+            slots=slots,
+            text_excerpt=text[:MONITOR_TEXT_EXCERPT_CHARS],
+            bytes_transferred=load.bytes_transferred,
+        )
+
+    def _diff(
+        self, target: MonitorTarget, previous: Optional[Snapshot], current: Snapshot
+    ) -> SnapshotDiff:
+        before = previous.slots if previous else {}
+        added, removed = {}, {}
+        for name in set(before) | set(current.slots):
+            old, new = set(before.get(name, [])), set(current.slots.get(name, []))
+            if new - old:
+                added[name] = sorted(new - old)
+            if old - new:
+                removed[name] = sorted(old - new)
+
+        return SnapshotDiff(
+            target=target.name,
+            detected_at=current.fetched_at,
+            previous_hash=previous.content_hash if previous else None,
+            content_hash=current.content_hash,
+            was_available=previous.available if previous else None,
+            available=current.available,
+            added_slots=added,
+            removed_slots=removed,
+        )
+
+    def get_history(self, target_name: str) -> list[SnapshotDiff]:
+        """Recorded changes for a target, oldest first"""
+        return list(self.history.get(target_name, []))
+
+
+_detector: Optional[ChangeDetector] = None
+
+
+def get_change_detector() -> ChangeDetector:
+    """Return the process-wide change detector"""
+    global _detector
+    if _detector is None:
+        _detector = ChangeDetector(
+            results=get_results_store() if MONITOR_RESULTS_ENABLED else None
+        )
+    return _detector
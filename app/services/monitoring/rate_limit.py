@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+MONITOR_DOMAIN_RATE = float(os.getenv("MONITOR_DOMAIN_RATE", "0.2"))
+MONITOR_DOMAIN_BURST = int(os.getenv("MONITOR_DOMAIN_BURST", "2"))
+# JSON object of per-domain overrides: {"example.com": [rate, burst]}
+MONITOR_DOMAIN_RATES = os.getenv("MONITOR_DOMAIN_RATES", "{}")
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class DomainRateLimiter:
+    """One token bucket per host so no site sees bursts of requests"""
+
+    def __init__(
+        self,
+        rate: float = MONITOR_DOMAIN_RATE,
+        burst: int = MONITOR_DOMAIN_BURST,
+        overrides: dict[str, tuple[float, int]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = (
+            overrides if overrides is not None else json.loads(MONITOR_DOMAIN_RATES)
+        )
+        self.buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self.buckets:
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            self.buckets[host] = TokenBucket(rate, burst)
+        return self.buckets[host]
+
+    async def acquire(self, url: str):
+        """Wait for the rate limit of the URL's host"""
+        await self._bucket(urlsplit(url).hostname or "").acquire()
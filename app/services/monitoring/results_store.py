@@ -0,0 +1,334 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+MONITOR_RESULTS_ENABLED = os.getenv("MONITOR_RESULTS_ENABLED", "true").lower() == "true"
+MONITOR_RESULTS_PATH = os.getenv("MONITOR_RESULTS_PATH", "data/monitor_results.db")
+# Buffered checks are written in one transaction once this many pile up,
+# or every flush interval, whichever comes first
+MONITOR_RESULTS_BATCH_SIZE = int(os.getenv("MONITOR_RESULTS_BATCH_SIZE", "500"))
+MONITOR_RESULTS_FLUSH_SECONDS = float(os.getenv("MONITOR_RESULTS_FLUSH_SECONDS", "2"))
+# Checks older than this are deleted (0 = keep everything)
+MONITOR_RESULTS_RETENTION_DAYS = int(os.getenv("MONITOR_RESULTS_RETENTION_DAYS", "90"))
+MONITOR_RESULTS_PRUNE_SECONDS = 3600
+# Rows a single range query may return
+MONITOR_RESULTS_MAX_ROWS = 10000
+
+_COLUMNS = (
+    "target",
+    "checked_at",
+    "latency_ms",
+    "status_code",
+    "content_hash",
+    "available",
+    "changed",
+    "rendered",
+    "slots",
+    "error",
+)
+_RANGE = "target = :target AND checked_at >= :since AND checked_at < :until"
+
+
+@dataclass
+class CheckRecord:
+    """One poll of a monitor target as stored in the results table"""
+
+    target: str
+    checked_at: float
+    latency_ms: float
+    status_code: Optional[int] = None
+    content_hash: Optional[str] = None
+    available: Optional[bool] = None
+    changed: bool = False
+    rendered: bool = False
+    slots: dict[str, list[str]] = field(default_factory=dict)
+    # Set when the check failed; the verdict fields are then empty
+    error: Optional[str] = None
+
+
+class ResultsStore:
+    """Every monitor check in SQLite, for range queries and aggregates
+
+    Checks are buffered in memory and written in batches by a background
+    thread, so recording one never waits on the disk. Rows are indexed by
+    target and time; percentiles and availability windows are computed in
+    SQL so a query over millions of rows returns only the aggregates.
+    """
+
+    def __init__(
+        self,
+        path: str = MONITOR_RESULTS_PATH,
+        batch_size: int = MONITOR_RESULTS_BATCH_SIZE,
+        flush_seconds: float = MONITOR_RESULTS_FLUSH_SECONDS,
+        retention_days: int = MONITOR_RESULTS_RETENTION_DAYS,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self.stats = {"recorded": 0, "written": 0, "batches": 0, "write_errors": 0}
+        self._pending: list[CheckRecord] = []
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._last_prune = 0.0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS checks ("
+            "id INTEGER PRIMARY KEY, target TEXT NOT NULL, checked_at REAL NOT NULL, "
+            "latency_ms REAL, status_code INTEGER, content_hash TEXT, "
+            "available INTEGER, changed INTEGER, rendered INTEGER, "
+            "slots TEXT, error TEXT)"
+        )
+        # Per-target range scans, and time-only scans for retention
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS checks_target_time "
+            "ON checks (target, checked_at)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS checks_time ON checks (checked_at)"
+        )
+        self._db.commit()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="monitor-results", daemon=True
+        )
+        self._flusher.start()
+
+    def record(self, record: CheckRecord):
+        """Buffer a check for the next batch write"""
+        with self._pending_lock:
+            self._pending.append(record)
+            self.stats["recorded"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _flush_loop(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write buffered checks in one transaction"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        rows = [
+            (
+                r.target,
+                r.checked_at,
+                r.latency_ms,
+                r.status_code,
+                r.content_hash,
+                r.available,
+                r.changed,
+                r.rendered,
+                json.dumps(r.slots) if r.slots else None,
+                r.error,
+            )
+            for r in batch
+        ]
+        with self._db_lock:
+            if rows:
+                try:
+                    with self._db:
+                        self._db.executemany(
+                            f"INSERT INTO checks ({', '.join(_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                            rows,
+                        )
+                    self.stats["written"] += len(rows)
+                    self.stats["batches"] += 1
+                except sqlite3.Error as e:
+                    # Another worker may hold the write lock; retry next flush
+                    self.stats["write_errors"] += 1
+                    print(f"Failed to write {len(rows)} monitor results: {e}")
+                    with self._pending_lock:
+                        self._pending[:0] = batch
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        if (
+            not self.retention_days
+            or now - self._last_prune < MONITOR_RESULTS_PRUNE_SECONDS
+        ):
+            return
+        self._last_prune = now
+        try:
+            with self._db:
+                self._db.execute(
+                    "DELETE FROM checks WHERE checked_at < ?",
+                    (now - self.retention_days * 86400,),
+                )
+        except sqlite3.Error as e:
+            print(f"Failed to prune monitor results: {e}")
+
+    def _query(self, sql: str, params: dict) -> list[tuple]:
+        # Reads include everything recorded so far
+        self.flush()
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def checks(
+        self, target: str, since: float, until: float, limit: int = 1000
+    ) -> list[CheckRecord]:
+        """Checks of a target in [since, until), newest first"""
+        rows = self._query(
+            f"SELECT {', '.join(_COLUMNS)} FROM checks WHERE {_RANGE} "
+            "ORDER BY checked_at DESC LIMIT :limit",
+            {
+                "target": target,
+                "since": since,
+                "until": until,
+                "limit": min(limit, MONITOR_RESULTS_MAX_ROWS),
+            },
+        )
+        records = []
+        for row in rows:
+            fields = dict(zip(_COLUMNS, row))
+            fields["slots"] = json.loads(fields["slots"]) if fields["slots"] else {}
+            for flag in ("available", "changed", "rendered"):
+                if fields[flag] is not None:
+                    fields[flag] = bool(fields[flag])
+            records.append(CheckRecord(**fields))
+        return records
+
+    def aggregate(
+        self,
+        target: str,
+        since: float,
+        until: float,
+        bucket_seconds: Optional[float] = None,
+    ) -> list[dict]:
+        """Check counts, availability ratio and latency percentiles
+
+        One entry covers the whole range, or one per bucket of bucket_seconds
+        when given. Latency figures count only checks that completed.
+        """
+        bucket = "CAST((checked_at - :since) / :bucket AS INTEGER)"
+        if not bucket_seconds:
+            bucket, bucket_seconds = "0", until - since
+        params = {
+            "target": target,
+            "since": since,
+            "until": until,
+            "bucket": bucket_seconds,
+        }
+        completed_latency = "CASE WHEN error IS NULL THEN latency_ms END"
+        totals = self._query(
+            f"SELECT {bucket} AS bucket, COUNT(*), COUNT(error), "
+            "SUM(available = 1 AND error IS NULL), "
+            f"AVG({completed_latency}), MAX({completed_latency}) "
+            f"FROM checks WHERE {_RANGE} GROUP BY bucket ORDER BY bucket",
+            params,
+        )
+        # Nearest-rank percentiles: row ceil(p * n) in latency order
+        percentiles = self._query(
+            "SELECT bucket, "
+            "MAX(CASE WHEN rank = (50 * n + 99) / 100 THEN latency_ms END), "
+            "MAX(CASE WHEN rank = (95 * n + 99) / 100 THEN latency_ms END), "
+            "MAX(CASE WHEN rank = (99 * n + 99) / 100 THEN latency_ms END) "
+            f"FROM (SELECT {bucket} AS bucket, latency_ms, "
+            f"ROW_NUMBER() OVER (PARTITION BY {bucket} ORDER BY latency_ms) AS rank, "
+            f"COUNT(*) OVER (PARTITION BY {bucket}) AS n "
+            f"FROM checks WHERE {_RANGE} AND error IS NULL) GROUP BY bucket",
+            params,
+        )
+        latencies = {row[0]: row[1:] for row in percentiles}
+
+        results = []
+        for index, checks, errors, available, mean, worst in totals:
+            p50, p95, p99 = latencies.get(index, (None, None, None))
+            completed = checks - errors
+            results.append(
+                {
+                    "start": since + index * bucket_seconds,
+                    "end": min(since + (index + 1) * bucket_seconds, until),
+                    "checks": checks,
+                    "errors": errors,
+                    "available_checks": available,
+                    "availability": available / completed if completed else None,
+                    "latency_ms": {
+                        "mean": mean,
+                        "p50": p50,
+                        "p95": p95,
+                        "p99": p99,
+                        "max": worst,
+                    },
+                }
+            )
+        return results
+
+    def availability_windows(
+        self, target: str, since: float, until: float
+    ) -> list[dict]:
+        """Periods in which completed checks found the target available
+
+        A window starts at the first check that found availability and ends
+        at the first check that no longer did; an open window has no end.
+        """
+        # Only the checks where the verdict flipped leave the database
+        transitions = self._query(
+            "SELECT checked_at, available FROM ("
+            "SELECT checked_at, available, "
+            "LAG(available) OVER (ORDER BY checked_at) AS previous "
+            f"FROM checks WHERE {_RANGE} AND error IS NULL) "
+            "WHERE previous IS NULL OR available != previous ORDER BY checked_at",
+            {"target": target, "since": since, "until": until},
+        )
+        windows = []
+        for checked_at, available in transitions:
+            if available:
+                windows.append({"start": checked_at, "end": None})
+            elif windows and windows[-1]["end"] is None:
+                windows[-1]["end"] = checked_at
+        for window in windows:
+            end = window["end"] if window["end"] is not None else until
+            window["duration_seconds"] = end - window["start"]
+        return windows
+
+    def report(self) -> dict:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {**self.stats, "pending": pending, "path": self.path}
+
+    def close(self):
+        """Write what is buffered and stop the flush thread"""
+        self._stopping = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+
+_store: Optional[ResultsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Return the process-wide monitor results store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
+
+
+def close_results_store():
+    """Flush pending checks and close the results database"""
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
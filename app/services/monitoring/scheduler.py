@@ -0,0 +1,152 @@
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from playwright.async_api import Error as PlaywrightError
+
+from app.services.monitoring.adaptive import AdaptivePolicy, ChangeHistoryStore
+from app.services.monitoring.alerts import send_alert
+from app.services.monitoring.change_detector import ChangeDetector, CheckResult
+from app.services.monitoring.rate_limit import DomainRateLimiter
+from app.services.monitoring.targets import MonitorTarget
+
+MONITOR_MAX_CONCURRENCY = int(os.getenv("MONITOR_MAX_CONCURRENCY", "8"))
+MONITOR_JITTER_SECONDS = int(os.getenv("MONITOR_JITTER_SECONDS", "30"))
+# First runs are spread over this window instead of all firing at startup
+MONITOR_STARTUP_SPREAD_SECONDS = int(os.getenv("MONITOR_STARTUP_SPREAD_SECONDS", "60"))
+
+
+@dataclass
+class TargetStatus:
+    """Running totals and the latest outcome for one target"""
+
+    runs: int = 0
+    skipped: int = 0
+    consecutive_errors: int = 0
+    unchanged_streak: int = 0
+    interval_seconds: Optional[int] = None
+    next_run: Optional[datetime] = None
+    last_checked: Optional[datetime] = None
+    last_changed: Optional[datetime] = None
+    available: Optional[bool] = None
+    last_error: Optional[str] = None
+
+
+class MonitorScheduler:
+    """Runs every monitor target concurrently on an AsyncIOScheduler
+
+    A global semaphore caps how many checks (and so browser renders) run at
+    once, each host has its own token bucket, run times are jittered, and a
+    target whose previous run is still going is skipped rather than stacked.
+    Each run schedules the next one after an interval from the AdaptivePolicy.
+    """
+
+    def __init__(
+        self,
+        targets: list[MonitorTarget],
+        scheduler: AsyncIOScheduler,
+        detector: ChangeDetector,
+        max_concurrency: int = MONITOR_MAX_CONCURRENCY,
+        jitter_seconds: int = MONITOR_JITTER_SECONDS,
+        rate_limiter: Optional[DomainRateLimiter] = None,
+        policy: Optional[AdaptivePolicy] = None,
+    ):
+        self.targets = {target.name: target for target in targets}
+        self.scheduler = scheduler
+        self.detector = detector
+        self.jitter_seconds = jitter_seconds
+        self.rate_limiter = rate_limiter or DomainRateLimiter()
+        self.policy = policy or AdaptivePolicy(ChangeHistoryStore())
+        self.status = {name: TargetStatus() for name in self.targets}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._running: set[str] = set()
+
+    def start(self):
+        """Schedule each target's first run and start the scheduler"""
+        for target in self.targets.values():
+            spread = min(target.interval_seconds, MONITOR_STARTUP_SPREAD_SECONDS)
+            self._schedule(target, random.uniform(0, spread))
+        if not self.scheduler.running:
+            self.scheduler.start()
+
+    def _schedule(self, target: MonitorTarget, delay: float):
+        status = self.status[target.name]
+        status.next_run = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        self.scheduler.add_job(
+            self.run_target,
+            "date",
+            run_date=status.next_run,
+            args=[target.name],
+            id=job_id(target.name),
+            replace_existing=True,
+        )
+
+    def _schedule_next(self, target: MonitorTarget):
+        status = self.status[target.name]
+        status.interval_seconds = self.policy.next_interval(
+            target,
+            status.unchanged_streak,
+            status.consecutive_errors,
+            datetime.now(timezone.utc),
+        )
+        jitter = random.uniform(-self.jitter_seconds, self.jitter_seconds)
+        self._schedule(target, max(0, status.interval_seconds + jitter))
+
+    async def run_target(self, name: str) -> Optional[CheckResult]:
+        """Check one target, honouring skip-if-running and the rate limits"""
+        target = self.targets[name]
+        status = self.status[name]
+        if name in self._running:
+            status.skipped += 1
+            return None
+
+        self._running.add(name)
+        result = None
+        try:
+            await self.rate_limiter.acquire(target.url)
+            async with self._semaphore:
+                result = await self.detector.check(target)
+
+            status.consecutive_errors = 0
+            status.last_error = None
+            status.available = result.available
+            # The first snapshot of a target is not a change in the page
+            if result.changed and result.diff.previous_hash is not None:
+                status.unchanged_streak = 0
+                status.last_changed = datetime.now(timezone.utc)
+                await self.policy.history.record(name, status.last_changed)
+            else:
+                status.unchanged_streak += 1
+        except (httpx.HTTPError, PlaywrightError, RuntimeError) as e:
+            status.consecutive_errors += 1
+            status.last_error = str(e)
+            print(f"Monitor {name} failed: {e}")
+        finally:
+            # Always book the next run, whatever happened to this one
+            self._running.discard(name)
+            status.runs += 1
+            status.last_checked = datetime.now(timezone.utc)
+            self._schedule_next(target)
+
+        if result is not None and result.changed and result.available:
+            await self._alert(target, result)
+        return result
+
+    async def _alert(self, target: MonitorTarget, result: CheckResult):
+        message = f"Slots are available on {target.url}"
+        if result.snapshot.slots:
+            message += f": {result.snapshot.slots}"
+        for route in target.notify:
+            try:
+                await send_alert(route, f"Slot alert: {target.name}", message)
+            except (httpx.HTTPError, ValueError, RuntimeError) as e:
+                print(f"Failed to send {route} alert for {target.name}: {e}")
+
+
+def job_id(target_name: str) -> str:
+    return f"monitor:{target_name}"
@@ -0,0 +1,63 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+VISA_CHECK_URL = os.getenv("VISA_CHECK_URL", "https://www.eoiparis.gov.in/page/e-visa/")
+MONITOR_TARGETS_FILE = os.getenv("MONITOR_TARGETS_FILE", "")
+MONITOR_DEFAULT_INTERVAL_SECONDS = int(
+    os.getenv("MONITOR_DEFAULT_INTERVAL_SECONDS", "1800")
+)
+MONITOR_ALERT_EMAIL = os.getenv("MONITOR_ALERT_EMAIL", "recipient@example.com")
+
+# "Available" as a word, but not "Not Available"
+DEFAULT_AVAILABILITY_PATTERN = r"(?<![Nn]ot )\bAvailable\b"
+
+
+@dataclass
+class MonitorTarget:
+    """A page to watch and how to read availability from it"""
+
+    name: str
+    url: str
+    # Named CSS selectors; the text of matching elements is the slot data
+    slot_selectors: dict[str, str] = field(default_factory=dict)
+    # Regex applied to slot text (or the page text when there are no selectors)
+    availability_pattern: str = DEFAULT_AVAILABILITY_PATTERN
+    interval_seconds: int = MONITOR_DEFAULT_INTERVAL_SECONDS
+    # Alert routes such as "email:someone@example.com" or "push"
+    notify: list[str] = field(default_factory=list)
+    # Browser load profile for renders ("text-only", "no-media", "full");
+    # None means MONITOR_LOAD_PROFILE
+    load_profile: Optional[str] = None
+    # CSS selector to wait for after load, e.g. the slot table
+    wait_for_selector: Optional[str] = None
+
+
+VISA_TARGET = MonitorTarget(
+    name="eoi-paris-evisa",
+    url=VISA_CHECK_URL,
+    notify=[f"email:{MONITOR_ALERT_EMAIL}"],
+)
+
+
+def target_for_url(url: str) -> MonitorTarget:
+    """Return the configured target for a URL, or an ad-hoc one"""
+    if url == VISA_TARGET.url:
+        return VISA_TARGET
+    return MonitorTarget(name=url, url=url)
+
+
+def load_targets(path: str = MONITOR_TARGETS_FILE) -> list[MonitorTarget]:
+    """Load monitor targets from a JSON list, defaulting to the visa page"""
+    if not path:
+        return [VISA_TARGET]
+
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    targets = [MonitorTarget(**entry) for entry in entries]
+    names = [target.name for target in targets]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate monitor target names in {path}")
+    return targets
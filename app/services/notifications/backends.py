@@ -0,0 +1,112 @@
+import html
+import os
+from abc import ABC, abstractmethod
+
+import httpx
+
+PUSHOVER_API_URL = os.getenv(
+    "PUSHOVER_API_URL", "https://api.pushover.net/1/messages.json"
+)
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com/emails")
+RESEND_FROM = os.getenv("RESEND_FROM", "Notifier <onboarding@resend.dev>")
+
+
+class NotificationError(RuntimeError):
+    """A backend rejected a notification"""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def raise_for_response(backend: str, response: httpx.Response):
+    """Turn an error response into a NotificationError"""
+    if response.is_success:
+        return
+    retryable = response.status_code == 429 or response.status_code >= 500
+    raise NotificationError(
+        f"{backend} returned {response.status_code}: {response.text[:200]}",
+        retryable=retryable,
+    )
+
+
+class NotificationBackend(ABC):
+    """A delivery channel the dispatcher can send through"""
+
+    name: str
+
+    @abstractmethod
+    async def send(
+        self, client: httpx.AsyncClient, recipient: str, subject: str, body: str
+    ):
+        """Deliver one message, raising NotificationError on failure"""
+
+
+class PushoverBackend(NotificationBackend):
+    name = "push"
+
+    def __init__(
+        self,
+        url: str = PUSHOVER_API_URL,
+        token: str = None,
+        user: str = None,
+    ):
+        self.url = url
+        self.token = token or os.getenv("PUSHOVER_TOKEN")
+        self.user = user or os.getenv("PUSHOVER_USER")
+
+    async def send(
+        self, client: httpx.AsyncClient, recipient: str, subject: str, body: str
+    ):
+        if not self.token or not (recipient or self.user):
+            raise NotificationError(
+                "Pushover credentials not configured. Please set PUSHOVER_TOKEN "
+                "and PUSHOVER_USER environment variables."
+            )
+        response = await client.post(
+            self.url,
+            data={
+                "token": self.token,
+                "user": recipient or self.user,
+                "title": subject,
+                "message": body,
+            },
+        )
+        raise_for_response("Pushover", response)
+
+
+class ResendBackend(NotificationBackend):
+    name = "email"
+
+    def __init__(
+        self,
+        url: str = RESEND_API_URL,
+        api_key: str = None,
+        sender: str = RESEND_FROM,
+    ):
+        self.url = url
+        self.api_key = api_key or os.getenv("RESEND_API_KEY")
+        self.sender = sender
+
+    async def send(
+        self, client: httpx.AsyncClient, recipient: str, subject: str, body: str
+    ):
+        if not self.api_key:
+            raise NotificationError(
+                "Resend API key not configured. Please set the RESEND_API_KEY "
+                "environment variable."
+            )
+        paragraphs = "".join(
+            f"<p>{html.escape(part)}</p>" for part in body.split("\n\n")
+        )
+        response = await client.post(
+            self.url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={
+                "from": self.sender,
+                "to": [recipient],
+                "subject": subject,
+                "html": paragraphs,
+            },
+        )
+        raise_for_response("Resend", response)
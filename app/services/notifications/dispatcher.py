@@ -0,0 +1,242 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from app.services.core.http_client import get_http_client
+from app.services.notifications.backends import (
+    NotificationBackend,
+    NotificationError,
+    PushoverBackend,
+    ResendBackend,
+)
+
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "10"))
+NOTIFY_MAX_RETRIES = int(os.getenv("NOTIFY_MAX_RETRIES", "3"))
+NOTIFY_BACKOFF_SECONDS = float(os.getenv("NOTIFY_BACKOFF_SECONDS", "1"))
+NOTIFY_DEDUP_WINDOW_SECONDS = float(os.getenv("NOTIFY_DEDUP_WINDOW_SECONDS", "300"))
+# Alerts to the same recipient within this window go out as one digest
+NOTIFY_COALESCE_SECONDS = float(os.getenv("NOTIFY_COALESCE_SECONDS", "5"))
+
+
+@dataclass
+class Notification:
+    backend: str
+    recipient: str
+    subject: str
+    body: str
+    digest: str = ""
+    delivered: asyncio.Future = field(default=None, repr=False)
+
+
+class NotificationDispatcher:
+    """Queue-backed notification sender shared by the whole process
+
+    Notifications are deduplicated within a time window, bursts to the same
+    recipient are coalesced into one digest, and background workers deliver
+    them over the pooled HTTP client with timeouts and retries.
+    """
+
+    def __init__(
+        self,
+        backends: list[NotificationBackend],
+        workers: int = NOTIFY_WORKERS,
+        timeout: float = NOTIFY_TIMEOUT,
+        max_retries: int = NOTIFY_MAX_RETRIES,
+        backoff_seconds: float = NOTIFY_BACKOFF_SECONDS,
+        dedup_window: float = NOTIFY_DEDUP_WINDOW_SECONDS,
+        coalesce_window: float = NOTIFY_COALESCE_SECONDS,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.backends = {backend.name: backend for backend in backends}
+        self.workers = workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.dedup_window = dedup_window
+        self.coalesce_window = coalesce_window
+        self.client = client
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "deduplicated": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._pending: dict[tuple[str, str], list[Notification]] = {}
+        self._recent: OrderedDict[str, float] = OrderedDict()
+
+    def start(self):
+        """Start the background workers on the running loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def notify(
+        self,
+        backend: str,
+        recipient: str,
+        subject: str,
+        body: str,
+        wait: bool = False,
+        coalesce: bool = True,
+    ) -> bool:
+        """Queue a notification; with wait=True, return once it is delivered
+
+        coalesce=False sends it on its own right away instead of holding it
+        for a digest. Returns False when an identical notification was
+        already sent within the dedup window.
+        """
+        if backend not in self.backends:
+            raise ValueError(f"Unknown notification backend: {backend}")
+        self.start()
+
+        digest = hashlib.sha256(
+            "\0".join((backend, recipient, subject, body)).encode()
+        ).hexdigest()
+        if self._is_duplicate(digest):
+            self.stats["deduplicated"] += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        notification = Notification(
+            backend, recipient, subject, body, digest, loop.create_future()
+        )
+        self.stats["queued"] += 1
+        if coalesce:
+            key = (backend, recipient)
+            batch = self._pending.setdefault(key, [])
+            batch.append(notification)
+            if len(batch) == 1:
+                loop.call_later(self.coalesce_window, self._flush, key)
+        else:
+            self._queue.put_nowait([notification])
+
+        if wait:
+            await notification.delivered
+        return True
+
+    def _is_duplicate(self, digest: str) -> bool:
+        now = time.monotonic()
+        while (
+            self._recent and next(iter(self._recent.values())) < now - self.dedup_window
+        ):
+            self._recent.popitem(last=False)
+
+        if digest in self._recent:
+            return True
+        self._recent[digest] = now
+        return False
+
+    def _flush(self, key: tuple[str, str]):
+        batch = self._pending.pop(key, None)
+        if batch:
+            self._queue.put_nowait(batch)
+
+    async def _worker(self):
+        while True:
+            batch = await self._queue.get()
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                # A bug in one batch must not kill the worker or strand waiters
+                self.stats["failed"] += len(batch)
+                print(f"Failed to deliver {batch[0].backend} notification: {e}")
+                self._fail(batch, e)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, batch: list[Notification]):
+        first = batch[0]
+        if len(batch) == 1:
+            subject, body = first.subject, first.body
+        else:
+            subject = f"{len(batch)} alerts: {first.subject}"
+            body = "\n\n".join(f"{n.subject}\n{n.body}" for n in batch)
+
+        try:
+            await self._send_with_retries(first.backend, first.recipient, subject, body)
+        except (NotificationError, httpx.HTTPError) as e:
+            self.stats["failed"] += len(batch)
+            print(f"Failed to send {first.backend} notification: {e}")
+            self._fail(batch, e)
+            return
+
+        self.stats["sent"] += len(batch)
+        for notification in batch:
+            if not notification.delivered.done():
+                notification.delivered.set_result(True)
+
+    def _fail(self, batch: list[Notification], error: Exception):
+        for notification in batch:
+            # Let the same alert be retried instead of deduplicated
+            self._recent.pop(notification.digest, None)
+            if not notification.delivered.done():
+                notification.delivered.set_exception(error)
+                # Nobody may be waiting; don't warn about an unretrieved error
+                notification.delivered.exception()
+
+    async def _send_with_retries(
+        self, backend_name: str, recipient: str, subject: str, body: str
+    ):
+        backend = self.backends[backend_name]
+        client = self.client or get_http_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.wait_for(
+                    backend.send(client, recipient, subject, body), self.timeout
+                )
+                return
+            except (NotificationError, httpx.HTTPError, asyncio.TimeoutError) as e:
+                retryable = getattr(e, "retryable", True)
+                if not retryable or attempt == self.max_retries:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise NotificationError(
+                            f"{backend_name} timed out after {self.timeout}s"
+                        ) from e
+                    raise
+                delay = self.backoff_seconds * 2**attempt
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+    async def close(self):
+        """Send whatever is pending, then stop the workers"""
+        if not self._tasks:
+            return
+        for key in list(self._pending):
+            self._flush(key)
+        try:
+            await asyncio.wait_for(self._queue.join(), self.timeout)
+        except asyncio.TimeoutError:
+            print("Timed out flushing notifications on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Workers and their queue belong to one event loop (see http_client)
+_dispatchers: WeakKeyDictionary[asyncio.AbstractEventLoop, NotificationDispatcher] = (
+    WeakKeyDictionary()
+)
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Return the notification dispatcher for the running loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _dispatchers:
+        _dispatchers[loop] = NotificationDispatcher(
+            [ResendBackend(), PushoverBackend()]
+        )
+    return _dispatchers[loop]
+
+
+async def close_dispatcher():
+    """Flush and stop the shared dispatcher if it was used"""
+    dispatcher = _dispatchers.pop(asyncio.get_running_loop(), None)
+    if dispatcher is not None:
+        await dispatcher.close()
@@ -1,23 +1,152 @@
-from langchain_community.agent_toolkits import PlayWrightBrowserToolkit
-from langchain_community.tools.playwright.utils import create_async_playwright_browser
+import json
+from typing import Optional
+from urllib.parse import urlparse
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+from playwright.async_api import Error as PlaywrightError
+from pydantic import BaseModel, Field, field_validator
+
+from app.services.core.browser_sessions import (
+    DEFAULT_SESSION,
+    close_session_registry,
+    get_session_registry,
+    session_id,
+    session_page,
+)
+from app.services.core.load_profiles import navigate
+from app.services.core.page_cache import get_page_cache
+from app.services.core.page_fetcher import FetchedPage, parse_html
+from app.services.core.screenshots import SaveResult, get_screenshot_store
+
+from .sync import sync_fallback
+
+CLICK_TIMEOUT_MS = 1000
+
+
+BYPASS_CACHE_DESCRIPTION = (
+    "Load the page from the network even if it was read recently; use when "
+    "the user needs the very latest content"
+)
+
+
+class NoInput(BaseModel):
+    pass
+
+
+class CacheableInput(BaseModel):
+    bypass_cache: bool = Field(default=False, description=BYPASS_CACHE_DESCRIPTION)
+
+
+class NavigateInput(BaseModel):
+    url: str = Field(description="url to navigate to")
+    bypass_cache: bool = Field(default=False, description=BYPASS_CACHE_DESCRIPTION)
+
+    @field_validator("url")
+    @classmethod
+    def check_scheme(cls, url: str) -> str:
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError("URL scheme must be 'http' or 'https'")
+        return url
+
+
+class ExtractHyperlinksInput(BaseModel):
+    absolute_urls: bool = Field(
+        default=False, description="Return absolute URLs instead of relative URLs"
+    )
+    bypass_cache: bool = Field(default=False, description=BYPASS_CACHE_DESCRIPTION)
+
+
+class GetElementsInput(BaseModel):
+    selector: str = Field(
+        description="CSS selector, such as '*', 'div', 'p', 'a', #id, .classname"
+    )
+    attributes: list[str] = Field(
+        default_factory=lambda: ["innerText"],
+        description="Set of attributes to retrieve for each element",
+    )
+
+
+class ClickInput(BaseModel):
+    selector: str = Field(description="CSS selector for the element to click")
 
 
 class BrowserToolsService:
-    """Service for managing Playwright browser tools"""
+    """Service for the Playwright browser tools
+
+    Every tool acts on the page of the conversation it is called from, held
+    in the shared browser session registry, so navigation, text extraction
+    and screenshots in one thread all see the same page.
+
+    Navigating to a URL that is in the page cache does not load it: text and
+    links are answered from the cache, and the page is only loaded when a
+    tool has to interact with it.
+    """
 
     def __init__(self):
-        self.async_browser = None
-        self.toolkit = None
         self.tools = []
 
-    async def initialize(self, headless: bool = True):
-        """Initialize the browser and toolkit"""
-        if self.async_browser is None:
-            self.async_browser = create_async_playwright_browser(headless=headless)
-            self.toolkit = PlayWrightBrowserToolkit.from_browser(
-                async_browser=self.async_browser
+    async def initialize(self):
+        """Build the session-aware tools (browsers start on first use)"""
+        if not self.tools:
+            self.tools = self._build_tools()
+
+    def _build_tools(self) -> list[BaseTool]:
+        specs = [
+            (
+                "navigate_browser",
+                "Navigate a browser to the specified URL",
+                self._navigate,
+                NavigateInput,
+            ),
+            (
+                "previous_webpage",
+                "Navigate back to the previous page in the browser history",
+                self._previous_webpage,
+                NoInput,
+            ),
+            (
+                "extract_text",
+                "Extract all the text on the current webpage",
+                self._extract_text,
+                CacheableInput,
+            ),
+            (
+                "extract_hyperlinks",
+                "Extract all hyperlinks on the current webpage",
+                self._extract_hyperlinks,
+                ExtractHyperlinksInput,
+            ),
+            (
+                "get_elements",
+                "Retrieve elements in the current web page matching the given "
+                "CSS selector",
+                self._get_elements,
+                GetElementsInput,
+            ),
+            (
+                "click_element",
+                "Click on an element with the given CSS selector",
+                self._click_element,
+                ClickInput,
+            ),
+            (
+                "current_webpage",
+                "Returns the URL of the current page",
+                self._current_webpage,
+                NoInput,
+            ),
+        ]
+        return [
+            StructuredTool.from_function(
+                func=sync_fallback(coroutine),
+                coroutine=coroutine,
+                name=name,
+                description=description,
+                args_schema=schema,
             )
-            self.tools = self.toolkit.get_tools()
+            for name, description, coroutine, schema in specs
+        ]
 
     async def get_tools(self) -> list:
         """Get all browser tools"""
@@ -31,55 +160,171 @@ class BrowserToolsService:
         tool_dict = {tool.name: tool for tool in tools}
         return tool_dict.get(name)
 
-    async def navigate_to_url(self, url: str) -> str:
+    async def _cached_page(
+        self, session: str, bypass_cache: bool
+    ) -> Optional[FetchedPage]:
+        """Cached content of a navigation that has not been loaded yet"""
+        url = get_session_registry().deferred.get(session)
+        if url is None or bypass_cache:
+            return None
+        return await get_page_cache().get(url)
+
+    async def _navigate(
+        self, url: str, bypass_cache: bool = False, config: RunnableConfig = None
+    ) -> str:
+        session = session_id(config)
+        cached = None if bypass_cache else await get_page_cache().get(url)
+        if cached is not None:
+            get_session_registry().defer(session, url)
+            return (
+                f"Navigating to {url} returned status code {cached.status_code}"
+                " (from cache)"
+            )
+
+        async with session_page(session, load_deferred=False) as page:
+            response, _ = await navigate(page, url)
+            html = await page.content()
+            final_url = page.url
+        status = response.status if response else 0
+        title, text, links = parse_html(html, final_url)
+        await get_page_cache().put(
+            url, FetchedPage(final_url, status, title, text, links, rendered=True)
+        )
+        return f"Navigating to {url} returned status code {status or 'unknown'}"
+
+    async def _previous_webpage(self, config: RunnableConfig = None) -> str:
+        async with session_page(session_id(config)) as page:
+            response = await page.go_back()
+        if response:
+            return (
+                f"Navigated back to the previous page with URL '{response.url}'."
+                f" Status code {response.status}"
+            )
+        return "Unable to navigate back; no previous page in the history"
+
+    async def _extract_text(
+        self, bypass_cache: bool = False, config: RunnableConfig = None
+    ) -> str:
+        session = session_id(config)
+        cached = await self._cached_page(session, bypass_cache)
+        if cached is not None:
+            return cached.text
+        async with session_page(session) as page:
+            return await page.inner_text("body")
+
+    async def _extract_hyperlinks(
+        self,
+        absolute_urls: bool = False,
+        bypass_cache: bool = False,
+        config: RunnableConfig = None,
+    ) -> str:
+        session = session_id(config)
+        cached = await self._cached_page(session, bypass_cache)
+        if cached is not None:
+            # The cache only keeps absolute URLs
+            return json.dumps([url for _, url in cached.links])
+
+        attribute = "e.href" if absolute_urls else "e.getAttribute('href')"
+        async with session_page(session) as page:
+            links = await page.eval_on_selector_all(
+                "a[href]", f"els => els.map(e => {attribute})"
+            )
+        return json.dumps(list(dict.fromkeys(links)))
+
+    async def _get_elements(
+        self,
+        selector: str,
+        attributes: Optional[list[str]] = None,
+        config: RunnableConfig = None,
+    ) -> str:
+        attributes = attributes or ["innerText"]
+        async with session_page(session_id(config)) as page:
+            results = []
+            for element in await page.query_selector_all(selector):
+                values = {}
+                for attribute in attributes:
+                    if attribute == "innerText":
+                        value = await element.inner_text()
+                    else:
+                        value = await element.get_attribute(attribute)
+                    if value is not None and value.strip():
+                        values[attribute] = value.strip()
+                if values:
+                    results.append(values)
+        return json.dumps(results, ensure_ascii=False)
+
+    async def _click_element(self, selector: str, config: RunnableConfig = None) -> str:
+        async with session_page(session_id(config)) as page:
+            try:
+                await page.click(selector, strict=False, timeout=CLICK_TIMEOUT_MS)
+            except PlaywrightError:
+                return f"Unable to click on element '{selector}'"
+        return f"Clicked element '{selector}'"
+
+    async def _current_webpage(self, config: RunnableConfig = None) -> str:
+        url = get_session_registry().current_url(session_id(config))
+        return url or "about:blank"
+
+    async def navigate_to_url(self, url: str, thread_id: str = DEFAULT_SESSION) -> str:
         """Navigate to a URL and return status"""
         try:
-            navigate_tool = await self.get_tool_by_name("navigate_browser")
-            if navigate_tool:
-                await navigate_tool.arun({"url": url})
-                return f"Successfully navigated to {url}"
-            else:
-                raise RuntimeError("Navigate tool not available")
-        except (TimeoutError, ConnectionError) as e:
+            async with session_page(thread_id, load_deferred=False) as page:
+                await navigate(page, url)
+            return f"Successfully navigated to {url}"
+        except (TimeoutError, ConnectionError, PlaywrightError) as e:
             raise RuntimeError(f"Error navigating to {url}: {str(e)}") from e
 
-    async def extract_page_text(self) -> str:
+    async def extract_page_text(self, thread_id: str = DEFAULT_SESSION) -> str:
         """Extract text from current page"""
         try:
-            extract_tool = await self.get_tool_by_name("extract_text")
-            if extract_tool:
-                text = await extract_tool.arun({})
-                return text
-            else:
-                return "Extract text tool not available"
-        except (AttributeError, RuntimeError) as e:
+            async with session_page(thread_id) as page:
+                return await page.inner_text("body")
+        except (AttributeError, RuntimeError, PlaywrightError) as e:
             return f"Error extracting text: {str(e)}"
 
-    async def take_screenshot(self, filename: str = "screenshot.png") -> str:
-        """Take a screenshot of the current page"""
-        try:
-            screenshot_tool = await self.get_tool_by_name("screenshot")
-            if screenshot_tool:
-                await screenshot_tool.arun({"filename": filename})
-                return f"Screenshot saved as {filename}"
+    async def take_screenshot(
+        self,
+        thread_id: str = DEFAULT_SESSION,
+        name: Optional[str] = None,
+        selector: Optional[str] = None,
+        clip: Optional[dict] = None,
+        full_page: bool = False,
+    ) -> SaveResult:
+        """Capture the current page (or one element) into the screenshot store"""
+        async with session_page(thread_id) as page:
+            if selector:
+                png = await page.locator(selector).first.screenshot(type="png")
             else:
-                # Fallback: use the browser directly
-                if self.async_browser:
-                    page = self.async_browser.get_current_page()
-                    await page.screenshot(path=filename)
-                    return f"Screenshot saved as {filename}"
-                else:
-                    return "Screenshot tool not available"
-        except (RuntimeError, OSError) as e:
-            return f"Error taking screenshot: {str(e)}"
+                png = await page.screenshot(type="png", clip=clip, full_page=full_page)
+            url = page.url
+        capture = json.dumps(
+            {"selector": selector, "clip": clip, "full_page": full_page}, sort_keys=True
+        )
+        return await get_screenshot_store().save(png, thread_id, url, name, capture)
 
     async def list_available_tools(self) -> list:
         """List all available browser tools"""
         tools = await self.get_tools()
         return [tool.name for tool in tools]
 
+    def stats(self) -> dict:
+        """Open browser sessions and page cache hits"""
+        return {
+            **get_session_registry().stats(),
+            "page_cache": get_page_cache().report(),
+        }
+
     async def close(self):
-        """Close the browser"""
-        if self.async_browser:
-            await self.async_browser.close()
-            self.async_browser = None
+        """Close every browser session"""
+        await close_session_registry()
+
+
+_service: Optional[BrowserToolsService] = None
+
+
+def get_browser_tools_service() -> BrowserToolsService:
+    """Return the browser tools service shared by the agent and tools"""
+    global _service
+    if _service is None:
+        _service = BrowserToolsService()
+    return _service
@@ -0,0 +1,71 @@
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from playwright.async_api import Error as PlaywrightError
+from pydantic import BaseModel, Field
+
+from ..core.browser_sessions import session_id
+from ..core.page_cache import get_page_cache
+from ..core.page_fetcher import FetchedPage, get_page_fetcher
+from .sync import sync_fallback
+
+
+class FetchPageInput(BaseModel):
+    url: str = Field(description="http(s) URL of the page to read")
+    render: bool = Field(
+        default=False,
+        description="Load the page in a full browser; only needed when a "
+        "previous fetch came back empty or incomplete",
+    )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Fetch again even if the page was read recently; use when "
+        "the user needs the very latest content",
+    )
+
+
+def format_page(page: FetchedPage, cached: bool = False) -> str:
+    how = (
+        f"rendered in browser: {page.reason}" if page.rendered else "fetched over HTTP"
+    )
+    lines = [
+        f"Title: {page.title or '(none)'}",
+        f"URL: {page.url} (status {page.status_code}, {how}"
+        f"{', from cache' if cached else ''})",
+        "",
+        page.text,
+    ]
+    if page.links:
+        lines += ["", "Links:"]
+        lines += [f"- {label or '(no text)'}: {url}" for label, url in page.links]
+    return "\n".join(lines)
+
+
+async def fetch_page(
+    url: str,
+    render: bool = False,
+    bypass_cache: bool = False,
+    config: RunnableConfig = None,
+) -> str:
+    """Read a page's text and links, rendering it only when needed"""
+    try:
+        cache = get_page_cache()
+        page = None if bypass_cache else await cache.get(url)
+        if page is not None and (page.rendered or not render):
+            return format_page(page, cached=True)
+
+        page = await get_page_fetcher().fetch(url, session_id(config), render)
+        await cache.put(url, page)
+        return format_page(page)
+    except (RuntimeError, ValueError, PlaywrightError) as e:
+        return f"❌ Error fetching {url}: {str(e)}"
+
+
+fetch_page_tool = StructuredTool.from_function(
+    func=sync_fallback(fetch_page),
+    coroutine=fetch_page,
+    name="fetch_page",
+    description="Read a web page and return its title, readable text and links. "
+    "Use this by default to read or search page content; it is much faster "
+    "than the browser tools, which are only needed to click or interact.",
+    args_schema=FetchPageInput,
+)
@@ -1,37 +1,34 @@
-import os
-import requests
-from langchain.agents import Tool
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
 
-def send_push_notification(message: str) -> str:
+from ..notifications.backends import NotificationError
+from ..notifications.dispatcher import get_dispatcher
+from .sync import sync_fallback
+
+class PushNotificationInput(BaseModel):
+    message: str = Field(description="Text of the notification")
+
+async def send_push_notification(message: str) -> str:
     """Send a push notification to the user"""
     try:
-        pushover_token = os.getenv("PUSHOVER_TOKEN")
-        pushover_user = os.getenv("PUSHOVER_USER")
-        
-        if not pushover_token or not pushover_user:
-            return "❌ Pushover credentials not configured. Please set PUSHOVER_TOKEN and PUSHOVER_USER environment variables."
-        
-        pushover_url = "https://api.pushover.net/1/messages.json"
-        
-        response = requests.post(
-            pushover_url,
-            data={
-                "token": pushover_token,
-                "user": pushover_user,
-                "message": message
-            }
+        sent = await get_dispatcher().notify(
+            "push", "", "Alpha Agents", message, wait=True, coalesce=False
         )
         
-        if response.status_code == 200:
+        if sent:
             return f"✅ Push notification sent: {message}"
         else:
-            return f"❌ Failed to send push notification: {response.text}"
+            return f"✅ Push notification already sent recently: {message}"
             
+    except NotificationError as e:
+        return f"❌ Failed to send push notification: {str(e)}"
     except Exception as e:
         return f"❌ Error sending push notification: {str(e)}"
 
-notification_tool = Tool(
+notification_tool = StructuredTool.from_function(
+    func=sync_fallback(send_push_notification),
+    coroutine=send_push_notification,
     name="send_push_notification",
-    func=send_push_notification,
-    description="Send a push notification to the user's device via Pushover service."
+    description="Send a push notification to the user's device via Pushover service.",
+    args_schema=PushNotificationInput
 )
@@ -1,37 +1,66 @@
-import os
-from datetime import datetime
-from langchain.agents import Tool
-from ..tools.browser_tools import BrowserToolsService
+from typing import Optional
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from ..core.browser_sessions import session_id
+from ..tools.browser_tools import get_browser_tools_service
+from .sync import sync_fallback
 
-# Global browser service instance
-browser_service = BrowserToolsService()
+class ClipRegion(BaseModel):
+    x: float
+    y: float
+    width: float
+    height: float
 
-async def take_screenshot(filename: str = None) -> str:
-    """Take a screenshot of the current browser page"""
+class ScreenshotInput(BaseModel):
+    filename: Optional[str] = Field(
+        default=None,
+        description="Name for the screenshot (default: auto-generated timestamp)"
+    )
+    selector: Optional[str] = Field(
+        default=None,
+        description="CSS selector of one element to capture instead of the viewport"
+    )
+    clip: Optional[ClipRegion] = Field(
+        default=None, description="Region of the page to capture, in CSS pixels"
+    )
+    full_page: bool = Field(
+        default=False, description="Capture the whole scrollable page"
+    )
+
+async def take_screenshot(
+    filename: Optional[str] = None,
+    selector: Optional[str] = None,
+    clip: Optional[ClipRegion] = None,
+    full_page: bool = False,
+    config: RunnableConfig = None,
+) -> str:
+    """Take a screenshot of the current browser page of this conversation"""
     try:
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}.png"
-        
-        # Ensure the screenshots directory exists
-        screenshots_dir = "screenshots"
-        os.makedirs(screenshots_dir, exist_ok=True)
-        
-        full_path = os.path.join(screenshots_dir, filename)
-        
-        # Initialize browser if needed
-        await browser_service.initialize()
-        
-        # Take screenshot
-        result = await browser_service.take_screenshot(full_path)
+        if isinstance(clip, BaseModel):
+            clip = clip.model_dump()
+
+        # Take screenshot of the page the conversation's browser tools use
+        saved = await get_browser_tools_service().take_screenshot(
+            session_id(config), filename, selector, clip, full_page
+        )
+        record = saved.record
+        url = f"/screenshots/{record.id}"
         
-        return f"✅ Screenshot saved: {full_path}"
+        if saved.duplicate:
+            return f"✅ Page looks unchanged since the last screenshot: {url}"
+        size = f"{record.width}x{record.height}, {record.size_bytes // 1024} KB"
+        return f"✅ Screenshot saved: {url} ({size})"
         
     except Exception as e:
         return f"❌ Error taking screenshot: {str(e)}"
 
-screenshot_tool = Tool(
+screenshot_tool = StructuredTool.from_function(
+    func=sync_fallback(take_screenshot),
+    coroutine=take_screenshot,
     name="take_screenshot",
-    func=take_screenshot,
-    description="Take a screenshot of the current browser page. Optional parameter: filename (default: auto-generated timestamp)"
+    description="Take a screenshot of the current browser page, or of one element "
+    "or region of it. Optional parameter: filename (default: auto-generated "
+    "timestamp)",
+    args_schema=ScreenshotInput
 )
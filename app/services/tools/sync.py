@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Awaitable, Callable
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sync-tool")
+
+
+def run_sync(coroutine: Awaitable):
+    """Run a coroutine to completion from synchronous code
+
+    Inside a running event loop the coroutine gets its own loop on a worker
+    thread, so a sync tool call never deadlocks the caller's loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    return _executor.submit(asyncio.run, coroutine).result()
+
+
+def sync_fallback(function: Callable[..., Awaitable]) -> Callable:
+    """Synchronous wrapper around an async tool function"""
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        return run_sync(function(*args, **kwargs))
+
+    return wrapper
@@ -1,27 +1,51 @@
-from langchain.agents import Tool
-from ..core.browser import get_browser
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from ..core.browser_sessions import session_id
+from ..monitoring.change_detector import get_change_detector
+from ..monitoring.targets import VISA_CHECK_URL, target_for_url
+from .sync import sync_fallback
 
-async def check_visa_availability(url: str = "https://www.eoiparis.gov.in/page/e-visa/") -> str:
+class VisaCheckInput(BaseModel):
+    url: str = Field(
+        default=VISA_CHECK_URL, description="Visa appointment page to check"
+    )
+
+async def check_visa_availability(
+    url: str = VISA_CHECK_URL, config: RunnableConfig = None
+) -> str:
     """Check visa slot availability on the Indian embassy website"""
     try:
-        browser, page = await get_browser()
-        await page.goto(url)
-        content = await page.content()
-        text_content = await page.inner_text("body")
-        await browser.close()
-        
-        available = "Available" in content
+        # If the page has to be rendered, do it in the conversation's browser session
+        result = await get_change_detector().check(
+            target_for_url(url), session=session_id(config)
+        )
+        snapshot = result.snapshot
+        checked = (
+            "changed since last check"
+            if result.changed
+            else "unchanged since last check"
+        )
         
-        if available:
-            return f"✅ VISA SLOTS AVAILABLE! Found availability on {url}"
+        if snapshot.available:
+            return (
+                f"✅ VISA SLOTS AVAILABLE! Found availability on {url} "
+                f"(page {checked}). Slots: {snapshot.slots}"
+            )
         else:
-            return f"❌ No visa slots currently available on {url}. Content preview: {text_content[:500]}..."
+            return (
+                f"❌ No visa slots currently available on {url} (page {checked}). "
+                f"Content preview: {snapshot.text_excerpt[:500]}..."
+            )
             
     except Exception as e:
         return f"❌ Error checking visa availability: {str(e)}"
 
-visa_check_tool = Tool(
+visa_check_tool = StructuredTool.from_function(
+    func=sync_fallback(check_visa_availability),
+    coroutine=check_visa_availability,
     name="check_visa_availability",
-    func=check_visa_availability,
-    description="Check visa slot availability on the Indian embassy website. Returns availability status and page content."
+    description="Check visa slot availability on the Indian embassy website. "
+    "Returns availability status and page content.",
+    args_schema=VisaCheckInput
 )
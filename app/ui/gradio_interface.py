@@ -1,35 +1,50 @@
 import asyncio
-from typing import Tuple
+import importlib
+import os
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Tuple
 
 import gradio as gr
 
-from ..services.agents.langgraph_agent import LangGraphAgent
+if TYPE_CHECKING:
+    from ..services.agents.langgraph_agent import LangGraphAgent
+
+GRADIO_CONCURRENCY_LIMIT = int(os.getenv("GRADIO_CONCURRENCY_LIMIT", "8"))
 
 
 class GradioInterface:
     """Gradio interface for the agent system"""
 
-    def __init__(self):
-        self.agent = LangGraphAgent()
+    def __init__(self, concurrency_limit: int = GRADIO_CONCURRENCY_LIMIT):
+        # Built on first use so the server binds without loading the agent stack
+        self.agent: Optional["LangGraphAgent"] = None
         self.initialized = False
+        self.concurrency_limit = concurrency_limit
+        self._agent_lock = asyncio.Lock()
 
     async def initialize_agent(self):
-        """Initialize the agent"""
+        """Build and initialize the agent"""
+        if self.agent is None:
+            # A worker thread imports LangGraph and LangChain so other
+            # sessions on the server loop are not held up
+            module = await asyncio.to_thread(
+                importlib.import_module, "app.services.agents.langgraph_agent"
+            )
+            self.agent = module.LangGraphAgent()
         if not self.initialized:
             await self.agent.initialize()
             self.initialized = True
 
     async def chat_with_agent(
-        self, message: str, history, model_name: str
+        self, message: str, history, model_name: str, thread_id: str
     ) -> Tuple[str, list]:
         """Handle chat with the agent"""
-        await self.initialize_agent()
+        async with self._agent_lock:
+            await self.initialize_agent()
 
-        # Switch model if needed
-        await self.agent.switch_model(model_name)
-
-        # Process the message
-        response = await self.agent.chat(message)
+        # Process the message with this session's model; graphs are cached
+        # per model, so other sessions keep theirs
+        response = await self.agent.chat(message, thread_id, model_name)
 
         # Update history
         if history is None:
@@ -39,8 +54,44 @@ class GradioInterface:
 
         return "", history
 
+    async def stream_with_agent(
+        self, message: str, history, model_name: str, thread_id: str
+    ) -> AsyncIterator[Tuple[str, list]]:
+        """Stream the agent's reply into the chat history as it is produced"""
+        async with self._agent_lock:
+            await self.initialize_agent()
+
+        if history is None:
+            history = []
+
+        history.append([message, "⏳ Thinking..."])
+        yield "", history
+
+        steps: list[str] = []
+        answer = ""
+        # Gradio closes this generator when the browser goes away; closing
+        # the agent's stream with it cancels the LLM call in flight
+        async with aclosing(
+            self.agent.stream_chat(message, thread_id, model_name)
+        ) as events:
+            async for event in events:
+                if event["type"] == "token":
+                    answer += event["content"]
+                elif event["type"] == "tool_start":
+                    steps.append(f"🔧 Running `{event['name']}`...")
+                    answer = ""
+                elif event["type"] == "tool_end":
+                    steps.append(f"✅ `{event['name']}` finished")
+                else:
+                    answer = event["content"]
+
+                history[-1][1] = "\n".join(steps + ([answer] if answer else []))
+                yield "", history
+
     async def get_available_models(self) -> list:
         """Get available models"""
+        async with self._agent_lock:
+            await self.initialize_agent()
         return await self.agent.get_available_models()
 
     def create_interface(self):
@@ -101,6 +152,7 @@ class GradioInterface:
                     gr.Markdown("### 📋 Available Tools")
                     gr.Markdown(
                         """
+                    - **Fetch Page**: Fast text and link extraction over HTTP
                     - **Browser Tools**: Navigate, extract text, take screenshots
                     - **Visa Checker**: Monitor Indian embassy visa slots
                     - **Notifications**: Send push alerts via Pushover
@@ -108,47 +160,55 @@ class GradioInterface:
                     )
 
             # Event handlers
-            def handle_submit(message: str, history, model: str):
+            # Each browser session gets its own conversation thread
+            async def handle_submit(
+                message: str, history, model: str, request: gr.Request
+            ):
                 if not message.strip():
-                    return "", history
-
-                # Run async function
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    new_msg, new_history = loop.run_until_complete(
-                        self.chat_with_agent(message, history, model)
+                    yield "", history
+                    return
+
+                async with aclosing(
+                    self.stream_with_agent(
+                        message, history, model, request.session_hash
                     )
-                    return new_msg, new_history
-                finally:
-                    loop.close()
+                ) as updates:
+                    async for update in updates:
+                        yield update
 
-            def handle_quick_visa(history, model: str):
-                return handle_submit(
+            async def handle_quick_visa(history, model: str, request: gr.Request):
+                async for update in handle_submit(
                     "Check visa slot availability on the Indian embassy website",
                     history,
                     model,
-                )
+                    request,
+                ):
+                    yield update
 
-            def handle_quick_browse(history, model: str):
-                return handle_submit(
-                    "Navigate to https://www.cnn.com and extract the main headlines",
+            async def handle_quick_browse(history, model: str, request: gr.Request):
+                async for update in handle_submit(
+                    "Fetch https://www.cnn.com and list the main headlines",
                     history,
                     model,
-                )
-
-            def handle_quick_screenshot(history, model: str):
-                return handle_submit(
-                    "Take a screenshot of the current page", history, model
-                )
-
-            def handle_quick_notify(history, model: str):
-                return handle_submit(
+                    request,
+                ):
+                    yield update
+
+            async def handle_quick_screenshot(history, model: str, request: gr.Request):
+                async for update in handle_submit(
+                    "Take a screenshot of the current page", history, model, request
+                ):
+                    yield update
+
+            async def handle_quick_notify(history, model: str, request: gr.Request):
+                async for update in handle_submit(
                     "Send me a test push notification \
                     saying 'Alpha Agents is working!'",
                     history,
                     model,
-                )
+                    request,
+                ):
+                    yield update
 
             # Bind events
             submit_btn.click(
@@ -187,20 +247,18 @@ class GradioInterface:
                 outputs=[msg, chatbot],
             )
 
-            # Load available models on startup
-            def load_models():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    models = loop.run_until_complete(self.get_available_models())
-                    return gr.Dropdown(
-                        choices=models, value=models[0] if models else None
-                    )
-                finally:
-                    loop.close()
+            # Load available models when the page opens; this also warms up
+            # the agent before the first message
+            async def load_models():
+                models = await self.get_available_models()
+                return gr.Dropdown(choices=models, value=models[0] if models else None)
 
             interface.load(load_models, outputs=[model_dropdown])
 
+        # Every handler is a coroutine on Gradio's server loop, so concurrent
+        # sessions share that loop (and the agent's browser) via the queue
+        interface.queue(default_concurrency_limit=self.concurrency_limit)
+
         return interface
 
     async def launch(self, share: bool = False, server_port: int = 7860):
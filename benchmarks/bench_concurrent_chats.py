@@ -0,0 +1,82 @@
+"""
+Load-test concurrent chat sessions against a fixed-latency fake LLM.
+
+Each level runs N sessions at once through LangGraphAgent.chat. With the
+chatbot node awaiting the model, the wall time of a level stays near one
+LLM round trip until the per-model concurrency limit is reached, so
+throughput grows roughly linearly with N.
+
+    python -m benchmarks.bench_concurrent_chats --sessions 1,2,4,8,16,32
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.agents.langgraph_agent import LangGraphAgent
+from app.services.llm_router import get_model_router
+from app.services.llm_service import LLMService
+from app.services.tools.browser_tools import BrowserToolsService
+
+from .fake_llm import FakeChatModel
+
+
+async def run(levels: list[int], latency: float, max_concurrency: int) -> dict:
+    LLMService.get_model = lambda self, model_name: FakeChatModel(latency=latency)
+
+    async def no_browser_tools(self):
+        return []
+
+    BrowserToolsService.get_tools = no_browser_tools
+    get_model_router().max_concurrency = max_concurrency
+
+    agent = LangGraphAgent()
+    await agent.initialize()
+    await agent.chat("warm up", "warm-up")
+
+    results = []
+    for sessions in levels:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                agent.chat(f"message {i}", f"level-{sessions}-session-{i}")
+                for i in range(sessions)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        results.append(
+            {
+                "sessions": sessions,
+                "elapsed_s": round(elapsed, 3),
+                "chats_per_second": round(sessions / elapsed, 2),
+            }
+        )
+    await agent.close()
+
+    base = results[0]["chats_per_second"] / results[0]["sessions"]
+    for result in results:
+        # 1.0 means N sessions finish N times as many chats per second
+        result["scaling"] = round(
+            result["chats_per_second"] / (base * result["sessions"]), 2
+        )
+
+    return {
+        "llm_latency_s": latency,
+        "max_concurrency_per_model": max_concurrency,
+        "levels": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", default="1,2,4,8,16,32")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.sessions.split(",")]
+    print(asyncio.run(run(levels, args.llm_latency, args.max_concurrency)))
+
+
+if __name__ == "__main__":
+    main()
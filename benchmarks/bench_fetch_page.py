@@ -0,0 +1,76 @@
+"""
+Compare the fetch_page fast path (pooled HTTP + selectolax) with a full
+Chromium render of the same URL.
+
+Latency is the mean over --runs fetches. Memory is the peak RSS growth of
+this process for the fast path, and the peak RSS of the largest child
+process (Chromium) for the render, read after the browser has exited.
+
+    python -m benchmarks.bench_fetch_page --url https://www.cnn.com --runs 5
+"""
+
+import argparse
+import asyncio
+import resource
+import statistics
+
+from app.services.core.browser import close_browser_pool
+from app.services.core.browser_sessions import close_session_registry
+from app.services.core.http_client import close_http_client
+from app.services.core.page_fetcher import PageFetcher
+
+
+def peak_rss_mb(who: int) -> float:
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+async def timed(fetcher: PageFetcher, url: str, runs: int, render: bool) -> dict:
+    latencies, chars = [], 0
+    for _ in range(runs):
+        page = await fetcher.fetch(url, "benchmark", render=render)
+        latencies.append(page.latency_ms)
+        chars = len(page.text)
+    return {
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "min_ms": round(min(latencies), 1),
+        "text_chars": chars,
+        "rendered": page.rendered,
+    }
+
+
+async def run(url: str, runs: int, fast_only: bool) -> dict:
+    fetcher = PageFetcher()
+    result = {"url": url, "runs": runs}
+
+    rss_before = peak_rss_mb(resource.RUSAGE_SELF)
+    result["fast_path"] = await timed(fetcher, url, runs, render=False)
+    result["fast_path"]["peak_rss_growth_mb"] = round(
+        peak_rss_mb(resource.RUSAGE_SELF) - rss_before, 1
+    )
+
+    if not fast_only:
+        result["chromium"] = await timed(fetcher, url, runs, render=True)
+        await close_session_registry()
+        await close_browser_pool()
+        result["chromium"]["peak_child_rss_mb"] = round(
+            peak_rss_mb(resource.RUSAGE_CHILDREN), 1
+        )
+        result["speedup"] = round(
+            result["chromium"]["mean_ms"] / result["fast_path"]["mean_ms"], 1
+        )
+
+    await close_http_client()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="https://www.cnn.com")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fast-only", action="store_true")
+    args = parser.parse_args()
+    print(asyncio.run(run(args.url, args.runs, args.fast_only)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measure how many chats per second the Gradio chat path sustains.
+
+The LLM is replaced with a fixed-latency fake and browser tools are
+disabled, so the numbers reflect the agent/event-loop overhead only.
+
+    python -m benchmarks.bench_gradio_chat --chats 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.services.llm_service import LLMService
+from app.services.tools.browser_tools import BrowserToolsService
+from app.ui.gradio_interface import GradioInterface
+
+from .fake_llm import FakeChatModel
+
+
+async def run(chats: int, concurrency: int, latency: float) -> dict:
+    LLMService.get_model = lambda self, model_name: FakeChatModel(latency=latency)
+
+    async def no_browser_tools(self):
+        return []
+
+    BrowserToolsService.get_tools = no_browser_tools
+
+    interface = GradioInterface(concurrency_limit=concurrency)
+    model = (await interface.get_available_models())[0]
+    await interface.chat_with_agent("warm up", [], model, "warm-up")
+
+    # Mirrors Gradio's queue: at most `concurrency` handlers run at once
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_chat(i: int):
+        async with limit:
+            await interface.chat_with_agent(f"message {i}", [], model, f"session-{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_chat(i) for i in range(chats)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "chats": chats,
+        "concurrency": concurrency,
+        "llm_latency_s": latency,
+        "elapsed_s": round(elapsed, 3),
+        "chats_per_second": round(chats / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    print(asyncio.run(run(args.chats, args.concurrency, args.latency)))
+
+
+if __name__ == "__main__":
+    main()
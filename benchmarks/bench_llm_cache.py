@@ -0,0 +1,74 @@
+"""
+Measure the LLM response cache and request coalescing against a fake model.
+
+A burst of identical prompts is sent concurrently (coalesced into one
+upstream call), then repeated (served from the SQLite cache), then a burst
+of distinct prompts shows the uncached baseline.
+
+    python -m benchmarks.bench_llm_cache --requests 50 --llm-latency 0.5
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from app.services import llm_cache
+from app.services.llm_cache import CoalescingChatModel, LLMResponseCache
+
+from .fake_llm import FakeChatModel
+
+
+class CountingChatModel(CoalescingChatModel, FakeChatModel):
+    """Fake model that counts the requests that reach it"""
+
+    upstream_calls: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.upstream_calls += 1
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+async def burst(model: CountingChatModel, prompts: list[str]) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(model.ainvoke(prompt) for prompt in prompts))
+    return time.perf_counter() - started
+
+
+async def run(requests: int, latency: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        llm_cache._cache = LLMResponseCache(f"{directory}/llm_cache.db")
+        model = CountingChatModel(latency=latency, cache=llm_cache._cache)
+
+        coalesced_s = await burst(model, ["what is new?"] * requests)
+        coalesced_calls = model.upstream_calls
+        cached_s = await burst(model, ["what is new?"] * requests)
+        cached_calls = model.upstream_calls - coalesced_calls
+        distinct_s = await burst(model, [f"question {i}" for i in range(requests)])
+
+        report = llm_cache.llm_cache_report()
+        llm_cache.close_llm_cache()
+
+    return {
+        "requests": requests,
+        "llm_latency_s": latency,
+        "coalesced_burst_s": round(coalesced_s, 3),
+        "coalesced_upstream_calls": coalesced_calls,
+        "cached_burst_s": round(cached_s, 3),
+        "cached_upstream_calls": cached_calls,
+        "distinct_burst_s": round(distinct_s, 3),
+        "cache": report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(asyncio.run(run(args.requests, args.llm_latency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Measure import time and startup latency of the API and Gradio entry points.
+
+Each import runs in a fresh interpreter, --runs times, and reports the
+best wall time, the number of modules loaded and which heavy packages
+came with it. Startup is the time from spawning `uvicorn app.main:app`
+until GET / answers, and the RSS of the server at that point.
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 5 --warm-up agent
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .fixture_server import free_port
+
+ENTRY_POINTS = ["app.main", "app.gradio_app", "app.ui.gradio_interface"]
+HEAVY_PACKAGES = [
+    "gradio",
+    "langchain_core",
+    "langchain_openai",
+    "langgraph",
+    "openai",
+    "playwright",
+    "PIL",
+]
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(sys.modules),
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure_import(module: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                IMPORT_PROBE.format(module=module, heavy=HEAVY_PACKAGES),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(samples, key=lambda sample: sample["seconds"])
+    return {
+        "import_s": round(best["seconds"], 3),
+        "modules": best["modules"],
+        "heavy_packages": best["heavy"],
+    }
+
+
+def rss_mb(pid: int) -> float:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure_api_startup(runs: int, warm_up: str) -> dict:
+    env = {**os.environ, "API_WARM_UP": warm_up, "MONITORING_ENABLED": "false"}
+    samples, rss = [], 0.0
+    for _ in range(runs):
+        port = free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/", timeout=1).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if server.poll() is not None:
+                        raise RuntimeError("uvicorn exited during startup")
+                    time.sleep(0.01)
+            samples.append(time.perf_counter() - started)
+            rss = rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return {
+        "first_response_s": round(min(samples), 3),
+        "rss_at_first_response_mb": rss,
+        "warm_up": warm_up,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warm-up", default="")
+    args = parser.parse_args()
+
+    result = {
+        "imports": {
+            module: measure_import(module, args.runs) for module in ENTRY_POINTS
+        },
+        "api_startup": measure_api_startup(args.runs, args.warm_up),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
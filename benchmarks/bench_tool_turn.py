@@ -0,0 +1,107 @@
+"""
+Measure the latency of one agent turn in which the LLM calls several tools.
+
+The LLM asks for a visa check, a push notification and a screenshot at
+once; each tool's I/O is simulated with a fixed delay. --blocking makes
+that I/O block the event loop (as the old requests-based notification
+tool did), which serializes the calls; the default awaits it, so
+ToolNode runs the three calls concurrently.
+
+    python -m benchmarks.bench_tool_turn --turns 20 --io-latency 0.2
+    python -m benchmarks.bench_tool_turn --turns 20 --io-latency 0.2 --blocking
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.agents.langgraph_agent import LangGraphAgent
+from app.services.llm_service import LLMService
+from app.services.core.screenshots import SaveResult, ScreenshotRecord
+from app.services.monitoring.change_detector import ChangeDetector
+from app.services.notifications.dispatcher import NotificationDispatcher
+from app.services.tools.browser_tools import BrowserToolsService
+
+from .fake_llm import FakeChatModel
+
+TOOL_CALLS = [
+    {"name": "check_visa_availability", "args": {}},
+    {"name": "send_push_notification", "args": {"message": "benchmark"}},
+    {"name": "take_screenshot", "args": {"filename": "benchmark.png"}},
+]
+
+
+def patch_io(latency: float, blocking: bool):
+    """Replace the network and browser calls behind the tools with delays"""
+
+    async def io():
+        if blocking:
+            time.sleep(latency)
+        else:
+            await asyncio.sleep(latency)
+
+    async def check(self, target, force_render=False, session=None):
+        await io()
+        raise RuntimeError("simulated check")
+
+    async def notify(self, *args, **kwargs):
+        await io()
+        return True
+
+    async def screenshot(self, thread_id="default", *args, **kwargs):
+        await io()
+        record = ScreenshotRecord("bench", "bench.webp", "image/webp", 0, 0, 0, "0", 0)
+        return SaveResult(record)
+
+    async def nothing(self, *args, **kwargs):
+        return []
+
+    ChangeDetector.check = check
+    NotificationDispatcher.notify = notify
+    BrowserToolsService.take_screenshot = screenshot
+    BrowserToolsService.initialize = nothing
+    BrowserToolsService.get_tools = nothing
+
+
+async def run(turns: int, io_latency: float, llm_latency: float, blocking: bool):
+    patch_io(io_latency, blocking)
+    LLMService.get_model = lambda self, model_name: FakeChatModel(
+        latency=llm_latency, tool_calls=TOOL_CALLS
+    )
+
+    agent = LangGraphAgent()
+    await agent.initialize()
+
+    latencies = []
+    for i in range(turns):
+        started = time.perf_counter()
+        await agent.chat("check, notify and screenshot", f"turn-{i}")
+        latencies.append(time.perf_counter() - started)
+    await agent.close()
+
+    return {
+        "turns": turns,
+        "tools_per_turn": len(TOOL_CALLS),
+        "io_latency_s": io_latency,
+        "blocking_io": blocking,
+        "mean_turn_s": round(statistics.mean(latencies), 3),
+        "max_turn_s": round(max(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--io-latency", type=float, default=0.2)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        asyncio.run(run(args.turns, args.io_latency, args.llm_latency, args.blocking))
+    )
+
+
+if __name__ == "__main__":
+    main()
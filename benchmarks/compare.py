@@ -0,0 +1,87 @@
+"""
+Compare two benchmark suite results and flag regressions.
+
+Numeric results are matched by their path in the JSON. Timings (*_s,
+*_ms) and memory (*_mb) regress when they grow, rates (*_per_s) when they
+shrink, by more than --threshold. Exits with status 1 on any regression.
+
+    python -m benchmarks.compare base.json new.json
+"""
+
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_s", "_ms", "_mb")
+HIGHER_IS_BETTER = ("_per_s",)
+
+
+def flatten(value, prefix: str = "") -> dict[str, float]:
+    """Numeric leaves of a report keyed by their dotted path"""
+    if isinstance(value, dict):
+        leaves = {}
+        for key, child in value.items():
+            leaves.update(flatten(child, f"{prefix}.{key}" if prefix else key))
+        return leaves
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: float(value)}
+    return {}
+
+
+def direction(path: str) -> int:
+    """1 when higher is better, -1 when lower is better, 0 when neither"""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[dict]:
+    before = flatten({"results": old["results"], "peak_rss_mb": old["peak_rss_mb"]})
+    after = flatten({"results": new["results"], "peak_rss_mb": new["peak_rss_mb"]})
+    rows = []
+    for path in sorted(before.keys() & after.keys()):
+        better = direction(path)
+        if not better or not before[path]:
+            continue
+        change = (after[path] - before[path]) / before[path]
+        rows.append(
+            {
+                "metric": path,
+                "before": before[path],
+                "after": after[path],
+                "change": change,
+                "regression": change * better < -threshold,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"{old.get('revision')} -> {new.get('revision')}")
+    rows = compare(old, new, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['metric']:<45} {row['before']:>10g} {row['after']:>10g} "
+            f"{row['change']:>+8.1%} {flag}"
+        )
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
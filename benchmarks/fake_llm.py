@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model that answers after a fixed latency
+
+    With tool_calls set, a user message is answered with those calls and
+    the answer only comes once their results are back. With rounds > 1 the
+    same calls are made that many times in a row before answering.
+    """
+
+    latency: float = 0.0
+    reply: str = "ok"
+    tool_calls: list[dict] = []
+    rounds: int = 1
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages: list[BaseMessage]) -> ChatResult:
+        if self.tool_calls and self._rounds_done(messages) < self.rounds:
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {**call, "id": f"call-{i}"}
+                    for i, call in enumerate(self.tool_calls)
+                ],
+            )
+        else:
+            message = AIMessage(content=f"{self.reply}: {messages[-1].content}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _rounds_done(self, messages: list[BaseMessage]) -> int:
+        """Tool-call rounds already made since the last user message"""
+        done = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage) and message.tool_calls:
+                done += 1
+        return done
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
@@ -0,0 +1,86 @@
+"""
+Local web server for the recorded pages in benchmarks/fixtures.
+
+Pages are served with ETag and Last-Modified headers, so conditional GETs
+from the change detector get 304s just as they would from a real site.
+--latency adds a fixed delay to every response.
+
+    python -m benchmarks.fixture_server --port 8765 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.staticfiles import StaticFiles
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def create_app(latency: float = 0.0) -> Starlette:
+    app = Starlette()
+
+    @app.middleware("http")
+    async def delay(request, call_next):
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    app.mount("/fixtures", StaticFiles(directory=FIXTURES_DIR))
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FixtureServer:
+    """The fixture app on a uvicorn server in a background thread"""
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.port = port or free_port()
+        self.server = uvicorn.Server(
+            uvicorn.Config(
+                create_app(latency),
+                host="127.0.0.1",
+                port=self.port,
+                log_level="warning",
+                access_log=False,
+            )
+        )
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.port}/fixtures/{name}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Fixture server failed to start on {self.port}")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
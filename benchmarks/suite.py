@@ -0,0 +1,300 @@
+"""
+Reproducible end-to-end benchmark suite.
+
+Everything runs locally: a deterministic fake chat model makes scripted
+tool calls, and the recorded pages in benchmarks/fixtures are served by a
+local uvicorn server, so no API keys or live sites are needed. Scenarios:
+
+    chat        end-to-end latency of agent turns that fetch a news page
+    tool_loop   tool calls per second across concurrent multi-round turns
+    browser     Chromium launch and cold vs warm navigation to a fixture
+    check_visa  POST /check-visa requests per second against the fixture
+
+Results, with the peak RSS of the run, are written as JSON; compare two
+runs with benchmarks.compare.
+
+    python -m benchmarks.suite --out benchmarks/results/base.json
+    python -m benchmarks.suite --only chat,tool_loop --llm-latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from .fixture_server import FixtureServer
+
+SCENARIOS = ["chat", "tool_loop", "browser", "check_visa"]
+
+
+def configure_environment(server: FixtureServer, workdir: str):
+    """Point the app at the fixtures and turn off state that skews reruns
+
+    Settings are read when app modules are imported, so this runs before
+    any of them is.
+    """
+    os.environ.update(
+        {
+            "VISA_CHECK_URL": server.url("visa.html"),
+            "MONITORING_ENABLED": "false",
+            "LLM_ROUTING_ENABLED": "false",
+            "LLM_CACHE_ENABLED": "false",
+            "PAGE_CACHE_DIR": os.path.join(workdir, "page_cache"),
+            "SCREENSHOT_DIR": os.path.join(workdir, "screenshots"),
+            "CHECKPOINTER_BACKEND": "memory",
+            "TRACING_ENABLED": "false",
+            # Every request after a finished check starts a new one
+            "JOB_RESULT_MAX_AGE_SECONDS": "0",
+        }
+    )
+
+
+def summarize(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "mean_s": round(statistics.mean(ordered), 4),
+        "p50_s": round(ordered[len(ordered) // 2], 4),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4),
+        "max_s": round(ordered[-1], 4),
+    }
+
+
+def peak_rss_mb(who: int) -> float:
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+async def new_agent(model):
+    from app.services.agents.langgraph_agent import LangGraphAgent
+    from app.services.llm_service import LLMService
+
+    LLMService.get_model = lambda self, model_name: model
+    agent = LangGraphAgent()
+    await agent.initialize()
+    return agent
+
+
+async def bench_chat(server: FixtureServer, turns: int, llm_latency: float) -> dict:
+    """One fetch_page call and an answer per turn, one turn at a time"""
+    from .fake_llm import FakeChatModel
+
+    fetch = {"name": "fetch_page", "args": {"url": server.url("news.html")}}
+    agent = await new_agent(FakeChatModel(latency=llm_latency, tool_calls=[fetch]))
+    latencies = []
+    for i in range(turns):
+        started = time.perf_counter()
+        await agent.chat("What are the headlines?", f"chat-{i}")
+        latencies.append(time.perf_counter() - started)
+    await agent.close()
+    return {"turns": turns, **summarize(latencies)}
+
+
+async def bench_tool_loop(
+    server: FixtureServer, sessions: int, rounds: int, llm_latency: float
+) -> dict:
+    """Concurrent turns that each go round the tool loop several times"""
+    from .fake_llm import FakeChatModel
+
+    calls = [
+        {
+            "name": "fetch_page",
+            "args": {"url": server.url(name), "bypass_cache": True},
+        }
+        for name in ("news.html", "visa.html")
+    ]
+    agent = await new_agent(
+        FakeChatModel(latency=llm_latency, tool_calls=calls, rounds=rounds)
+    )
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(agent.chat("Read both pages", f"loop-{i}") for i in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+    await agent.close()
+    tool_calls = sessions * rounds * len(calls)
+    return {
+        "sessions": sessions,
+        "rounds": rounds,
+        "tool_calls": tool_calls,
+        "elapsed_s": round(elapsed, 3),
+        "tool_calls_per_s": round(tool_calls / elapsed, 1),
+        "turns_per_s": round(sessions / elapsed, 2),
+    }
+
+
+async def bench_browser(server: FixtureServer, runs: int) -> dict:
+    """Launch one Chromium, then navigate on fresh contexts from its pool"""
+    from playwright.async_api import Error as PlaywrightError
+
+    from app.services.core.browser import BrowserPool
+    from app.services.core.load_profiles import navigate
+
+    pool = BrowserPool(size=1, warm_contexts=1)
+    url = server.url("news.html")
+    try:
+        started = time.perf_counter()
+        await pool.start()
+        launch = time.perf_counter() - started
+
+        started = time.perf_counter()
+        async with pool.page() as page:
+            await navigate(page, url)
+        cold = time.perf_counter() - started
+
+        warm = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            async with pool.page() as page:
+                await navigate(page, url)
+            warm.append(time.perf_counter() - started)
+    except PlaywrightError as e:
+        return {"error": str(e).splitlines()[0]}
+    finally:
+        await pool.close()
+    return {
+        "launch_s": round(launch, 4),
+        "cold_navigation_s": round(cold, 4),
+        "warm_navigation": summarize(warm),
+    }
+
+
+async def bench_check_visa(requests: int, concurrency: int) -> dict:
+    """POST /check-visa through the API until every request has its result"""
+    import httpx
+
+    from app.main import app
+    from app.services.jobs.queue import close_job_queue, get_job_queue
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60
+    ) as client:
+        # The first check renders the page; later ones are conditional GETs
+        first = (await client.post("/check-visa", params={"wait": 60})).json()
+        if first["status"] != "succeeded":
+            await close_job_queue()
+            return {"error": (first.get("error") or first["status"]).splitlines()[0]}
+
+        limit = asyncio.Semaphore(concurrency)
+        latencies, statuses = [], []
+
+        async def one():
+            async with limit:
+                started = time.perf_counter()
+                response = await client.post("/check-visa", params={"wait": 60})
+                latencies.append(time.perf_counter() - started)
+                statuses.append(response.json()["status"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    stats = get_job_queue().report()
+    await close_job_queue()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "succeeded": statuses.count("succeeded"),
+        "checks_run": stats["submitted"] - 1,
+        "coalesced": stats["coalesced"],
+        "requests_per_s": round(requests / elapsed, 1),
+        **summarize(latencies),
+    }
+
+
+async def run(server: FixtureServer, args: argparse.Namespace) -> dict:
+    from app.services.core.browser import close_browser_pool
+    from app.services.core.browser_sessions import close_session_registry
+    from app.services.core.http_client import close_http_client
+
+    results = {}
+    for name in args.only:
+        started = time.perf_counter()
+        if name == "chat":
+            results[name] = await bench_chat(server, args.turns, args.llm_latency)
+        elif name == "tool_loop":
+            results[name] = await bench_tool_loop(
+                server, args.sessions, args.rounds, args.llm_latency
+            )
+        elif name == "browser":
+            results[name] = await bench_browser(server, args.runs)
+        elif name == "check_visa":
+            results[name] = await bench_check_visa(args.requests, args.concurrency)
+        print(f"{name}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    await close_session_registry()
+    await close_browser_pool()
+    await close_http_client()
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--only", default=",".join(SCENARIOS))
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--server-latency", type=float, default=0.0)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(args.only) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    started_at = datetime.now(timezone.utc)
+    with (
+        tempfile.TemporaryDirectory() as workdir,
+        FixtureServer(latency=args.server_latency) as server,
+    ):
+        configure_environment(server, workdir)
+        results = asyncio.run(run(server, args))
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k != "out"},
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+    out = args.out or os.path.join(
+        "benchmarks", "results", f"suite-{started_at:%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
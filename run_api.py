@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Alpha Agents - launch script for the API
+
+The worker count comes from WEB_CONCURRENCY (or --workers, which overrides
+it) and is both passed to uvicorn and exported to the workers, so they
+know to share conversations, jobs and browser slots. Launching with
+`uvicorn app.main:app --workers N` directly does not tell the workers N.
+
+    python run_api.py --workers 4
+"""
+
+import argparse
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    # Workers are spawned with this environment and read it on import
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
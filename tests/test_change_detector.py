@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest import mock
+
+import httpx
+import pytest
+
+from app.services.monitoring import change_detector
+from app.services.monitoring.change_detector import ChangeDetector, Snapshot
+from app.services.monitoring.targets import MonitorTarget
+
+TARGET = MonitorTarget("visa", "https://example.test/visa")
+
+
+def _client(status: int, text: str = "<p>Not Available</p>"):
+    transport = httpx.MockTransport(lambda request: httpx.Response(status, text=text))
+    return httpx.AsyncClient(transport=transport)
+
+
+def _snapshot(status: int, html: str = "<p>Available</p>") -> Snapshot:
+    return Snapshot(
+        url=TARGET.url,
+        content_hash=change_detector.content_fingerprint(html),
+        fetched_at=datetime.now(timezone.utc),
+        status_code=status,
+        available="Not" not in html,
+    )
+
+
+def _check(detector: ChangeDetector, client: httpx.AsyncClient, render_status: int):
+    render = mock.AsyncMock(return_value=_snapshot(render_status))
+    with (
+        mock.patch.object(change_detector, "get_http_client", return_value=client),
+        mock.patch.object(detector, "_render", render),
+    ):
+        return asyncio.run(detector.check(TARGET)), render
+
+
+@pytest.mark.parametrize("status", [403, 503])
+def test_http_error_falls_back_to_render(status):
+    detector = ChangeDetector()
+    result, render = _check(detector, _client(status), render_status=200)
+    render.assert_awaited_once()
+    assert result.rendered and result.available
+    assert result.status_code == 200
+    # Nothing from the failed response is kept for the next poll
+    assert result.snapshot.markup_hash is None and result.snapshot.etag is None
+
+
+def test_http_error_raises_when_render_fails_too():
+    detector = ChangeDetector()
+    with pytest.raises(httpx.HTTPStatusError):
+        _check(detector, _client(503), render_status=503)
+
+
+def test_changes_are_judged_on_the_rendered_page():
+    detector = ChangeDetector()
+    first, _ = _check(detector, _client(200), render_status=200)
+    # Same rendered page whether or not the plain GET worked: no change
+    second, _ = _check(detector, _client(500), render_status=200)
+    assert first.changed and not second.changed
+    assert second.snapshot.content_hash == first.snapshot.content_hash
@@ -0,0 +1,50 @@
+import asyncio
+from itertools import cycle
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, MessagesState, StateGraph
+
+from app.services.agents.context_manager import ContextManager
+
+SUMMARY = "SUMMARY-TEXT of the earlier turns"
+ANSWER = "The answer"
+
+
+def _graph(summary_llm, answer_llm):
+    context_manager = ContextManager(max_prompt_tokens=60)
+
+    async def chatbot(state: MessagesState):
+        prepared = await context_manager.prepare(state["messages"], "", summary_llm)
+        assert prepared.summary == SUMMARY
+        return {"messages": [await answer_llm.ainvoke(prepared.messages)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("chatbot", chatbot)
+    builder.add_edge(START, "chatbot")
+    return builder.compile()
+
+
+def test_summary_is_not_streamed_as_answer_tokens():
+    summary_llm = GenericFakeChatModel(messages=cycle([AIMessage(content=SUMMARY)]))
+    answer_llm = GenericFakeChatModel(messages=cycle([AIMessage(content=ANSWER)]))
+    history = []
+    for turn in range(6):
+        history += [
+            HumanMessage(content=f"question {turn} " + "word " * 40),
+            AIMessage(content=f"reply {turn} " + "word " * 40),
+        ]
+    history.append(HumanMessage(content="latest question"))
+
+    async def stream() -> str:
+        tokens = []
+        async for event in _graph(summary_llm, answer_llm).astream_events(
+            {"messages": history}, version="v2"
+        ):
+            if event["event"] == "on_chat_model_stream":
+                tokens.append(event["data"]["chunk"].content)
+        return "".join(tokens)
+
+    streamed = asyncio.run(stream())
+    assert "SUMMARY-TEXT" not in streamed
+    assert streamed.replace(" ", "") == ANSWER.replace(" ", "")
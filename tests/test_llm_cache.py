@@ -0,0 +1,109 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.services import llm_cache
+from app.services.llm_cache import (
+    CoalescingChatModel,
+    LLMResponseCache,
+    RequestCoalescer,
+)
+from benchmarks.fake_llm import FakeChatModel
+
+
+class CountingChatModel(CoalescingChatModel, FakeChatModel):
+    """Fake model that counts the requests that reach it"""
+
+    upstream_calls: int = 0
+
+    def bind_tools(self, tools, **kwargs):
+        # Like ChatOpenAI: the tool schemas become part of the request
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.upstream_calls += 1
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+@tool
+def lookup_slots(city: str) -> str:
+    """Look up visa slots in a city"""
+    return city
+
+
+@tool
+def lookup_fees(city: str) -> str:
+    """Look up visa fees in a city"""
+    return city
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl_seconds=60)
+    with mock.patch.object(llm_cache, "_coalescer", RequestCoalescer()):
+        yield cache
+    cache.close()
+
+
+def test_concurrent_identical_burst_makes_one_upstream_call(cache):
+    model = CountingChatModel(latency=0.05, cache=cache)
+
+    async def burst():
+        return await asyncio.gather(*(model.ainvoke("what is new?") for _ in range(20)))
+
+    replies = asyncio.run(burst())
+    assert model.upstream_calls == 1
+    assert {reply.content for reply in replies} == {"ok: what is new?"}
+
+
+def test_repeated_prompt_is_a_hit_with_a_fresh_message_id(cache):
+    model = CountingChatModel(cache=cache)
+    first = asyncio.run(model.ainvoke("what is new?"))
+    second = asyncio.run(model.ainvoke("what is new?"))
+
+    assert model.upstream_calls == 1
+    assert cache.stats["fake-chat"]["hits"] == 1
+    assert second.content == first.content
+    assert second.id and second.id != first.id
+
+
+def test_row_past_the_ttl_is_a_miss(cache):
+    model = CountingChatModel(cache=cache)
+    asyncio.run(model.ainvoke("what is new?"))
+
+    later = time.time() + cache.ttl_seconds + 1
+    with mock.patch.object(llm_cache.time, "time", return_value=later):
+        asyncio.run(model.ainvoke("what is new?"))
+
+    assert model.upstream_calls == 2
+    assert cache.stats["fake-chat"]["expired"] == 1
+
+
+def test_different_tool_schemas_are_a_miss(cache):
+    model = CountingChatModel(cache=cache)
+    asyncio.run(model.bind_tools([lookup_slots]).ainvoke("what is new?"))
+    asyncio.run(model.bind_tools([lookup_fees]).ainvoke("what is new?"))
+    assert model.upstream_calls == 2
+
+    asyncio.run(model.bind_tools([lookup_slots]).ainvoke("what is new?"))
+    assert model.upstream_calls == 2
+
+
+def test_cancelled_waiter_leaves_the_shared_call_running(cache):
+    model = CountingChatModel(latency=0.1, cache=cache)
+
+    async def burst():
+        waiters = [asyncio.create_task(model.ainvoke("what is new?")) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return results
+
+    cancelled, *answered = asyncio.run(burst())
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert [reply.content for reply in answered] == ["ok: what is new?"] * 2
+    assert model.upstream_calls == 1
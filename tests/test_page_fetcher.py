@@ -0,0 +1,32 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from app.services.core.page_fetcher import PageFetcher
+from app.services.tools.fetch_tool import fetch_page
+
+LOCAL_URLS = ["file:///etc/passwd", "FILE:///etc/hosts", "data:text/html,hi", "ftp://x"]
+
+
+@pytest.mark.parametrize("url", LOCAL_URLS)
+def test_fetch_rejects_non_http_urls_before_any_path(url):
+    fetcher = PageFetcher()
+    with (
+        mock.patch.object(fetcher, "_fetch_http") as fetch_http,
+        mock.patch.object(fetcher, "_render") as render,
+    ):
+        with pytest.raises(ValueError, match="Only http and https"):
+            asyncio.run(fetcher.fetch(url))
+        with pytest.raises(ValueError):
+            asyncio.run(fetcher.fetch(url, render=True))
+    fetch_http.assert_not_called()
+    render.assert_not_called()
+
+
+def test_fetch_page_tool_reports_rejected_url():
+    with mock.patch("app.services.core.page_fetcher.PageFetcher._render") as render:
+        result = asyncio.run(fetch_page("file:///etc/passwd", render=True))
+    assert result.startswith("❌")
+    assert "Only http and https" in result
+    render.assert_not_called()